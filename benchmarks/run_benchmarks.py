@@ -0,0 +1,450 @@
+# ============================================================================
+# FILE: benchmarks/run_benchmarks.py
+# ============================================================================
+"""
+Stage-by-stage performance benchmarks for the ingestion and transform paths.
+
+Each stage is timed separately against a seeded synthetic catalog:
+
+* ``fetch_parse``   - ``USGSAPIClient`` paging and JSON parsing over mocked HTTP
+* ``validate_batch`` - ``DataValidator.validate_batch`` over feature dicts
+* ``event_batch``   - ``EventBatch.from_features`` (columnar page conversion)
+* ``validate_event_batch`` - ``DataValidator.validate_batch`` over an ``EventBatch``
+* ``python_transform_rows`` - staging/dimension rows built by the Python engine
+* ``region_lookup`` - ``RegionClassifier.classify_many`` over event coordinates
+* ``load_batch``    - ``RawDataLoader.load_batch`` (requires ``--db``)
+* ``transform:<file>`` - each SQL file in ``sql/transformations`` (requires ``--db``)
+* ``transform:sql_engine`` / ``transform:python_engine`` - a full transform of the
+  loaded batch by each ``TransformEngine`` (requires ``--db``)
+
+The catalog is generated and processed one page at a time, so memory stays
+flat up to the ``full`` profile's 10M events. Results are written as JSON and
+compared with a stored baseline. Throughput is divided by a calibration score
+measured in the same run, so the baseline carries over between machines;
+``--check`` makes a drop beyond ``--tolerance`` exit non-zero (stages shorter
+than ``MIN_GATED_SECONDS`` are not gated, and it needs ``--repeat`` >= 3).
+
+Usage:
+    python benchmarks/run_benchmarks.py --sizes 1000,10000
+    python benchmarks/run_benchmarks.py --profile full --repeat 1
+    python benchmarks/run_benchmarks.py --db --config config/config.toml
+    python benchmarks/run_benchmarks.py --check
+    python benchmarks/run_benchmarks.py --update-baseline
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+import requests
+
+from earthquake_elt.config import load_config
+from earthquake_elt.database import Database
+from earthquake_elt.ingestion import DataValidator, RawDataLoader, USGSAPIClient
+from earthquake_elt.ingestion.batch import EventBatch
+from earthquake_elt.regions import RegionClassifier
+from earthquake_elt.testing import SyntheticCatalog, feature_collection
+from earthquake_elt.transform import SqlTransformEngine
+from earthquake_elt.transform.python_engine import PythonTransformEngine, build_rows
+
+ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_BASELINE = ROOT / "benchmarks" / "baseline.json"
+SCHEMA_DIR = ROOT / "sql" / "schema"
+TRANSFORM_FILES = [
+    ROOT / "sql" / "transformations" / "load_staging.sql",
+    ROOT / "sql" / "transformations" / "load_warehouse.sql",
+]
+REGIONS = RegionClassifier(ROOT / "data" / "regions.json", ROOT / ".cache" / "regions")
+PAGE_SIZE = 10000
+PROFILES = {
+    "ci": "1000,10000,100000",
+    "full": "1000,10000,100000,1000000,10000000",
+}
+BATCH_ID = "00000000-0000-0000-0000-000000000000"
+CALIBRATION_SAMPLES = 9
+# Stages measured faster than this are reported but not gated: at a few
+# milliseconds, scheduler noise alone moves throughput by more than the tolerance.
+MIN_GATED_SECONDS = 0.05
+# Fewer runs than this leave too much noise in the fastest run for --check.
+MIN_CHECK_REPEAT = 3
+
+API_CONFIG = {
+    "api": {
+        "base_url": "http://benchmark.invalid/fdsnws/event/1/query",
+        "format": "geojson",
+        "timeout": 30,
+        "batch_size": 1000,
+        "rate_limit_per_minute": 10**9,
+    }
+}
+
+
+class MockedSession:
+    """
+    Stand-in for ``requests.Session`` serving pages of a synthetic catalog.
+
+    Only the ``query`` method is served (``count`` answers 404), so the client
+    pages sequentially and features are generated as each page is requested
+    rather than held in memory. Building the page bodies is tracked in
+    ``build_seconds`` so it can be excluded from the measured stage.
+    """
+
+    def __init__(self, catalog: SyntheticCatalog, size: int):
+        self.size = size
+        self.build_seconds = 0.0
+        self._features = catalog.iter_features(size)
+        self._next_offset = 1
+
+    def get(self, url: str, params: Dict[str, Any] = None, timeout: float = None):
+        started = time.perf_counter()
+        response = requests.Response()
+        response.url = url
+        if url.endswith("/count"):
+            response.status_code = 404
+            response._content = b"Not Found"
+            return response
+        offset, limit = int(params["offset"]), int(params["limit"])
+        assert offset == self._next_offset, "pages must be requested in order"
+        features = [f for _, f in zip(range(limit), self._features)]
+        self._next_offset += len(features)
+        page = feature_collection(features, count=self.size)
+        response.status_code = 200
+        response._content = json.dumps(page).encode("utf-8")
+        response.headers["Content-Type"] = "application/json"
+        self.build_seconds += time.perf_counter() - started
+        return response
+
+
+def calibrate(samples: int = CALIBRATION_SAMPLES) -> List[float]:
+    """
+    Machine speed samples: round trips of a fixed page per second.
+
+    A round trip parses the page's JSON, converts it to an ``EventBatch`` and
+    validates it, so the score moves with interpreter speed as the stages do
+    rather than with the C JSON codec alone. Stage throughput is stored
+    relative to the median of these samples, so a baseline taken on one
+    machine can be compared against runs on faster or slower hardware.
+    :func:`main` samples between sizes as well, so a machine slowing down
+    mid-run moves the score with it.
+    """
+    page = json.dumps(feature_collection(SyntheticCatalog(seed=0).generate(1000)))
+    validator = DataValidator({})
+    rates = []
+    for _ in range(samples):
+        started = time.perf_counter()
+        for _ in range(5):
+            features = json.loads(page)["features"]
+            validator.validate_batch(EventBatch.from_features(features))
+        rates.append(5 / (time.perf_counter() - started))
+    return rates
+
+
+def _result(name: str, size: int, seconds: float, repeat: int) -> Dict[str, Any]:
+    result = {
+        "stage": name,
+        "size": size,
+        "seconds": round(seconds, 6),
+        "events_per_sec": round(size / seconds, 1) if seconds > 0 else None,
+        "repeat": repeat,
+    }
+    logging.info(
+        f"{name:<32} n={size:<9} {seconds:>9.4f}s  "
+        f"{result['events_per_sec'] or 0:>12.0f} events/s"
+    )
+    return result
+
+
+def _time_stage(
+    name: str,
+    size: int,
+    repeat: int,
+    run: Callable[[], Optional[float]],
+) -> Dict[str, Any]:
+    """Run ``run`` ``repeat`` times and keep the fastest wall time.
+
+    ``run`` may return a number of seconds to subtract from the measurement
+    (harness overhead such as building mocked responses).
+    """
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        overhead = run() or 0.0
+        timings.append(time.perf_counter() - started - overhead)
+    return _result(name, size, min(timings), repeat)
+
+
+def bench_fetch(size: int, seed: int, repeat: int) -> Dict[str, Any]:
+    def run():
+        client = USGSAPIClient(API_CONFIG)
+        client.session = MockedSession(SyntheticCatalog(seed=seed), size)
+        # fetch_earthquakes would hold the whole window; count page by page.
+        fetched = sum(
+            len(features)
+            for _, features in client._iter_pages(
+                datetime(2024, 1, 1, tzinfo=timezone.utc),
+                datetime(2024, 1, 8, tzinfo=timezone.utc),
+            )
+        )
+        assert fetched == size
+        return client.session.build_seconds
+
+    return _time_stage("fetch_parse", size, repeat, run)
+
+
+def _pages(size: int, seed: int) -> Iterator[List[Dict[str, Any]]]:
+    return SyntheticCatalog(seed=seed).iter_pages(size, PAGE_SIZE)
+
+
+def _timed(totals: Dict[str, float], stage: str, run: Callable[[], Any]) -> Any:
+    started = time.perf_counter()
+    value = run()
+    totals[stage] = totals.get(stage, 0.0) + time.perf_counter() - started
+    return value
+
+
+def bench_pages(size: int, seed: int, repeat: int) -> List[Dict[str, Any]]:
+    """Time the in-memory stages page by page; page generation is not timed."""
+    validator = DataValidator({})
+    REGIONS.load()
+    timings: Dict[str, List[float]] = {}
+    for _ in range(repeat):
+        totals: Dict[str, float] = {}
+        for features in _pages(size, seed):
+            _timed(totals, "validate_batch", lambda: validator.validate_batch(features))
+            batch = _timed(
+                totals, "event_batch", lambda: EventBatch.from_features(features)
+            )
+            valid, _ = _timed(
+                totals, "validate_event_batch", lambda: validator.validate_batch(batch)
+            )
+            _timed(
+                totals,
+                "python_transform_rows",
+                lambda: build_rows(valid, BATCH_ID, REGIONS),
+            )
+            _timed(
+                totals,
+                "region_lookup",
+                lambda: REGIONS.classify_many(valid.lat, valid.lon),
+            )
+        for stage, seconds in totals.items():
+            timings.setdefault(stage, []).append(seconds)
+    return [
+        _result(stage, size, min(values), repeat) for stage, values in timings.items()
+    ]
+
+
+class ScratchSchema:
+    """Create the warehouse schema in a throwaway Postgres schema."""
+
+    def __init__(self, config: Dict[str, Any]):
+        self.name = f"bench_{uuid.uuid4().hex[:8]}"
+        config = dict(config)
+        config["database"] = dict(
+            config["database"], options=f"-c search_path={self.name}"
+        )
+        self.db = Database(config)
+
+    def reset(self) -> None:
+        with self.db.get_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(f"DROP SCHEMA IF EXISTS {self.name} CASCADE")
+                cur.execute(f"CREATE SCHEMA {self.name}")
+        self.db.apply_schema(str(SCHEMA_DIR))
+
+    def drop(self) -> None:
+        with self.db.get_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(f"DROP SCHEMA IF EXISTS {self.name} CASCADE")
+        self.db.close_pool()
+
+
+def _valid_pages(size: int, seed: int) -> Iterator[EventBatch]:
+    validator = DataValidator({})
+    for features in _pages(size, seed):
+        yield validator.validate_batch(EventBatch.from_features(features))[0]
+
+
+def bench_database(
+    size: int, seed: int, repeat: int, config: Dict[str, Any]
+) -> List[Dict[str, Any]]:
+    scratch = ScratchSchema(config)
+    results = []
+    loaded = 0
+    try:
+        timings: Dict[str, List[float]] = {}
+        for _ in range(repeat):
+            scratch.reset()
+            totals: Dict[str, float] = {}
+            loaded = 0
+            for valid in _valid_pages(size, seed):
+                _timed(
+                    totals,
+                    "load_batch",
+                    lambda: RawDataLoader(scratch.db).load_batch(valid),
+                )
+                loaded += len(valid)
+            for path in TRANSFORM_FILES:
+                _timed(
+                    totals,
+                    f"transform:{path.stem}",
+                    lambda: scratch.db.execute_sql_file(str(path)),
+                )
+            # Compare the engines end to end on identical freshly loaded data.
+            for engine_class in (SqlTransformEngine, PythonTransformEngine):
+                scratch.reset()
+                batch_id = str(uuid.uuid4())
+                engine = engine_class(scratch.db, regions=REGIONS)
+                stage = f"transform:{engine.name}_engine"
+                for valid in _valid_pages(size, seed):
+                    RawDataLoader(scratch.db).insert_batch(valid, batch_id)
+                    _timed(totals, stage, lambda: engine.on_batch_loaded(valid, batch_id))
+                _timed(totals, stage, engine.finalize)
+            for stage, seconds in totals.items():
+                timings.setdefault(stage, []).append(seconds)
+        for stage, values in timings.items():
+            results.append(_result(stage, loaded, min(values), repeat))
+    finally:
+        scratch.drop()
+    return results
+
+
+def relative_throughput(
+    results: List[Dict[str, Any]], calibration: float
+) -> Dict[str, float]:
+    """Throughput per stage and size, in units of the calibration score."""
+    return {
+        f"{r['stage']}@{r['size']}": round(r["events_per_sec"] / calibration, 4)
+        for r in results
+        if r["events_per_sec"]
+    }
+
+
+def compare_to_baseline(
+    results: List[Dict[str, Any]],
+    calibration: float,
+    baseline: Dict[str, Any],
+    tolerance: float,
+) -> List[Dict[str, Any]]:
+    """
+    Return the results whose relative throughput dropped more than ``tolerance``.
+
+    Stages that ran for less than ``MIN_GATED_SECONDS`` get a ``ratio`` but
+    are never reported as regressions.
+    """
+    expected = baseline.get("relative", {})
+    current = relative_throughput(results, calibration)
+    regressions = []
+    for result in results:
+        key = f"{result['stage']}@{result['size']}"
+        reference = expected.get(key)
+        if not reference or key not in current:
+            continue
+        ratio = current[key] / reference
+        result["ratio"] = round(ratio, 3)
+        if ratio < 1.0 - tolerance and result["seconds"] >= MIN_GATED_SECONDS:
+            regressions.append(result)
+    return regressions
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Earthquake ELT benchmarks")
+    parser.add_argument(
+        "--profile",
+        choices=sorted(PROFILES),
+        default="ci",
+        help="Size preset: ci (up to 100k) or full (up to 10M events)",
+    )
+    parser.add_argument(
+        "--sizes", default=None, help="Comma-separated event counts (overrides --profile)"
+    )
+    parser.add_argument("--seed", type=int, default=42, help="Generator seed")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per stage (min kept)")
+    parser.add_argument("--db", action="store_true", help="Include Postgres stages")
+    parser.add_argument("--config", default="config/config.toml", help="Config file")
+    parser.add_argument("--output", default="bench_output.json", help="Results file")
+    parser.add_argument("--baseline", default=str(DEFAULT_BASELINE), help="Baseline file")
+    parser.add_argument(
+        "--tolerance", type=float, default=0.3, help="Allowed throughput drop (0-1)"
+    )
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="Exit non-zero when a stage regressed against the baseline",
+    )
+    parser.add_argument(
+        "--update-baseline", action="store_true", help="Overwrite baseline with results"
+    )
+    args = parser.parse_args(argv)
+    if args.check and args.repeat < MIN_CHECK_REPEAT:
+        parser.error(f"--check needs --repeat {MIN_CHECK_REPEAT} or more")
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    # The stages log per page / per event; keep benchmark output readable.
+    logging.getLogger("earthquake_elt").setLevel(logging.ERROR)
+
+    config = load_config(args.config) if args.db else None
+    samples: List[float] = []
+    results: List[Dict[str, Any]] = []
+    sizes = args.sizes or PROFILES[args.profile]
+    for size in (int(s) for s in sizes.split(",") if s):
+        samples += calibrate()
+        results.append(bench_fetch(size, args.seed, args.repeat))
+        results.extend(bench_pages(size, args.seed, args.repeat))
+        if args.db:
+            results.extend(bench_database(size, args.seed, args.repeat, config))
+    samples += calibrate()
+    calibration = statistics.median(samples)
+    logging.info(
+        f"Calibration: {calibration:.1f} page round trips/s "
+        f"(median of {len(samples)}, spread {min(samples):.1f}-{max(samples):.1f})"
+    )
+
+    report = {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "seed": args.seed,
+        "calibration_per_sec": round(calibration, 3),
+        "results": results,
+    }
+
+    baseline_path = Path(args.baseline)
+    exit_code = 0
+    if args.update_baseline:
+        baseline = {
+            "generated_at": report["generated_at"],
+            "python": report["python"],
+            "calibration_per_sec": report["calibration_per_sec"],
+            "relative": relative_throughput(results, calibration),
+        }
+        baseline_path.write_text(json.dumps(baseline, indent=2) + "\n")
+        logging.info(f"Baseline written to {baseline_path}")
+    elif baseline_path.exists():
+        baseline = json.loads(baseline_path.read_text())
+        regressions = compare_to_baseline(results, calibration, baseline, args.tolerance)
+        report["regressions"] = regressions
+        for r in regressions:
+            (logging.error if args.check else logging.warning)(
+                f"REGRESSION {r['stage']}@{r['size']}: {r['ratio']:.0%} of the "
+                f"baseline's calibrated throughput"
+            )
+        exit_code = 1 if regressions and args.check else 0
+
+    Path(args.output).write_text(json.dumps(report, indent=2) + "\n")
+    logging.info(f"Results written to {args.output}")
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
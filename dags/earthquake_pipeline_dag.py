@@ -2,10 +2,12 @@ from airflow import DAG
 from airflow.operators.python import PythonOperator
 from datetime import datetime
 
-from earthquake_elt.pipeline import EarthquakePipeline
-
 
 def run_pipeline():
+    # Imported in the task, not at module level: the scheduler re-parses this
+    # file continuously and should not pay for the pipeline's dependencies.
+    from earthquake_elt.pipeline import EarthquakePipeline
+
     pipeline = EarthquakePipeline()
     pipeline.run()
 
@@ -101,12 +101,104 @@
 #     sys.exit(main())
 
 
+import argparse
+from datetime import datetime, timezone
+
+from earthquake_elt.config import load_config
+from earthquake_elt.database import Database
+from earthquake_elt.logging_config import setup_logging
 from earthquake_elt.pipeline import EarthquakePipeline
 
 
+def _utc(value):
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
 def main():
-    pipeline = EarthquakePipeline()
-    pipeline.run()
+    parser = argparse.ArgumentParser(description="Earthquake ELT Pipeline")
+    parser.add_argument(
+        "--config", type=str, default="config/config.toml", help="Config file"
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        default=None,
+        help="Profile each stage (reports under [profiling] output_dir)",
+    )
+    parser.add_argument(
+        "--profile-memory",
+        action="store_true",
+        default=None,
+        help="Also track peak memory per stage with tracemalloc (implies --profile)",
+    )
+    parser.add_argument(
+        "--daemon",
+        action="store_true",
+        help="Stream from the real-time feed instead of running one batch",
+    )
+    parser.add_argument(
+        "--feed",
+        type=str,
+        default=None,
+        help="Feed URL or local GeoJSON file (overrides [streaming] feed_url)",
+    )
+    parser.add_argument(
+        "--poll-interval",
+        type=float,
+        default=None,
+        help="Seconds between feed polls (overrides [streaming])",
+    )
+    parser.add_argument(
+        "--worker",
+        action="store_true",
+        help="Claim time shards of the window from ingestion_shards (run many at once)",
+    )
+    parser.add_argument(
+        "--start",
+        type=datetime.fromisoformat,
+        default=None,
+        help="Worker window start (ISO date/time, UTC)",
+    )
+    parser.add_argument(
+        "--end",
+        type=datetime.fromisoformat,
+        default=None,
+        help="Worker window end (ISO date/time, UTC)",
+    )
+    parser.add_argument(
+        "--migrate",
+        action="store_true",
+        help="Create missing tables and indexes from sql/schema, then exit",
+    )
+    parser.add_argument(
+        "--resume",
+        type=str,
+        default=None,
+        metavar="BATCH_ID",
+        help="Resume an interrupted ingestion batch from its checkpoint",
+    )
+    args = parser.parse_args()
+
+    config = load_config(args.config)
+    setup_logging(config)
+    if args.migrate:
+        Database(config).apply_schema()
+        return
+    pipeline = EarthquakePipeline(
+        args.config,
+        profile=args.profile or args.profile_memory,
+        profile_memory=args.profile_memory,
+    )
+    if args.daemon:
+        pipeline.run_daemon(feed=args.feed, poll_interval=args.poll_interval)
+    elif args.worker:
+        pipeline.run_worker(_utc(args.start), _utc(args.end))
+    elif args.resume:
+        pipeline.run_full_pipeline(batch_id=args.resume)
+    else:
+        pipeline.run()
 
 
 if __name__ == "__main__":
@@ -2,8 +2,14 @@
 -- sql/analytics/sample_queries.sql
 -- Sample Analytical Queries
 -- ============================================================================
+-- Each query follows a "-- name: <name>" line and is served under that name
+-- by the query service (earthquake_elt.analytics.queries, which defines the
+-- types and defaults of the positional $n parameters). To run one in psql:
+--   PREPARE q(numeric) AS <query>;  EXECUTE q(NULL);
+-- `make query` runs every query this way with its default parameters.
 
 -- Query 1: Magnitude distribution by region
+-- name: magnitude_by_region
 SELECT
     dl.region,
     COUNT(*) as event_count,
@@ -13,35 +19,39 @@ SELECT
     SUM(CASE WHEN f.tsunami THEN 1 ELSE 0 END) as tsunami_events
 FROM fact_earthquake_events f
 JOIN dim_location dl ON f.location_key = dl.location_key
+WHERE $1::numeric IS NULL OR f.magnitude >= $1
 GROUP BY dl.region
 ORDER BY event_count DESC;
 
 -- Query 2: Temporal patterns - events by day of week
+-- name: events_by_weekday
 SELECT
     dt.day_name,
     dt.is_weekend,
     COUNT(*) as event_count,
     ROUND(AVG(f.magnitude), 2) as avg_magnitude,
-    SUM(CASE WHEN f.magnitude >= 5.0 THEN 1 ELSE 0 END) as major_events
+    SUM(CASE WHEN f.magnitude >= $1 THEN 1 ELSE 0 END) as major_events
 FROM fact_earthquake_events f
 JOIN dim_time dt ON f.time_key = dt.time_key
 GROUP BY dt.day_name, dt.is_weekend, dt.day_of_week
 ORDER BY dt.day_of_week;
 
 -- Query 3: Significant events by depth category
+-- name: significance_by_depth
 SELECT
     dl.depth_category,
     COUNT(*) as event_count,
     ROUND(AVG(f.magnitude), 2) as avg_magnitude,
     ROUND(AVG(f.significance), 0) as avg_significance,
-    COUNT(CASE WHEN f.magnitude >= 6.0 THEN 1 END) as strong_events
+    COUNT(CASE WHEN f.magnitude >= $2 THEN 1 END) as strong_events
 FROM fact_earthquake_events f
 JOIN dim_location dl ON f.location_key = dl.location_key
-WHERE f.significance > 100
+WHERE f.significance > $1
 GROUP BY dl.depth_category
 ORDER BY avg_significance DESC;
 
 -- Query 4: Event trends over time (monthly aggregation)
+-- name: monthly_trends
 SELECT
     dt.year,
     dt.month,
@@ -52,10 +62,13 @@ SELECT
     SUM(f.significance) as total_significance
 FROM fact_earthquake_events f
 JOIN dim_time dt ON f.time_key = dt.time_key
+WHERE ($1::date IS NULL OR dt.date_actual >= $1)
+  AND ($2::date IS NULL OR dt.date_actual <= $2)
 GROUP BY dt.year, dt.month, dt.month_name
 ORDER BY dt.year, dt.month;
 
 -- Query 5: Magnitude type analysis
+-- name: magnitude_types
 SELECT
     det.magnitude_type,
     det.magnitude_category,
@@ -69,6 +82,7 @@ GROUP BY det.magnitude_type, det.magnitude_category
 ORDER BY event_count DESC;
 
 -- Query 6: High-impact events (recent, strong, with tsunami potential)
+-- name: high_impact_events
 SELECT
     f.event_id,
     dt.date_actual,
@@ -84,7 +98,7 @@ FROM fact_earthquake_events f
 JOIN dim_time dt ON f.time_key = dt.time_key
 JOIN dim_location dl ON f.location_key = dl.location_key
 JOIN dim_event_type det ON f.event_type_key = det.event_type_key
-WHERE f.magnitude >= 5.0
-  AND f.event_time >= CURRENT_DATE - INTERVAL '30 days'
+WHERE f.magnitude >= $1
+  AND f.event_time >= CURRENT_DATE - make_interval(days => $2)
 ORDER BY f.magnitude DESC, f.significance DESC
-LIMIT 20;
+LIMIT $3;
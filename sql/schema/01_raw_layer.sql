@@ -13,9 +13,9 @@ CREATE TABLE IF NOT EXISTS raw_earthquake_events (
     UNIQUE(event_id, batch_id)
 );
 
-CREATE INDEX idx_raw_events_batch ON raw_earthquake_events(batch_id);
-CREATE INDEX idx_raw_events_ingested ON raw_earthquake_events(ingested_at);
-CREATE INDEX idx_raw_events_event_id ON raw_earthquake_events(event_id);
+CREATE INDEX IF NOT EXISTS idx_raw_events_batch ON raw_earthquake_events(batch_id);
+CREATE INDEX IF NOT EXISTS idx_raw_events_ingested ON raw_earthquake_events(ingested_at);
+CREATE INDEX IF NOT EXISTS idx_raw_events_event_id ON raw_earthquake_events(event_id);
 
 -- Ingestion metadata for monitoring
 CREATE TABLE IF NOT EXISTS ingestion_metadata (
@@ -40,5 +40,5 @@ CREATE TABLE IF NOT EXISTS ingestion_errors (
     occurred_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
 );
 
-CREATE INDEX idx_errors_batch ON ingestion_errors(batch_id);
-CREATE INDEX idx_errors_occurred ON ingestion_errors(occurred_at);
\ No newline at end of file
+CREATE INDEX IF NOT EXISTS idx_errors_batch ON ingestion_errors(batch_id);
+CREATE INDEX IF NOT EXISTS idx_errors_occurred ON ingestion_errors(occurred_at);
\ No newline at end of file
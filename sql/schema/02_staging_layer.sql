@@ -22,6 +22,6 @@ CREATE TABLE IF NOT EXISTS stg_earthquakes (
     source_batch_id UUID
 );
 
-CREATE INDEX idx_stg_earthquakes_time ON stg_earthquakes(event_time);
-CREATE INDEX idx_stg_earthquakes_magnitude ON stg_earthquakes(magnitude);
-CREATE INDEX idx_stg_earthquakes_location ON stg_earthquakes(latitude, longitude);
+CREATE INDEX IF NOT EXISTS idx_stg_earthquakes_time ON stg_earthquakes(event_time);
+CREATE INDEX IF NOT EXISTS idx_stg_earthquakes_magnitude ON stg_earthquakes(magnitude);
+CREATE INDEX IF NOT EXISTS idx_stg_earthquakes_location ON stg_earthquakes(latitude, longitude);
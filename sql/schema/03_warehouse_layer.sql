@@ -53,8 +53,12 @@ CREATE TABLE IF NOT EXISTS fact_earthquake_events (
     loaded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
-CREATE INDEX idx_fact_time ON fact_earthquake_events(time_key);
-CREATE INDEX idx_fact_location ON fact_earthquake_events(location_key);
-CREATE INDEX idx_fact_event_type ON fact_earthquake_events(event_type_key);
-CREATE INDEX idx_fact_magnitude ON fact_earthquake_events(magnitude);
-CREATE INDEX idx_fact_event_time ON fact_earthquake_events(event_time);
\ No newline at end of file
+CREATE INDEX IF NOT EXISTS idx_fact_time ON fact_earthquake_events(time_key);
+CREATE INDEX IF NOT EXISTS idx_fact_location ON fact_earthquake_events(location_key);
+CREATE INDEX IF NOT EXISTS idx_fact_event_type ON fact_earthquake_events(event_type_key);
+CREATE INDEX IF NOT EXISTS idx_fact_magnitude ON fact_earthquake_events(magnitude);
+CREATE INDEX IF NOT EXISTS idx_fact_event_time ON fact_earthquake_events(event_time);
+
+-- Locations still waiting for a region (assign_regions runs after every load)
+CREATE INDEX IF NOT EXISTS idx_location_region_missing ON dim_location(location_key)
+    WHERE region IS NULL;
\ No newline at end of file
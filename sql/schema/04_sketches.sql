@@ -0,0 +1,23 @@
+-- ============================================================================
+-- sql/schema/04_sketches.sql
+-- Sketch Layer: Mergeable Daily Summaries for Approximate Analytics
+-- ============================================================================
+
+-- One EventSketch (earthquake_elt.analytics.sketches) per day and magnitude type
+CREATE TABLE IF NOT EXISTS sketch_daily (
+    day DATE NOT NULL,
+    magnitude_type VARCHAR(10) NOT NULL,
+    event_count BIGINT NOT NULL,
+    sketch BYTEA NOT NULL,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (day, magnitude_type)
+);
+
+-- Highest fact_key already folded into sketch_daily (single row)
+CREATE TABLE IF NOT EXISTS sketch_state (
+    id BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (id),
+    last_fact_key BIGINT NOT NULL DEFAULT 0
+);
+
+INSERT INTO sketch_state (id, last_fact_key) VALUES (TRUE, 0)
+ON CONFLICT (id) DO NOTHING;
@@ -0,0 +1,24 @@
+-- ============================================================================
+-- sql/schema/05_coordination.sql
+-- Coordination: Time shards claimed by parallel ingestion workers
+-- ============================================================================
+
+-- One row per shard of a run's time window (earthquake_elt.coordination)
+CREATE TABLE IF NOT EXISTS ingestion_shards (
+    shard_id BIGSERIAL PRIMARY KEY,
+    run_key TEXT NOT NULL,
+    start_time TIMESTAMPTZ NOT NULL,
+    end_time TIMESTAMPTZ NOT NULL,
+    status VARCHAR(20) NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    claimed_by TEXT,
+    claimed_at TIMESTAMPTZ,
+    lease_expires_at TIMESTAMPTZ,
+    finished_at TIMESTAMPTZ,
+    batch_id UUID,
+    events_loaded INTEGER,
+    error_message TEXT,
+    UNIQUE(run_key, start_time)
+);
+
+CREATE INDEX IF NOT EXISTS idx_shards_claim ON ingestion_shards(run_key, status, start_time);
@@ -0,0 +1,32 @@
+-- ============================================================================
+-- sql/schema/06_checkpoints.sql
+-- Checkpoints: Raw-layer pages committed per ingestion batch
+-- ============================================================================
+
+-- One row per batch (earthquake_elt.ingestion.checkpoint); completed_offsets
+-- is updated in the same transaction as the page's raw rows. event_count is
+-- the window's size when its offsets were taken; a different count on resume
+-- means the offsets have shifted. last_event_id ends the highest committed
+-- page, for windows that cannot be counted.
+CREATE TABLE IF NOT EXISTS ingestion_checkpoints (
+    batch_id UUID PRIMARY KEY,
+    start_time TIMESTAMPTZ NOT NULL,
+    end_time TIMESTAMPTZ NOT NULL,
+    page_size INTEGER NOT NULL,
+    event_count INTEGER,
+    last_event_id TEXT,
+    completed_offsets INTEGER[] NOT NULL DEFAULT '{}',
+    events_fetched INTEGER NOT NULL DEFAULT 0,
+    events_valid INTEGER NOT NULL DEFAULT 0,
+    events_invalid INTEGER NOT NULL DEFAULT 0,
+    events_loaded INTEGER NOT NULL DEFAULT 0,
+    status VARCHAR(20) NOT NULL DEFAULT 'running',
+    started_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+-- Tables created before these columns existed
+ALTER TABLE ingestion_checkpoints ADD COLUMN IF NOT EXISTS event_count INTEGER;
+ALTER TABLE ingestion_checkpoints ADD COLUMN IF NOT EXISTS last_event_id TEXT;
+
+CREATE INDEX IF NOT EXISTS idx_checkpoints_status ON ingestion_checkpoints(status, updated_at);
@@ -0,0 +1,167 @@
+-- ============================================================================
+-- sql/transformations/load_events.sql
+-- Transform: Raw → Staging → Warehouse for one micro-batch
+-- Parameters: %(batch_id)s (raw batch to stage), %(event_ids)s (its event ids)
+-- Unlike the batch scripts, revised events overwrite their staging and fact rows.
+-- ============================================================================
+
+-- Serialize with other transform runs (earthquake_elt.coordination.TRANSFORM_LOCK)
+SELECT pg_advisory_xact_lock(hashtext('earthquake_elt.transform'));
+
+-- Stage the latest revision of each event in the batch
+INSERT INTO stg_earthquakes (
+    event_id,
+    magnitude,
+    magnitude_type,
+    place,
+    event_time,
+    updated_time,
+    latitude,
+    longitude,
+    depth,
+    status,
+    tsunami,
+    significance,
+    source_batch_id
+)
+SELECT DISTINCT ON (raw_data->>'id')
+    raw_data->>'id' as event_id,
+    NULLIF(raw_data->'properties'->>'mag', '')::DECIMAL(3,2) as magnitude,
+    raw_data->'properties'->>'magType' as magnitude_type,
+    raw_data->'properties'->>'place' as place,
+    TO_TIMESTAMP((raw_data->'properties'->>'time')::BIGINT / 1000.0) as event_time,
+    TO_TIMESTAMP((raw_data->'properties'->>'updated')::BIGINT / 1000.0) as updated_time,
+    (raw_data->'geometry'->'coordinates'->>1)::DECIMAL(9,6) as latitude,
+    (raw_data->'geometry'->'coordinates'->>0)::DECIMAL(9,6) as longitude,
+    (raw_data->'geometry'->'coordinates'->>2)::DECIMAL(8,3) as depth,
+    raw_data->'properties'->>'status' as status,
+    COALESCE((raw_data->'properties'->>'tsunami')::INTEGER::BOOLEAN, FALSE) as tsunami,
+    (raw_data->'properties'->>'sig')::INTEGER as significance,
+    batch_id as source_batch_id
+FROM raw_earthquake_events
+WHERE batch_id = %(batch_id)s
+  AND raw_data->'properties'->>'mag' IS NOT NULL
+  AND raw_data->'geometry'->'coordinates' IS NOT NULL
+ORDER BY raw_data->>'id', (raw_data->'properties'->>'updated')::BIGINT DESC, id DESC
+ON CONFLICT (event_id) DO UPDATE SET
+    magnitude = EXCLUDED.magnitude,
+    magnitude_type = EXCLUDED.magnitude_type,
+    place = EXCLUDED.place,
+    event_time = EXCLUDED.event_time,
+    updated_time = EXCLUDED.updated_time,
+    latitude = EXCLUDED.latitude,
+    longitude = EXCLUDED.longitude,
+    depth = EXCLUDED.depth,
+    status = EXCLUDED.status,
+    tsunami = EXCLUDED.tsunami,
+    significance = EXCLUDED.significance,
+    processed_at = CURRENT_TIMESTAMP,
+    source_batch_id = EXCLUDED.source_batch_id
+WHERE stg_earthquakes.updated_time IS NULL
+   OR stg_earthquakes.updated_time <= EXCLUDED.updated_time;
+
+-- Populate time dimension
+INSERT INTO dim_time (
+    date_actual, year, quarter, month, month_name, day,
+    day_of_week, day_name, week_of_year, is_weekend
+)
+SELECT DISTINCT
+    event_time::DATE as date_actual,
+    EXTRACT(YEAR FROM event_time)::INTEGER as year,
+    EXTRACT(QUARTER FROM event_time)::INTEGER as quarter,
+    EXTRACT(MONTH FROM event_time)::INTEGER as month,
+    TO_CHAR(event_time, 'Month') as month_name,
+    EXTRACT(DAY FROM event_time)::INTEGER as day,
+    EXTRACT(DOW FROM event_time)::INTEGER as day_of_week,
+    TO_CHAR(event_time, 'Day') as day_name,
+    EXTRACT(WEEK FROM event_time)::INTEGER as week_of_year,
+    EXTRACT(DOW FROM event_time) IN (0, 6) as is_weekend
+FROM stg_earthquakes
+WHERE event_id = ANY(%(event_ids)s)
+ON CONFLICT (date_actual) DO NOTHING;
+
+-- Populate location dimension
+INSERT INTO dim_location (
+    latitude, longitude, depth_category, region, place
+)
+SELECT DISTINCT ON (latitude, longitude, place)
+    latitude,
+    longitude,
+    CASE
+        WHEN depth < 70 THEN 'Shallow'
+        WHEN depth < 300 THEN 'Intermediate'
+        ELSE 'Deep'
+    END as depth_category,
+    NULL as region,  -- assigned by earthquake_elt.regions after the load
+    place
+FROM stg_earthquakes
+WHERE event_id = ANY(%(event_ids)s)
+  AND NOT EXISTS (
+    SELECT 1 FROM dim_location l
+    WHERE l.latitude = stg_earthquakes.latitude
+      AND l.longitude = stg_earthquakes.longitude
+      AND COALESCE(l.place, '') = COALESCE(stg_earthquakes.place, '')
+);
+
+-- Populate event type dimension
+INSERT INTO dim_event_type (
+    magnitude_type, magnitude_category, description
+)
+SELECT DISTINCT
+    magnitude_type,
+    CASE
+        WHEN magnitude_type IN ('mb', 'mb_lg') THEN 'Body Wave'
+        WHEN magnitude_type IN ('ms', 'ms_20') THEN 'Surface Wave'
+        WHEN magnitude_type IN ('mw', 'mww', 'mwc', 'mwb') THEN 'Moment'
+        WHEN magnitude_type IN ('ml', 'mlg') THEN 'Local'
+        WHEN magnitude_type IN ('md') THEN 'Duration'
+        ELSE 'Other'
+    END as magnitude_category,
+    CASE
+        WHEN magnitude_type IN ('mb', 'mb_lg') THEN 'Body wave magnitude'
+        WHEN magnitude_type IN ('ms', 'ms_20') THEN 'Surface wave magnitude'
+        WHEN magnitude_type IN ('mw', 'mww', 'mwc', 'mwb') THEN 'Moment magnitude'
+        WHEN magnitude_type IN ('ml', 'mlg') THEN 'Local (Richter) magnitude'
+        WHEN magnitude_type IN ('md') THEN 'Duration magnitude'
+        ELSE 'Other magnitude type'
+    END as description
+FROM stg_earthquakes
+WHERE event_id = ANY(%(event_ids)s)
+  AND magnitude_type IS NOT NULL
+ON CONFLICT (magnitude_type) DO NOTHING;
+
+-- Upsert facts
+INSERT INTO fact_earthquake_events (
+    event_id, time_key, location_key, event_type_key,
+    magnitude, depth, significance, tsunami, status, event_time
+)
+SELECT
+    se.event_id,
+    dt.time_key,
+    dl.location_key,
+    det.event_type_key,
+    se.magnitude,
+    se.depth,
+    se.significance,
+    se.tsunami,
+    se.status,
+    se.event_time
+FROM stg_earthquakes se
+LEFT JOIN dim_time dt ON dt.date_actual = se.event_time::DATE
+LEFT JOIN dim_location dl ON
+    dl.latitude = se.latitude
+    AND dl.longitude = se.longitude
+    AND COALESCE(dl.place, '') = COALESCE(se.place, '')
+LEFT JOIN dim_event_type det ON det.magnitude_type = se.magnitude_type
+WHERE se.event_id = ANY(%(event_ids)s)
+ON CONFLICT (event_id) DO UPDATE SET
+    time_key = EXCLUDED.time_key,
+    location_key = EXCLUDED.location_key,
+    event_type_key = EXCLUDED.event_type_key,
+    magnitude = EXCLUDED.magnitude,
+    depth = EXCLUDED.depth,
+    significance = EXCLUDED.significance,
+    tsunami = EXCLUDED.tsunami,
+    status = EXCLUDED.status,
+    event_time = EXCLUDED.event_time,
+    loaded_at = CURRENT_TIMESTAMP;
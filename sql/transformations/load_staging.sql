@@ -3,6 +3,9 @@
 -- Transform: Raw → Staging
 -- ============================================================================
 
+-- Serialize with other transform runs (earthquake_elt.coordination.TRANSFORM_LOCK)
+SELECT pg_advisory_xact_lock(hashtext('earthquake_elt.transform'));
+
 -- Load staging from raw layer (incremental)
 INSERT INTO stg_earthquakes (
     event_id,
@@ -19,7 +22,7 @@ INSERT INTO stg_earthquakes (
     significance,
     source_batch_id
 )
-SELECT DISTINCT
+SELECT DISTINCT ON (raw_data->>'id')
     raw_data->>'id' as event_id,
     NULLIF(raw_data->'properties'->>'mag', '')::DECIMAL(3,2) as magnitude,
     raw_data->'properties'->>'magType' as magnitude_type,
@@ -39,4 +42,8 @@ WHERE NOT EXISTS (
     WHERE s.event_id = raw_earthquake_events.raw_data->>'id'
 )
 AND raw_data->'properties'->>'mag' IS NOT NULL
-AND raw_data->'geometry'->'coordinates' IS NOT NULL;
+AND raw_data->'geometry'->'coordinates' IS NOT NULL
+-- An event can have several raw revisions (e.g. from the streaming daemon);
+-- stage only the latest.
+ORDER BY raw_data->>'id', (raw_data->'properties'->>'updated')::BIGINT DESC, id DESC
+ON CONFLICT (event_id) DO NOTHING;
@@ -3,6 +3,9 @@
 -- Transform: Staging → Warehouse (Star Schema)
 -- ============================================================================
 
+-- Serialize with other transform runs (earthquake_elt.coordination.TRANSFORM_LOCK)
+SELECT pg_advisory_xact_lock(hashtext('earthquake_elt.transform'));
+
 -- Populate time dimension (for date range in staging)
 INSERT INTO dim_time (
     date_actual, year, quarter, month, month_name, day,
@@ -23,7 +26,8 @@ FROM stg_earthquakes
 WHERE NOT EXISTS (
     SELECT 1 FROM dim_time t
     WHERE t.date_actual = event_time::DATE
-);
+)
+ON CONFLICT (date_actual) DO NOTHING;
 
 -- Populate location dimension
 INSERT INTO dim_location (
@@ -37,17 +41,7 @@ SELECT DISTINCT
         WHEN depth < 300 THEN 'Intermediate'
         ELSE 'Deep'
     END as depth_category,
-    CASE
-        WHEN latitude BETWEEN 24 AND 49 AND longitude BETWEEN -125 AND -65
-            THEN 'Continental US'
-        WHEN latitude BETWEEN 55 AND 72 AND longitude BETWEEN -170 AND -140
-            THEN 'Alaska'
-        WHEN latitude BETWEEN 18 AND 23 AND longitude BETWEEN -161 AND -154
-            THEN 'Hawaii'
-        WHEN latitude BETWEEN -90 AND -60
-            THEN 'Antarctica'
-        ELSE 'Other'
-    END as region,
+    NULL as region,  -- assigned by earthquake_elt.regions after the load
     place
 FROM stg_earthquakes
 WHERE NOT EXISTS (
@@ -55,7 +49,8 @@ WHERE NOT EXISTS (
     WHERE l.latitude = stg_earthquakes.latitude
       AND l.longitude = stg_earthquakes.longitude
       AND COALESCE(l.place, '') = COALESCE(stg_earthquakes.place, '')
-);
+)
+ON CONFLICT DO NOTHING;
 
 -- Populate event type dimension
 INSERT INTO dim_event_type (
@@ -84,7 +79,8 @@ WHERE magnitude_type IS NOT NULL
   AND NOT EXISTS (
     SELECT 1 FROM dim_event_type e
     WHERE e.magnitude_type = stg_earthquakes.magnitude_type
-);
+)
+ON CONFLICT (magnitude_type) DO NOTHING;
 
 -- Populate fact table
 INSERT INTO fact_earthquake_events (
@@ -112,4 +108,5 @@ LEFT JOIN dim_event_type det ON det.magnitude_type = se.magnitude_type
 WHERE NOT EXISTS (
     SELECT 1 FROM fact_earthquake_events f
     WHERE f.event_id = se.event_id
-);
+)
+ON CONFLICT (event_id) DO NOTHING;
@@ -0,0 +1,36 @@
+import importlib
+
+from .cache import QueryCache
+from .queries import INVALIDATION_CHANNEL, QUERIES, AnalyticsQuery, QueryParam
+
+# The service pulls in http.server and the database layer, so it and the
+# sketches are imported on first attribute access (the pipeline only needs
+# INVALIDATION_CHANNEL at import time).
+_EXPORTS = {
+    "QueryService": ".service",
+    "QueryServer": ".service",
+    "CacheInvalidationListener": ".service",
+    "EventSketch": ".sketches",
+    "SketchStore": ".sketches",
+}
+
+__all__ = [
+    "AnalyticsQuery",
+    "INVALIDATION_CHANNEL",
+    "QUERIES",
+    "QueryCache",
+    "QueryParam",
+    *_EXPORTS,
+]
+
+
+def __getattr__(name: str):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,70 @@
+# ============================================================================
+# FILE: src/earthquake_elt/analytics/cache.py
+# ============================================================================
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+class QueryCache:
+    """
+    Thread-safe LRU cache with a per-entry time to live.
+
+    ``invalidate`` drops everything at once and bumps :attr:`generation`.
+    A caller computing a value reads the generation first and passes it to
+    :meth:`set`, so a result computed across an invalidation is discarded
+    instead of being cached as fresh.
+    """
+
+    def __init__(
+        self, maxsize: int = 256, ttl: float = 300.0, clock: Callable[[], float] = None
+    ):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock or time.monotonic
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.generation = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value, or ``None`` if missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= self._clock():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: Hashable, value: Any, generation: Optional[int] = None) -> bool:
+        """Store ``value``; returns ``False`` if ``generation`` is out of date."""
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return False
+            self._entries[key] = (self._clock() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+            return True
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.generation += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.generation,
+            }
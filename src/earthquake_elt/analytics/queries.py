@@ -0,0 +1,197 @@
+# ============================================================================
+# FILE: src/earthquake_elt/analytics/queries.py
+# ============================================================================
+"""
+The named queries of ``sql/analytics/sample_queries.sql``.
+
+The SQL lives only in that file, one query per ``-- name: <name>`` block; this
+module adds each query's typed parameters. Each query is prepared once per
+connection (``PREPARE``) and executed with typed parameters parsed from the
+request. The file is read on first use of :data:`QUERIES`, so importing the
+package does not depend on the working directory.
+"""
+
+import re
+import threading
+from datetime import date
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Optional, Tuple
+
+# Postgres channel the pipeline notifies after the warehouse changes.
+INVALIDATION_CHANNEL = "earthquake_warehouse_updated"
+
+
+class QueryParam:
+    """Typed query parameter; a ``None`` default leaves the filter off."""
+
+    def __init__(
+        self, name: str, pg_type: str, parse: Callable[[str], Any], default: Any
+    ):
+        self.name = name
+        self.pg_type = pg_type
+        self.parse = parse
+        self.default = default
+
+
+class AnalyticsQuery:
+    """Named read-only query with positional ``$n`` parameters."""
+
+    def __init__(self, name: str, description: str, sql: str, params: List[QueryParam]):
+        self.name = name
+        self.description = description
+        self.sql = sql.strip()
+        self.params = params
+
+    @property
+    def statement_name(self) -> str:
+        return f"analytics_{self.name}"
+
+    @property
+    def prepare_sql(self) -> str:
+        types = ", ".join(p.pg_type for p in self.params)
+        signature = f"({types})" if types else ""
+        return f"PREPARE {self.statement_name}{signature} AS {self.sql}"
+
+    @property
+    def execute_sql(self) -> str:
+        args = ", ".join(["%s"] * len(self.params))
+        return (
+            f"EXECUTE {self.statement_name}({args})"
+            if args
+            else (f"EXECUTE {self.statement_name}")
+        )
+
+    def bind(self, raw: Mapping[str, str]) -> Tuple[Any, ...]:
+        """Parse request arguments into positional values; raises ``ValueError``."""
+        unknown = set(raw) - {p.name for p in self.params}
+        if unknown:
+            raise ValueError(f"Unknown parameter(s): {', '.join(sorted(unknown))}")
+        values = []
+        for param in self.params:
+            if param.name in raw:
+                try:
+                    values.append(param.parse(raw[param.name]))
+                except (TypeError, ValueError):
+                    raise ValueError(
+                        f"Invalid value for {param.name}: {raw[param.name]!r}"
+                    )
+            else:
+                values.append(param.default)
+        return tuple(values)
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "description": self.description,
+            "params": {
+                p.name: None if p.default is None else str(p.default) for p in self.params
+            },
+        }
+
+
+def _positive_int(value: str) -> int:
+    parsed = int(value)
+    if parsed <= 0:
+        raise ValueError("must be positive")
+    return parsed
+
+
+QUERIES_SQL = "sql/analytics/sample_queries.sql"
+
+# Typed parameters of each named query, in ``$n`` order.
+QUERY_PARAMS: Dict[str, List[QueryParam]] = {
+    "magnitude_by_region": [QueryParam("min_magnitude", "numeric", float, None)],
+    "events_by_weekday": [QueryParam("major_magnitude", "numeric", float, 5.0)],
+    "significance_by_depth": [
+        QueryParam("min_significance", "integer", int, 100),
+        QueryParam("strong_magnitude", "numeric", float, 6.0),
+    ],
+    "monthly_trends": [
+        QueryParam("start_date", "date", date.fromisoformat, None),
+        QueryParam("end_date", "date", date.fromisoformat, None),
+    ],
+    "magnitude_types": [],
+    "high_impact_events": [
+        QueryParam("min_magnitude", "numeric", float, 5.0),
+        QueryParam("days", "integer", _positive_int, 30),
+        QueryParam("limit", "integer", _positive_int, 20),
+    ],
+}
+
+_NAME = re.compile(r"^-- name: (\w+)\s*$", re.MULTILINE)
+_TITLE = re.compile(r"^-- Query \d+: (.+)$", re.MULTILINE)
+
+
+def parse_named_queries(text: str) -> Dict[str, Tuple[str, str]]:
+    """Map each ``-- name:`` block of ``text`` to ``(description, sql)``."""
+    blocks = _NAME.split(text)
+    queries = {}
+    # blocks = [preamble, name1, body1, name2, body2, ...]; a block's title
+    # comment sits at the end of the text before its name line.
+    for i in range(1, len(blocks), 2):
+        titles = _TITLE.findall(blocks[i - 1])
+        body = _TITLE.split(blocks[i + 1])[0]
+        sql = "\n".join(
+            line for line in body.splitlines() if not line.startswith("--")
+        ).strip()
+        queries[blocks[i]] = (titles[-1] if titles else blocks[i], sql.rstrip(";"))
+    return queries
+
+
+def load_queries(path: str = QUERIES_SQL) -> Dict[str, AnalyticsQuery]:
+    """Read the named queries in ``path`` and attach their parameters."""
+    with open(path, "r") as f:
+        parsed = parse_named_queries(f.read())
+    missing = set(QUERY_PARAMS) ^ set(parsed)
+    if missing:
+        raise ValueError(
+            f"{path} and QUERY_PARAMS disagree on queries: {', '.join(sorted(missing))}"
+        )
+    return {
+        name: AnalyticsQuery(name, description, sql, QUERY_PARAMS[name])
+        for name, (description, sql) in parsed.items()
+    }
+
+
+class _QueryCatalog(Mapping):
+    """Read-only mapping of the named queries, loaded on first access."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._queries: Optional[Dict[str, AnalyticsQuery]] = None
+        self._lock = threading.Lock()
+
+    def _load(self) -> Dict[str, AnalyticsQuery]:
+        if self._queries is None:
+            with self._lock:
+                if self._queries is None:
+                    self._queries = load_queries(self.path)
+        return self._queries
+
+    def __getitem__(self, name: str) -> AnalyticsQuery:
+        return self._load()[name]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._load())
+
+    def __len__(self) -> int:
+        return len(self._load())
+
+
+QUERIES: Mapping[str, AnalyticsQuery] = _QueryCatalog(QUERIES_SQL)
+
+
+def psql_script(queries: Mapping[str, AnalyticsQuery] = QUERIES) -> str:
+    """A psql script that runs every query once with its default parameters."""
+    lines = []
+    for query in queries.values():
+        args = ", ".join(
+            "NULL" if p.default is None else f"'{p.default}'" for p in query.params
+        )
+        execute = f"EXECUTE {query.statement_name}"
+        lines += [
+            f"\\echo {query.name}",
+            f"{query.prepare_sql};",
+            f"{execute}({args});" if args else f"{execute};",
+            f"DEALLOCATE {query.statement_name};",
+        ]
+    return "\n".join(lines) + "\n"
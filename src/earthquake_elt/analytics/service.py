@@ -0,0 +1,403 @@
+# ============================================================================
+# FILE: src/earthquake_elt/analytics/service.py
+# ============================================================================
+"""
+Read-only HTTP service for the warehouse analytics queries.
+
+Endpoints (all ``GET``, JSON responses)::
+
+    /health                     liveness
+    /queries                    available queries and their parameters
+    /queries/<name>?param=...   run a query (served from cache when possible)
+    /cache                      cache statistics
+    /regions?lat=..&lon=..      region of each point (comma-separated lists)
+
+Results are cached per (query, parameters) until their TTL expires or the
+pipeline sends ``NOTIFY earthquake_warehouse_updated`` after a load, which
+clears the cache. Concurrent misses for the same key share one database
+round-trip.
+
+Run with ``python -m earthquake_elt.analytics.service --config config/config.toml``.
+"""
+
+import argparse
+import json
+import logging
+import select
+import threading
+import time
+import weakref
+from datetime import date, datetime
+from decimal import Decimal
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlparse
+
+from earthquake_elt.config import load_config
+from earthquake_elt.database import Database
+from earthquake_elt.regions import RegionClassifier
+
+from .cache import QueryCache
+from .queries import INVALIDATION_CHANNEL, QUERIES, AnalyticsQuery, psql_script
+
+logger = logging.getLogger(__name__)
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class _Call:
+    """A query execution other requests for the same key can wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Optional[bytes] = None
+        self.error: Optional[BaseException] = None
+
+
+class QueryService:
+    """
+    Runs the named analytics queries over a pooled, read-only ``Database``.
+
+    Each pooled connection is switched to a read-only session and prepares a
+    query the first time it runs it. Results are cached as encoded JSON.
+    """
+
+    def __init__(
+        self,
+        db: Database,
+        cache: QueryCache,
+        max_concurrency: int,
+        regions: Optional[RegionClassifier] = None,
+    ):
+        self.db = db
+        self.cache = cache
+        self.regions = regions or RegionClassifier()
+        # Never ask the pool for more connections than it can hand out.
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._prepared: "weakref.WeakKeyDictionary[Any, set]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self._inflight: Dict[Tuple, _Call] = {}
+        self._inflight_lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "QueryService":
+        service_config = config.get("query_service", {})
+        cache = QueryCache(
+            maxsize=service_config.get("cache_size", 256),
+            ttl=service_config.get("cache_ttl_seconds", 300),
+        )
+        return cls(
+            Database(config, threaded=True),
+            cache,
+            max_concurrency=config["database"]["pool_size"],
+            regions=RegionClassifier.from_config(config),
+        )
+
+    def run(self, name: str, raw_params: Mapping[str, str]) -> Tuple[bytes, bool]:
+        """
+        Return the JSON-encoded result of query ``name`` and whether it came
+        from the cache. Raises ``KeyError`` for an unknown query and
+        ``ValueError`` for bad parameters.
+        """
+        query = QUERIES[name]
+        key = (name, query.bind(raw_params))
+        body = self.cache.get(key)
+        if body is not None:
+            return body, True
+
+        with self._inflight_lock:
+            call = self._inflight.get(key)
+            leader = call is None
+            if leader:
+                call = self._inflight[key] = _Call()
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            generation = self.cache.generation
+            call.result = self._execute(query, key[1])
+            self.cache.set(key, call.result, generation)
+            return call.result, False
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._inflight_lock:
+                del self._inflight[key]
+            call.done.set()
+
+    def classify(self, raw_params: Mapping[str, str]) -> Dict[str, Any]:
+        """Regions for the comma-separated ``lat``/``lon`` lists (no database)."""
+        try:
+            lats = [float(v) for v in raw_params["lat"].split(",")]
+            lons = [float(v) for v in raw_params["lon"].split(",")]
+        except KeyError as e:
+            raise ValueError(f"Missing parameter: {e.args[0]}") from None
+        except ValueError:
+            raise ValueError("lat and lon must be numbers") from None
+        if len(lats) != len(lons):
+            raise ValueError("lat and lon must have the same number of values")
+        if any(abs(lat) > 90 for lat in lats) or any(abs(lon) > 180 for lon in lons):
+            raise ValueError("Coordinates out of range")
+        return {
+            "points": [
+                {"lat": lat, "lon": lon, "region": region}
+                for lat, lon, region in zip(
+                    lats, lons, self.regions.classify_many(lats, lons)
+                )
+            ]
+        }
+
+    def _execute(self, query: AnalyticsQuery, values: Tuple[Any, ...]) -> bytes:
+        started = time.perf_counter()
+        with self._slots, self.db.get_connection() as conn:
+            try:
+                self._prepare(conn, query)
+                with conn.cursor() as cur:
+                    cur.execute(query.execute_sql, values)
+                    columns = [column[0] for column in cur.description]
+                    rows = cur.fetchall()
+            except Exception:
+                # The session may be left with or without the statement;
+                # start over on this connection next time.
+                self._prepared.pop(conn, None)
+                raise
+        logger.info(
+            f"Query {query.name} returned {len(rows)} rows "
+            f"in {time.perf_counter() - started:.3f}s"
+        )
+        payload = {
+            "query": query.name,
+            "params": {p.name: v for p, v in zip(query.params, values)},
+            "columns": columns,
+            "rows": [dict(zip(columns, row)) for row in rows],
+        }
+        return json.dumps(payload, default=_json_default).encode("utf-8")
+
+    def _prepare(self, conn, query: AnalyticsQuery) -> None:
+        prepared = self._prepared.get(conn)
+        if prepared is None:
+            conn.rollback()
+            conn.set_session(readonly=True)
+            with conn.cursor() as cur:
+                cur.execute("DEALLOCATE ALL")
+            prepared = self._prepared[conn] = set()
+        if query.name not in prepared:
+            with conn.cursor() as cur:
+                cur.execute(query.prepare_sql)
+            prepared.add(query.name)
+
+    def invalidate(self) -> None:
+        self.cache.invalidate()
+        logger.info("Query cache invalidated")
+
+    def close(self) -> None:
+        self.db.close_pool()
+
+
+class CacheInvalidationListener:
+    """
+    Background ``LISTEN`` on the pipeline's notification channel.
+
+    Every notification clears the cache. The cache is also cleared after each
+    (re)connect, since notifications sent while disconnected are lost.
+    """
+
+    def __init__(
+        self,
+        db: Database,
+        service: QueryService,
+        channel: str = INVALIDATION_CHANNEL,
+        poll_interval: float = 5.0,
+        reconnect_delay: float = 5.0,
+    ):
+        self.db = db
+        self.service = service
+        self.channel = channel
+        self.poll_interval = poll_interval
+        self.reconnect_delay = reconnect_delay
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "CacheInvalidationListener":
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            conn = None
+            try:
+                conn = self.db.connect()
+                conn.autocommit = True
+                with conn.cursor() as cur:
+                    cur.execute(f"LISTEN {self.channel}")
+                logger.info(f"Listening for cache invalidations on {self.channel}")
+                self.service.invalidate()
+                while not self._stop.is_set():
+                    if select.select([conn], [], [], self.poll_interval)[0]:
+                        conn.poll()
+                        if conn.notifies:
+                            conn.notifies.clear()
+                            self.service.invalidate()
+            except Exception as e:
+                logger.error(f"Invalidation listener error: {str(e)}")
+                self._stop.wait(self.reconnect_delay)
+            finally:
+                if conn is not None:
+                    conn.close()
+
+
+class _QueryHandler(BaseHTTPRequestHandler):
+    server: "_QueryHTTPServer"
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format: str, *args) -> None:
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+    def do_GET(self) -> None:
+        parsed = urlparse(self.path)
+        path = parsed.path.rstrip("/")
+        service = self.server.service
+        if path == "/health":
+            self._send_json(200, {"status": "ok"})
+        elif path == "/cache":
+            self._send_json(200, service.cache.stats())
+        elif path == "/queries":
+            self._send_json(200, [q.describe() for q in QUERIES.values()])
+        elif path == "/regions":
+            self._send_regions(service, parsed.query)
+        elif path.startswith("/queries/"):
+            name = unquote(path[len("/queries/") :])
+            params = {k: v[-1] for k, v in parse_qs(parsed.query).items()}
+            try:
+                body, cached = service.run(name, params)
+            except KeyError:
+                self._send_json(404, {"error": f"Unknown query: {name}"})
+            except ValueError as e:
+                self._send_json(400, {"error": str(e)})
+            except Exception as e:
+                logger.error(f"Query {name} failed: {str(e)}", exc_info=True)
+                self._send_json(500, {"error": "Query failed"})
+            else:
+                self._send(200, body, {"X-Cache": "HIT" if cached else "MISS"})
+        else:
+            self._send_json(404, {"error": "Not Found"})
+
+    def _send_regions(self, service: QueryService, query: str) -> None:
+        params = {k: v[-1] for k, v in parse_qs(query).items()}
+        try:
+            self._send_json(200, service.classify(params))
+        except ValueError as e:
+            self._send_json(400, {"error": str(e)})
+
+    def _send_json(self, status: int, payload: Any) -> None:
+        self._send(status, json.dumps(payload).encode("utf-8"))
+
+    def _send(self, status: int, body: bytes, headers: Dict[str, str] = None) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class _QueryHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, service: QueryService):
+        super().__init__(address, _QueryHandler)
+        self.service = service
+
+
+class QueryServer:
+    """Threaded HTTP front end for a :class:`QueryService`."""
+
+    def __init__(self, service: QueryService, host: str = "127.0.0.1", port: int = 0):
+        self.service = service
+        self._server = _QueryHTTPServer((host, port), service)
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "QueryServer":
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, kwargs={"poll_interval": 0.1}, daemon=True
+        )
+        self._thread.start()
+        logger.info(f"Query service listening on {self.url}")
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread:
+            self._thread.join()
+
+    def __enter__(self) -> "QueryServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+def main(argv: List[str] = None) -> None:
+    from earthquake_elt.logging_config import setup_logging
+
+    parser = argparse.ArgumentParser(description="Read-only analytics query service")
+    parser.add_argument("--config", default="config/config.toml")
+    parser.add_argument("--host", default=None, help="Overrides [query_service] host")
+    parser.add_argument(
+        "--port", type=int, default=None, help="Overrides [query_service] port"
+    )
+    parser.add_argument(
+        "--psql-script",
+        action="store_true",
+        help="Print a psql script running each query with its defaults, then exit",
+    )
+    args = parser.parse_args(argv)
+    if args.psql_script:
+        print(psql_script(), end="")
+        return
+
+    config = load_config(args.config)
+    setup_logging(config, log_file="logs/query_service.log")
+    service_config = config.get("query_service", {})
+    service = QueryService.from_config(config)
+    listener = CacheInvalidationListener(Database(config), service).start()
+    server = QueryServer(
+        service,
+        host=args.host or service_config.get("host", "127.0.0.1"),
+        port=args.port if args.port is not None else service_config.get("port", 8090),
+    ).start()
+    try:
+        while True:
+            time.sleep(60)
+    except KeyboardInterrupt:
+        server.stop()
+        listener.stop()
+        service.close()
+
+
+if __name__ == "__main__":
+    main()
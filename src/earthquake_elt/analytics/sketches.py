@@ -0,0 +1,532 @@
+# ============================================================================
+# FILE: src/earthquake_elt/analytics/sketches.py
+# ============================================================================
+"""
+Mergeable per-day summaries of the fact table for approximate analytics.
+
+For every (day, magnitude type) the pipeline keeps an :class:`EventSketch`:
+
+* :class:`TDigest` of magnitude and of depth (quantiles, bounded rank error)
+* :class:`HyperLogLog` of ``location_key`` (distinct locations, ~1.6% error)
+* :class:`Moments` of magnitude and of depth (exact count, mean, stddev, range)
+
+Sketches merge losslessly for moments and with bounded error for the rest,
+so :meth:`SketchStore.summarize` answers median or stddev questions over any
+date range by merging a few hundred small rows instead of sorting the fact
+table. :meth:`SketchStore.update` folds in facts inserted since its last run
+(tracked by a ``fact_key`` watermark); later revisions of an already
+sketched event are not re-counted.
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import math
+import struct
+from datetime import date
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+UNKNOWN_MAGNITUDE_TYPE = "unknown"
+
+_MAGIC = b"EQSK"
+_VERSION = 1
+
+
+class Moments:
+    """Count, mean, variance (Welford/Chan) and range of a stream of values."""
+
+    __slots__ = ("count", "mean", "m2", "min", "max")
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def merge(self, other: "Moments") -> "Moments":
+        if other.count:
+            count = self.count + other.count
+            delta = other.mean - self.mean
+            self.mean += delta * other.count / count
+            self.m2 += other.m2 + delta * delta * self.count * other.count / count
+            self.count = count
+            self.min = min(self.min, other.min)
+            self.max = max(self.max, other.max)
+        return self
+
+    @property
+    def stddev(self) -> Optional[float]:
+        """Sample standard deviation, as SQL ``STDDEV``."""
+        return math.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else None
+
+    def to_dict(self) -> Dict[str, Any]:
+        empty = self.count == 0
+        return {
+            "count": self.count,
+            "mean": None if empty else self.mean,
+            "stddev": self.stddev,
+            "min": None if empty else self.min,
+            "max": None if empty else self.max,
+        }
+
+    def _pack(self) -> bytes:
+        return struct.pack("<Q4d", self.count, self.mean, self.m2, self.min, self.max)
+
+    @classmethod
+    def _unpack(cls, data: memoryview, offset: int) -> Tuple["Moments", int]:
+        moments = cls()
+        fields = struct.unpack_from("<Q4d", data, offset)
+        moments.count, moments.mean, moments.m2, moments.min, moments.max = fields
+        return moments, offset + struct.calcsize("<Q4d")
+
+
+class TDigest:
+    """
+    Merging t-digest (Dunning & Ertl) with the ``k1`` scale function.
+
+    At most about ``compression`` centroids are kept; centroids near the
+    tails stay small, so extreme quantiles are more accurate than the median.
+    """
+
+    def __init__(self, compression: int = 100):
+        self.compression = compression
+        self.means: List[float] = []
+        self.weights: List[float] = []
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self._buffer: List[Tuple[float, float]] = []
+
+    def add(self, value: float, weight: float = 1.0) -> None:
+        self._buffer.append((value, weight))
+        self.total += weight
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        if len(self._buffer) >= 5 * self.compression:
+            self._compress()
+
+    def merge(self, other: "TDigest") -> "TDigest":
+        other._compress()
+        if other.total:
+            self._buffer.extend(zip(other.means, other.weights))
+            self.total += other.total
+            self.min = min(self.min, other.min)
+            self.max = max(self.max, other.max)
+            self._compress()
+        return self
+
+    def _compress(self) -> None:
+        if not self._buffer:
+            return
+        centroids = sorted([*zip(self.means, self.weights), *self._buffer])
+        self._buffer = []
+        means, weights = [], []
+        mean, weight = centroids[0]
+        merged_weight = 0.0
+        limit = self.total * self._q_limit(0.0)
+        for next_mean, next_weight in centroids[1:]:
+            if merged_weight + weight + next_weight <= limit:
+                weight += next_weight
+                mean += (next_mean - mean) * next_weight / weight
+            else:
+                merged_weight += weight
+                means.append(mean)
+                weights.append(weight)
+                limit = self.total * self._q_limit(merged_weight / self.total)
+                mean, weight = next_mean, next_weight
+        means.append(mean)
+        weights.append(weight)
+        self.means, self.weights = means, weights
+
+    def _q_limit(self, q: float) -> float:
+        # k1(q) = delta / 2pi * asin(2q - 1); next centroid ends at k1(q) + 1.
+        scale = self.compression / (2 * math.pi)
+        k = scale * math.asin(max(-1.0, min(1.0, 2 * q - 1))) + 1
+        return (math.sin(min(k / scale, math.pi / 2)) + 1) / 2
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimated value at quantile ``q`` (0..1); ``None`` when empty."""
+        if not 0 <= q <= 1:
+            raise ValueError(f"Quantile must be between 0 and 1, got {q}")
+        self._compress()
+        if not self.means:
+            return None
+        means, weights = self.means, self.weights
+        if len(means) == 1:
+            return means[0]
+        index = q * self.total
+        if index < weights[0] / 2:
+            return self.min + (means[0] - self.min) * index / (weights[0] / 2)
+        if index > self.total - weights[-1] / 2:
+            tail = (self.total - index) / (weights[-1] / 2)
+            return self.max - (self.max - means[-1]) * tail
+        cumulative = weights[0] / 2
+        for i in range(len(means) - 1):
+            step = (weights[i] + weights[i + 1]) / 2
+            if cumulative + step >= index:
+                return means[i] + (means[i + 1] - means[i]) * (index - cumulative) / step
+            cumulative += step
+        return self.max
+
+    def _pack(self) -> bytes:
+        self._compress()
+        header = struct.pack(
+            "<HI3d", self.compression, len(self.means), self.total, self.min, self.max
+        )
+        n = len(self.means)
+        return header + struct.pack(f"<{2 * n}d", *self.means, *self.weights)
+
+    @classmethod
+    def _unpack(cls, data: memoryview, offset: int) -> Tuple["TDigest", int]:
+        compression, n, total, low, high = struct.unpack_from("<HI3d", data, offset)
+        offset += struct.calcsize("<HI3d")
+        digest = cls(compression)
+        digest.total, digest.min, digest.max = total, low, high
+        values = struct.unpack_from(f"<{2 * n}d", data, offset)
+        digest.means, digest.weights = list(values[:n]), list(values[n:])
+        return digest, offset + 16 * n
+
+
+class HyperLogLog:
+    """HyperLogLog over 64-bit BLAKE2 hashes with ``2**precision`` registers."""
+
+    def __init__(self, precision: int = 12):
+        if not 4 <= precision <= 16:
+            raise ValueError("HyperLogLog precision must be between 4 and 16")
+        self.precision = precision
+        self.registers = bytearray(1 << precision)
+
+    def add(self, value: Any) -> None:
+        digest = hashlib.blake2b(str(value).encode("utf-8"), digest_size=8).digest()
+        hashed = int.from_bytes(digest, "big")
+        bits = 64 - self.precision
+        index = hashed >> bits
+        rank = bits - (hashed & ((1 << bits) - 1)).bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def merge(self, other: "HyperLogLog") -> "HyperLogLog":
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge HyperLogLogs of different precision")
+        self.registers = bytearray(map(max, self.registers, other.registers))
+        return self
+
+    def cardinality(self) -> int:
+        m = len(self.registers)
+        estimate = (0.7213 / (1 + 1.079 / m)) * m * m
+        estimate /= sum(2.0**-r for r in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * math.log(m / zeros)  # linear counting
+        return round(estimate)
+
+    def _pack(self) -> bytes:
+        # Sparse (index, rank) pairs while fewer than a third of registers are set.
+        used = [i for i, rank in enumerate(self.registers) if rank]
+        if len(used) * 3 < len(self.registers):
+            pairs = b"".join(struct.pack("<HB", i, self.registers[i]) for i in used)
+            return struct.pack("<BBI", self.precision, 1, len(used)) + pairs
+        return struct.pack("<BBI", self.precision, 0, 0) + bytes(self.registers)
+
+    @classmethod
+    def _unpack(cls, data: memoryview, offset: int) -> Tuple["HyperLogLog", int]:
+        precision, sparse, used = struct.unpack_from("<BBI", data, offset)
+        offset += struct.calcsize("<BBI")
+        hll = cls(precision)
+        if sparse:
+            for i, rank in struct.iter_unpack("<HB", data[offset : offset + 3 * used]):
+                hll.registers[i] = rank
+            return hll, offset + 3 * used
+        size = len(hll.registers)
+        hll.registers[:] = data[offset : offset + size]
+        return hll, offset + size
+
+
+class EventSketch:
+    """Summary of one group of events (a day and magnitude type, or a merge)."""
+
+    def __init__(self, compression: int = 100, hll_precision: int = 12):
+        self.magnitude = Moments()
+        self.depth = Moments()
+        self.magnitude_digest = TDigest(compression)
+        self.depth_digest = TDigest(compression)
+        self.locations = HyperLogLog(hll_precision)
+
+    @property
+    def count(self) -> int:
+        return self.magnitude.count
+
+    def add(
+        self, magnitude: float, depth: Optional[float], location_key: Optional[int]
+    ) -> None:
+        self.magnitude.add(magnitude)
+        self.magnitude_digest.add(magnitude)
+        if depth is not None:
+            self.depth.add(depth)
+            self.depth_digest.add(depth)
+        if location_key is not None:
+            self.locations.add(location_key)
+
+    def merge(self, other: "EventSketch") -> "EventSketch":
+        self.magnitude.merge(other.magnitude)
+        self.depth.merge(other.depth)
+        self.magnitude_digest.merge(other.magnitude_digest)
+        self.depth_digest.merge(other.depth_digest)
+        self.locations.merge(other.locations)
+        return self
+
+    def quantile(self, metric: str, q: float) -> Optional[float]:
+        """``metric`` is ``"magnitude"`` or ``"depth"``."""
+        digests = {"magnitude": self.magnitude_digest, "depth": self.depth_digest}
+        if metric not in digests:
+            raise ValueError(f"Unknown metric: {metric!r}")
+        return digests[metric].quantile(q)
+
+    def to_dict(self, quantiles: Sequence[float] = (0.5, 0.9, 0.99)) -> Dict[str, Any]:
+        summary: Dict[str, Any] = {
+            "event_count": self.count,
+            "distinct_locations": self.locations.cardinality(),
+        }
+        for metric, moments in (("magnitude", self.magnitude), ("depth", self.depth)):
+            stats = moments.to_dict()
+            stats.pop("count")
+            for q in quantiles:
+                stats[f"p{q * 100:g}"] = self.quantile(metric, q)
+            summary[metric] = stats
+        return summary
+
+    def to_bytes(self) -> bytes:
+        return b"".join(
+            (
+                _MAGIC,
+                struct.pack("<B", _VERSION),
+                self.magnitude._pack(),
+                self.depth._pack(),
+                self.magnitude_digest._pack(),
+                self.depth_digest._pack(),
+                self.locations._pack(),
+            )
+        )
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "EventSketch":
+        view = memoryview(data)
+        if bytes(view[:4]) != _MAGIC or view[4] != _VERSION:
+            raise ValueError("Not a version 1 event sketch")
+        sketch = cls.__new__(cls)
+        offset = 5
+        sketch.magnitude, offset = Moments._unpack(view, offset)
+        sketch.depth, offset = Moments._unpack(view, offset)
+        sketch.magnitude_digest, offset = TDigest._unpack(view, offset)
+        sketch.depth_digest, offset = TDigest._unpack(view, offset)
+        sketch.locations, offset = HyperLogLog._unpack(view, offset)
+        return sketch
+
+
+_NEW_FACTS = """
+    SELECT f.fact_key, f.event_time::DATE,
+           COALESCE(det.magnitude_type, %(unknown)s),
+           f.magnitude, f.depth, f.location_key
+    FROM fact_earthquake_events f
+    LEFT JOIN dim_event_type det ON det.event_type_key = f.event_type_key
+    WHERE f.fact_key > %(after)s AND f.magnitude IS NOT NULL
+    ORDER BY f.fact_key
+"""
+
+_EXISTING_SKETCHES = """
+    SELECT day, magnitude_type, sketch
+    FROM sketch_daily
+    WHERE (day, magnitude_type) IN (
+        SELECT * FROM UNNEST(%s::DATE[], %s::VARCHAR(10)[])
+    )
+    FOR UPDATE
+"""
+
+_UPSERT_SKETCHES = """
+    INSERT INTO sketch_daily (day, magnitude_type, event_count, sketch)
+    VALUES %s
+    ON CONFLICT (day, magnitude_type) DO UPDATE SET
+        event_count = EXCLUDED.event_count,
+        sketch = EXCLUDED.sketch,
+        updated_at = CURRENT_TIMESTAMP
+"""
+
+
+class SketchStore:
+    """Maintains and queries the ``sketch_daily`` table."""
+
+    def __init__(self, db, compression: int = 100, hll_precision: int = 12):
+        self.db = db
+        self.compression = compression
+        self.hll_precision = hll_precision
+
+    @classmethod
+    def from_config(cls, db, config: Dict[str, Any]) -> "SketchStore":
+        sketches = config.get("sketches", {})
+        return cls(
+            db,
+            compression=sketches.get("compression", 100),
+            hll_precision=sketches.get("hll_precision", 12),
+        )
+
+    def new_sketch(self) -> EventSketch:
+        return EventSketch(self.compression, self.hll_precision)
+
+    def update(self, fetch_size: int = 10000) -> int:
+        """
+        Fold facts inserted since the last update into their day's sketches.
+
+        The watermark row is locked for the whole transaction, so concurrent
+        updates serialize and every fact is counted once.
+        """
+        from psycopg2.extras import execute_values
+
+        with self.db.get_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute("SELECT last_fact_key FROM sketch_state FOR UPDATE")
+                (watermark,) = cur.fetchone()
+                # Server-side cursor: the first run sketches the whole table.
+                with conn.cursor(name="sketch_new_facts") as facts:
+                    facts.execute(
+                        _NEW_FACTS,
+                        {"after": watermark, "unknown": UNKNOWN_MAGNITUDE_TYPE},
+                    )
+                    added, watermark, count = self._accumulate(
+                        facts, watermark, fetch_size
+                    )
+                if not added:
+                    return 0
+                days, types = zip(*added)
+                cur.execute(_EXISTING_SKETCHES, (list(days), list(types)))
+                for day, magnitude_type, data in cur.fetchall():
+                    added[(day, magnitude_type)].merge(
+                        EventSketch.from_bytes(bytes(data))
+                    )
+                execute_values(
+                    cur,
+                    _UPSERT_SKETCHES,
+                    [
+                        (day, magnitude_type, sketch.count, sketch.to_bytes())
+                        for (day, magnitude_type), sketch in added.items()
+                    ],
+                )
+                cur.execute("UPDATE sketch_state SET last_fact_key = %s", (watermark,))
+        logger.info(f"Sketched {count} new facts into {len(added)} day sketches")
+        return count
+
+    def _accumulate(
+        self, cur, watermark: int, fetch_size: int
+    ) -> Tuple[Dict[Tuple[date, str], EventSketch], int, int]:
+        added: Dict[Tuple[date, str], EventSketch] = {}
+        count = 0
+        while True:
+            rows = cur.fetchmany(fetch_size)
+            if not rows:
+                return added, watermark, count
+            for fact_key, day, magnitude_type, magnitude, depth, location_key in rows:
+                sketch = added.get((day, magnitude_type))
+                if sketch is None:
+                    sketch = added[(day, magnitude_type)] = self.new_sketch()
+                sketch.add(
+                    float(magnitude),
+                    None if depth is None else float(depth),
+                    location_key,
+                )
+                watermark = fact_key
+            count += len(rows)
+
+    def _load(
+        self,
+        start: Optional[date],
+        end: Optional[date],
+        magnitude_types: Optional[Iterable[str]],
+    ) -> List[Tuple[str, bytes]]:
+        clauses, params = [], []
+        if start is not None:
+            clauses.append("day >= %s")
+            params.append(start)
+        if end is not None:
+            clauses.append("day <= %s")
+            params.append(end)
+        if magnitude_types is not None:
+            clauses.append("magnitude_type = ANY(%s)")
+            params.append(list(magnitude_types))
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self.db.get_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    f"SELECT magnitude_type, sketch FROM sketch_daily {where}", params
+                )
+                return cur.fetchall()
+
+    def summarize(
+        self,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+        magnitude_types: Optional[Iterable[str]] = None,
+    ) -> EventSketch:
+        """Merge the sketches for ``start..end`` (inclusive, either open)."""
+        merged = self.new_sketch()
+        for _, data in self._load(start, end, magnitude_types):
+            merged.merge(EventSketch.from_bytes(bytes(data)))
+        return merged
+
+    def breakdown(
+        self, start: Optional[date] = None, end: Optional[date] = None
+    ) -> Dict[str, EventSketch]:
+        """Merged sketch per magnitude type over ``start..end``."""
+        merged: Dict[str, EventSketch] = {}
+        for magnitude_type, data in self._load(start, end, None):
+            sketch = merged.setdefault(magnitude_type, self.new_sketch())
+            sketch.merge(EventSketch.from_bytes(bytes(data)))
+        return merged
+
+
+def main(argv: List[str] = None) -> None:
+    from earthquake_elt.config import load_config
+    from earthquake_elt.database import Database
+
+    parser = argparse.ArgumentParser(description="Approximate event statistics")
+    parser.add_argument("--config", default="config/config.toml")
+    parser.add_argument("--start", type=date.fromisoformat, help="First day (inclusive)")
+    parser.add_argument("--end", type=date.fromisoformat, help="Last day (inclusive)")
+    parser.add_argument(
+        "--by-type", action="store_true", help="One row per magnitude type"
+    )
+    parser.add_argument("--update", action="store_true", help="Sketch new facts first")
+    args = parser.parse_args(argv)
+
+    config = load_config(args.config)
+    db = Database(config)
+    store = SketchStore.from_config(db, config)
+    try:
+        if args.update:
+            store.update()
+        if args.by_type:
+            summary = {
+                magnitude_type: sketch.to_dict()
+                for magnitude_type, sketch in store.breakdown(
+                    args.start, args.end
+                ).items()
+            }
+        else:
+            summary = store.summarize(args.start, args.end).to_dict()
+    finally:
+        db.close_pool()
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
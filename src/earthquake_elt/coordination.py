@@ -0,0 +1,244 @@
+# ============================================================================
+# FILE: src/earthquake_elt/coordination.py
+# ============================================================================
+"""
+Coordination between concurrent pipeline processes.
+
+* Ingestion: a run's time window is split into shards in
+  ``ingestion_shards`` (``sql/schema/05_coordination.sql``). Workers claim
+  them one at a time with ``FOR UPDATE SKIP LOCKED``, so any number of
+  processes can ingest the same window without fetching a shard twice. A
+  claim is a lease: a worker that dies stops renewing it and the shard is
+  claimed again once it expires, unless it has used up its attempts, in
+  which case it is marked failed.
+* Transformation: every transform transaction first takes the
+  ``TRANSFORM_LOCK`` advisory lock (``pg_advisory_xact_lock``), so the
+  warehouse scripts and the Python engine never race on dimension inserts.
+  The SQL scripts take the same lock themselves.
+"""
+
+import logging
+import os
+import socket
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+TRANSFORM_LOCK = "earthquake_elt.transform"
+# Same key as the SELECT at the top of each sql/transformations script.
+LOCK_TRANSFORM_SQL = "SELECT pg_advisory_xact_lock(hashtext(%s))"
+
+_PLAN_SHARDS = """
+    INSERT INTO ingestion_shards (run_key, start_time, end_time)
+    SELECT %(run_key)s, s, LEAST(s + %(span)s, %(end)s)
+    FROM generate_series(%(start)s::TIMESTAMPTZ, %(end)s::TIMESTAMPTZ, %(span)s) AS s
+    WHERE s < %(end)s
+    ON CONFLICT (run_key, start_time) DO NOTHING
+"""
+
+_CLAIM_SHARD = """
+    UPDATE ingestion_shards s SET
+        status = 'running',
+        claimed_by = %(worker)s,
+        claimed_at = NOW(),
+        lease_expires_at = NOW() + %(lease)s,
+        attempts = s.attempts + 1
+    WHERE s.shard_id = (
+        SELECT shard_id FROM ingestion_shards
+        WHERE run_key = %(run_key)s
+          AND attempts < %(max_attempts)s
+          AND (status IN ('pending', 'failed')
+               OR (status = 'running' AND lease_expires_at < NOW()))
+        ORDER BY start_time
+        LIMIT 1
+        FOR UPDATE SKIP LOCKED
+    )
+    RETURNING shard_id, start_time, end_time, attempts
+"""
+
+# A shard whose lease expired on its last attempt can no longer be claimed;
+# without this it would stay 'running' and hold back the transforms forever.
+_EXPIRE_EXHAUSTED_SHARDS = """
+    UPDATE ingestion_shards SET
+        status = 'failed',
+        error_message = 'lease expired after ' || attempts || ' attempts',
+        finished_at = NOW(),
+        lease_expires_at = NULL
+    WHERE run_key = %(run_key)s
+      AND status = 'running'
+      AND lease_expires_at < NOW()
+      AND attempts >= %(max_attempts)s
+"""
+
+_REMAINING_SHARDS = """
+    SELECT COUNT(*) FROM ingestion_shards
+    WHERE run_key = %(run_key)s
+      AND (status = 'running'
+           OR (status IN ('pending', 'failed') AND attempts < %(max_attempts)s))
+"""
+
+
+class Shard:
+    """A claimed time window of a run."""
+
+    __slots__ = ("shard_id", "start_time", "end_time", "attempts")
+
+    def __init__(self, shard_id: int, start_time: datetime, end_time: datetime, attempts):
+        self.shard_id = shard_id
+        self.start_time = start_time
+        self.end_time = end_time
+        self.attempts = attempts
+
+    def __repr__(self) -> str:
+        return f"Shard({self.shard_id}, {self.start_time} .. {self.end_time})"
+
+
+class ShardQueue:
+    """
+    The shards of one run, identified by ``run_key``.
+
+    Workers that use the same key share the shards. :meth:`plan` is
+    idempotent, so every worker can call it. A shard that fails is retried,
+    by any worker, until it has been attempted ``max_attempts`` times.
+    """
+
+    def __init__(
+        self,
+        db,
+        run_key: str,
+        shard_span: timedelta = timedelta(days=1),
+        lease_seconds: float = 900,
+        max_attempts: int = 3,
+        worker_id: Optional[str] = None,
+    ):
+        self.db = db
+        self.run_key = run_key
+        self.shard_span = shard_span
+        self.lease = timedelta(seconds=lease_seconds)
+        self.max_attempts = max_attempts
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+
+    @classmethod
+    def from_config(cls, db, config: Dict[str, Any], run_key: str) -> "ShardQueue":
+        coordination = config.get("coordination", {})
+        return cls(
+            db,
+            run_key,
+            shard_span=timedelta(hours=coordination.get("shard_hours", 24)),
+            lease_seconds=coordination.get("lease_seconds", 900),
+            max_attempts=coordination.get("max_attempts", 3),
+        )
+
+    @staticmethod
+    def run_key_for(start_time: datetime, end_time: datetime) -> str:
+        return f"{start_time.isoformat()}/{end_time.isoformat()}"
+
+    def plan(self, start_time: datetime, end_time: datetime) -> int:
+        """Create the run's shards if they do not exist yet; returns shards added."""
+        with self.db.get_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    _PLAN_SHARDS,
+                    {
+                        "run_key": self.run_key,
+                        "start": start_time,
+                        "end": end_time,
+                        "span": self.shard_span,
+                    },
+                )
+                added = cur.rowcount
+        if added:
+            logger.info(f"Planned {added} shards for run {self.run_key}")
+        return added
+
+    def claim(self) -> Optional[Shard]:
+        """Lease the earliest available shard, or ``None`` when none is left."""
+        with self.db.get_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    _CLAIM_SHARD,
+                    {
+                        "run_key": self.run_key,
+                        "worker": self.worker_id,
+                        "lease": self.lease,
+                        "max_attempts": self.max_attempts,
+                    },
+                )
+                row = cur.fetchone()
+        if row is None:
+            return None
+        shard = Shard(*row)
+        logger.info(f"{self.worker_id} claimed {shard} (attempt {shard.attempts})")
+        return shard
+
+    def heartbeat(self, shard: Shard) -> bool:
+        """Extend the lease; ``False`` if another worker has taken the shard over."""
+        return self._update(
+            shard,
+            "lease_expires_at = NOW() + %(lease)s",
+            {"lease": self.lease},
+            finished=False,
+        )
+
+    def complete(self, shard: Shard, batch_id: Optional[str], events_loaded: int) -> bool:
+        return self._update(
+            shard,
+            "status = 'done', batch_id = %(batch_id)s, events_loaded = %(loaded)s, "
+            "error_message = NULL",
+            {"batch_id": batch_id, "loaded": events_loaded},
+        )
+
+    def fail(self, shard: Shard, error_message: str) -> bool:
+        return self._update(
+            shard,
+            "status = 'failed', error_message = %(error)s",
+            {"error": error_message},
+        )
+
+    def _update(
+        self, shard: Shard, assignments: str, params: Dict[str, Any], finished=True
+    ) -> bool:
+        # Only while the lease is still ours: a worker that was presumed dead
+        # must not overwrite the state set by the worker that took over.
+        if finished:
+            assignments += ", finished_at = NOW(), lease_expires_at = NULL"
+        with self.db.get_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    f"""
+                    UPDATE ingestion_shards SET {assignments}
+                    WHERE shard_id = %(shard_id)s
+                      AND claimed_by = %(worker)s
+                      AND status = 'running'
+                    """,
+                    {**params, "shard_id": shard.shard_id, "worker": self.worker_id},
+                )
+                updated = cur.rowcount == 1
+        if not updated:
+            logger.warning(f"Lost the lease on {shard}")
+        return updated
+
+    def remaining(self) -> int:
+        """Shards still running or due to be (re)tried."""
+        params = {"run_key": self.run_key, "max_attempts": self.max_attempts}
+        with self.db.get_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(_EXPIRE_EXHAUSTED_SHARDS, params)
+                if cur.rowcount:
+                    logger.warning(
+                        f"Marked {cur.rowcount} shards of run {self.run_key} failed: "
+                        f"lease expired on their last attempt"
+                    )
+                cur.execute(_REMAINING_SHARDS, params)
+                return cur.fetchone()[0]
+
+    def status_counts(self) -> Dict[str, int]:
+        with self.db.get_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    "SELECT status, COUNT(*) FROM ingestion_shards "
+                    "WHERE run_key = %s GROUP BY status",
+                    (self.run_key,),
+                )
+                return dict(cur.fetchall())
@@ -1,42 +1,70 @@
 # ============================================================================
 # FILE: src/database.py
 # ============================================================================
-from psycopg2.pool import SimpleConnectionPool
-from psycopg2.extras import execute_batch
 from contextlib import contextmanager
-from typing import Optional, List, Dict, Any
+from typing import TYPE_CHECKING, Optional, List, Dict, Any, Iterable, Sequence
 import logging
+import os
+import time
+from itertools import islice
+
+from earthquake_elt import metrics
+
+if TYPE_CHECKING:
+    from psycopg2.pool import AbstractConnectionPool
 
 logger = logging.getLogger(__name__)
 
+SCHEMA_DIR = "sql/schema"
+# Serialises schema upgrades between processes starting at the same time.
+SCHEMA_LOCK = "earthquake_elt.schema"
+
 
 class Database:
     """Database connection manager with connection pooling."""
 
-    def __init__(self, config: Dict[str, Any]):
+    def __init__(self, config: Dict[str, Any], threaded: bool = False):
         self.config = config
-        self.pool: Optional[SimpleConnectionPool] = None
+        self.threaded = threaded
+        self.pool: Optional["AbstractConnectionPool"] = None
 
     def initialize_pool(self):
-        """Initialize connection pool."""
-        db_config = self.config["database"]
-        self.pool = SimpleConnectionPool(
+        """Initialize connection pool (thread-safe when ``threaded``)."""
+        from psycopg2.pool import SimpleConnectionPool, ThreadedConnectionPool
+
+        pool_class = ThreadedConnectionPool if self.threaded else SimpleConnectionPool
+        self.pool = pool_class(
             minconn=1,
-            maxconn=db_config["pool_size"],
-            host=db_config["host"],
-            port=db_config["port"],
-            database=db_config["database"],
-            user=db_config["user"],
-            password=db_config["password"],
+            maxconn=self.config["database"]["pool_size"],
+            **self._connect_kwargs(),
         )
         logger.info("Database connection pool initialized")
 
+    def connect(self):
+        """Open a dedicated connection outside the pool (e.g. for LISTEN)."""
+        import psycopg2
+
+        return psycopg2.connect(**self._connect_kwargs())
+
+    def _connect_kwargs(self) -> Dict[str, Any]:
+        db_config = self.config["database"]
+        return {
+            "host": db_config["host"],
+            "port": db_config["port"],
+            "database": db_config["database"],
+            "user": db_config["user"],
+            "password": db_config["password"],
+            "options": db_config.get("options"),
+        }
+
     @contextmanager
     def get_connection(self):
         """Context manager for database connections."""
         if not self.pool:
             self.initialize_pool()
+        started = time.perf_counter()
         conn = self.pool.getconn()
+        metrics.DB_POOL_WAIT_SECONDS.observe(time.perf_counter() - started)
         try:
             yield conn
             conn.commit()
@@ -46,17 +74,40 @@ class Database:
         finally:
             self.pool.putconn(conn)
 
-    def execute_sql_file(self, filepath: str) -> None:
-        """Execute SQL from file."""
+    def execute_sql_file(self, filepath: str, params: Optional[Dict] = None) -> None:
+        """Execute SQL from file, binding ``%(name)s`` placeholders from ``params``."""
         with open(filepath, "r") as f:
             sql = f.read()
         with self.get_connection() as conn:
             with conn.cursor() as cur:
-                cur.execute(sql)
+                cur.execute(sql, params)
         logger.info(f"Executed SQL file: {filepath}")
 
+    def apply_schema(self, directory: str = SCHEMA_DIR) -> None:
+        """
+        Run every ``*.sql`` file in ``directory``, in name order.
+
+        The schema files only create what is missing, so this brings an
+        existing database up to date as well as initialising an empty one.
+        All files run in one transaction under an advisory lock.
+        """
+        paths = sorted(
+            os.path.join(directory, name)
+            for name in os.listdir(directory)
+            if name.endswith(".sql")
+        )
+        with self.get_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute("SELECT pg_advisory_xact_lock(hashtext(%s))", (SCHEMA_LOCK,))
+                for path in paths:
+                    with open(path, "r") as f:
+                        cur.execute(f.read())
+        logger.info(f"Applied {len(paths)} schema files from {directory}")
+
     def bulk_insert(self, table: str, records: List[Dict], page_size: int = 1000) -> int:
         """Bulk insert records using execute_batch."""
+        from psycopg2.extras import execute_batch
+
         if not records:
             return 0
         columns = records[0].keys()
@@ -66,8 +117,51 @@ class Database:
         with self.get_connection() as conn:
             with conn.cursor() as cur:
                 execute_batch(cur, sql, values, page_size=page_size)
+        metrics.ROWS_LOADED.inc(len(records), table=table)
         return len(records)
 
+    def bulk_insert_rows(
+        self,
+        table: str,
+        columns: Sequence[str],
+        rows: Iterable[Sequence[Any]],
+        page_size: int = 1000,
+        on_conflict: str = "",
+        cursor=None,
+    ) -> int:
+        """
+        Bulk insert positional rows, streaming them without building dicts.
+
+        Rows are sent ``page_size`` at a time as multi-row ``INSERT``
+        statements. ``on_conflict`` is appended to the statement (e.g. ``ON
+        CONFLICT DO NOTHING``); the count returned is the number of rows the
+        database actually inserted, summed from each statement's row count.
+        With ``cursor`` the rows join the caller's transaction instead of a new
+        one.
+        """
+        if cursor is None:
+            with self.get_connection() as conn:
+                with conn.cursor() as cur:
+                    return self.bulk_insert_rows(
+                        table, columns, rows, page_size, on_conflict, cur
+                    )
+
+        from psycopg2.extras import execute_values
+
+        sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES %s"
+        if on_conflict:
+            sql = f"{sql} {on_conflict}"
+        rows = iter(rows)
+        inserted = 0
+        while True:
+            page = list(islice(rows, page_size))
+            if not page:
+                break
+            execute_values(cursor, sql, page, page_size=len(page))
+            inserted += cursor.rowcount
+        metrics.ROWS_LOADED.inc(inserted, table=table)
+        return inserted
+
     def close_pool(self):
         """Close all connections in pool."""
         if self.pool:
@@ -1,6 +1,25 @@
-from .api_client import USGSAPIClient
-from .validators import DataValidator
-from .error_handler import ErrorHandler
-from .loader import RawDataLoader
+import importlib
 
-__all__ = ["USGSAPIClient", "DataValidator", "ErrorHandler", "RawDataLoader"]
+# Submodules pull in requests and pydantic, so they are imported on first
+# attribute access rather than with the package (keeps DAG parsing cheap).
+_EXPORTS = {
+    "USGSAPIClient": ".api_client",
+    "DataValidator": ".validators",
+    "ErrorHandler": ".error_handler",
+    "RawDataLoader": ".loader",
+    "CheckpointStore": ".checkpoint",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
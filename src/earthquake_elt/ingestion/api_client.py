@@ -3,75 +3,131 @@
 # ============================================================================
 import time
 import requests
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import nullcontext
 from datetime import datetime
-from typing import Dict, List, Any, Optional
-from tenacity import (
-    retry,
-    stop_after_attempt,
-    wait_exponential,
-    retry_if_exception_type,
+from typing import (
+    AbstractSet,
+    Any,
+    Callable,
+    ContextManager,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
 )
 import logging
 
+from earthquake_elt import metrics
+from earthquake_elt.ingestion.batch import EventBatch
+from earthquake_elt.ingestion.rate_control import (
+    AdaptiveRateController,
+    parse_retry_after,
+)
+
 logger = logging.getLogger(__name__)
 
+THROTTLE_STATUSES = (429, 503)
+MAX_BACKOFF_SECONDS = 30.0
+
+
+class PageFetchError(Exception):
+    """Result pages were still failing after every retry round."""
 
-class RateLimiter:
-    """Simple rate limiter for API requests."""
+    def __init__(self, message: str, failed_offsets: List[int]):
+        super().__init__(message)
+        self.failed_offsets = failed_offsets
 
-    def __init__(self, calls_per_minute: int):
-        self.calls_per_minute = calls_per_minute
-        self.min_interval = 60.0 / calls_per_minute
-        self.last_call = 0.0
 
-    def wait_if_needed(self):
-        """Wait if rate limit would be exceeded."""
-        now = time.time()
-        elapsed = now - self.last_call
-        if elapsed < self.min_interval:
-            sleep_time = self.min_interval - elapsed
-            logger.debug(f"Rate limiting: sleeping {sleep_time:.2f}s")
-            time.sleep(sleep_time)
-        self.last_call = time.time()
+def _is_retryable(error: requests.RequestException) -> bool:
+    response = getattr(error, "response", None)
+    if isinstance(error, requests.HTTPError) and response is not None:
+        return response.status_code in THROTTLE_STATUSES or response.status_code >= 500
+    return True
 
 
 class USGSAPIClient:
     """USGS Earthquake Catalog API client with production features."""
 
     def __init__(self, config: Dict[str, Any]):
-        self.base_url = config["api"]["base_url"]
-        self.format = config["api"]["format"]
-        self.timeout = config["api"]["timeout"]
-        self.batch_size = config["api"]["batch_size"]
-        self.rate_limiter = RateLimiter(config["api"]["rate_limit_per_minute"])
+        api = config["api"]
+        self.base_url = api["base_url"]
+        self.format = api["format"]
+        self.timeout = api["timeout"]
+        self.batch_size = api["batch_size"]
+        self.max_retries = api.get("max_retries", 3)
+        self.retry_backoff = api.get("retry_backoff", 2.0)
+        self.max_concurrency = api.get("max_concurrency", 4)
+        self.page_retry_rounds = api.get("page_retry_rounds", 2)
+        self.rate_controller = AdaptiveRateController(
+            api["rate_limit_per_minute"],
+            max_rate_per_minute=api.get("max_rate_per_minute"),
+            max_concurrency=self.max_concurrency,
+        )
+        # Wraps each page fetched on a pool thread, e.g. to profile it there.
+        self.worker_profile: Callable[[], ContextManager] = nullcontext
         self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(
+            pool_maxsize=max(self.max_concurrency, 10)
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
         logger.info(f"Initialized USGS API client: {self.base_url}")
 
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=2, min=1, max=10),
-        retry=retry_if_exception_type((requests.RequestException, requests.Timeout)),
-    )
-    def _make_request(self, params: Dict[str, Any]) -> Dict[str, Any]:
-        """Make API request with retry logic."""
-        self.rate_limiter.wait_if_needed()
-        logger.info(f"API request with params: {params}")
-        try:
-            response = self.session.get(
-                self.base_url, params=params, timeout=self.timeout
-            )
-            response.raise_for_status()
-            data = response.json()
-            logger.info(
-                f"API response: {data.get('metadata', {}).get('count', 0)} events"
-            )
-            return data
-        except requests.Timeout:
-            logger.error(f"Request timeout after {self.timeout}s")
-            raise
-        except requests.RequestException as e:
-            logger.error(f"Request failed: {str(e)}")
-            raise
+    def _make_request(
+        self, params: Dict[str, Any], url: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Make an API request, retrying transient failures up to ``max_retries``."""
+        attempt = 1
+        while True:
+            try:
+                return self._request_once(url or self.base_url, params)
+            except requests.RequestException as e:
+                if attempt >= self.max_retries or not _is_retryable(e):
+                    raise
+                # Throttled requests already wait out the controller's pause.
+                response = getattr(e, "response", None)
+                if response is None or response.status_code not in THROTTLE_STATUSES:
+                    delay = min(
+                        self.retry_backoff * 2 ** (attempt - 1), MAX_BACKOFF_SECONDS
+                    )
+                    logger.warning(f"Retrying in {delay:.1f}s after: {e}")
+                    time.sleep(delay)
+                attempt += 1
+
+    def _request_once(self, url: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        with self.rate_controller.request():
+            logger.info(f"API request with params: {params}")
+            started = time.perf_counter()
+            status = "error"
+            try:
+                response = self.session.get(url, params=params, timeout=self.timeout)
+                status = str(response.status_code)
+                metrics.API_BYTES_RECEIVED.inc(len(response.content))
+                if response.status_code in THROTTLE_STATUSES:
+                    metrics.API_THROTTLED.inc(status=status)
+                    self.rate_controller.on_throttle(
+                        parse_retry_after(response.headers.get("Retry-After"))
+                    )
+                response.raise_for_status()
+                data = response.json()
+            except (requests.Timeout, requests.ConnectionError) as e:
+                if isinstance(e, requests.Timeout):
+                    status = "timeout"
+                logger.error(f"Request failed: {str(e)}")
+                self.rate_controller.on_throttle()
+                raise
+            except requests.RequestException as e:
+                logger.error(f"Request failed: {str(e)}")
+                raise
+            finally:
+                metrics.API_REQUEST_SECONDS.observe(
+                    time.perf_counter() - started, status=status
+                )
+        self.rate_controller.on_success()
+        logger.info(f"API response: {data.get('metadata', {}).get('count', 0)} events")
+        return data
 
     def fetch_earthquakes(
         self,
@@ -82,37 +138,248 @@ class USGSAPIClient:
     ) -> List[Dict[str, Any]]:
         """Fetch earthquake events with pagination support."""
         all_events = []
+        for _, features in self._iter_pages(
+            start_time, end_time, min_magnitude, max_results
+        ):
+            all_events.extend(features)
+        return all_events
+
+    def iter_batches(
+        self,
+        start_time: datetime,
+        end_time: datetime,
+        min_magnitude: Optional[float] = None,
+        max_results: Optional[int] = None,
+    ) -> Iterator[EventBatch]:
+        """Yield each result page as a columnar :class:`EventBatch`."""
+        for _, batch in self.iter_pages(start_time, end_time, min_magnitude, max_results):
+            yield batch
+
+    def iter_pages(
+        self,
+        start_time: datetime,
+        end_time: datetime,
+        min_magnitude: Optional[float] = None,
+        max_results: Optional[int] = None,
+        skip_offsets: AbstractSet[int] = frozenset(),
+        event_count: Optional[int] = None,
+    ) -> Iterator[Tuple[int, EventBatch]]:
+        """
+        Yield ``(offset, batch)`` for each result page.
+
+        The offset identifies the page within the window for checkpointing;
+        pages whose offsets are in ``skip_offsets`` are not fetched again.
+        Pages may arrive out of order when fetched concurrently.
+        ``event_count`` passes on a size already taken with
+        :meth:`count_window`; otherwise the window is counted here.
+        """
+        for offset, features in self._iter_pages(
+            start_time, end_time, min_magnitude, max_results, skip_offsets, event_count
+        ):
+            yield offset, EventBatch.from_features(features)
+
+    def _query_params(
+        self,
+        start_time: datetime,
+        end_time: datetime,
+        min_magnitude: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        params = {
+            "format": self.format,
+            "starttime": start_time.isoformat(),
+            "endtime": end_time.isoformat(),
+        }
+        if min_magnitude:
+            params["minmagnitude"] = min_magnitude
+        return params
+
+    def count_window(
+        self,
+        start_time: datetime,
+        end_time: datetime,
+        min_magnitude: Optional[float] = None,
+    ) -> Optional[int]:
+        """Number of events in a window, or ``None`` if it cannot be counted."""
+        return self.count_events(self._query_params(start_time, end_time, min_magnitude))
+
+    def event_id_at(
+        self,
+        start_time: datetime,
+        end_time: datetime,
+        position: int,
+        min_magnitude: Optional[float] = None,
+    ) -> Optional[str]:
+        """Id of the ``position``-th event of a window ordered by time, if any."""
+        params = self._query_params(start_time, end_time, min_magnitude)
+        features = self._fetch_page(params, position, 1)
+        return features[0].get("id") if features else None
+
+    def count_events(self, params: Dict[str, Any]) -> Optional[int]:
+        """Size of the result set from the FDSN ``count`` method, if it has one."""
+        if not self.base_url.endswith("/query"):
+            return None
+        url = self.base_url[: -len("query")] + "count"
+        try:
+            data = self._make_request(params, url=url)
+        except requests.HTTPError as e:
+            if _is_retryable(e):
+                raise
+            logger.warning(f"Count unavailable ({e}); paginating sequentially")
+            return None
+        count = data.get("count") if isinstance(data, dict) else None
+        return count if isinstance(count, int) else None
+
+    def _iter_pages(
+        self,
+        start_time: datetime,
+        end_time: datetime,
+        min_magnitude: Optional[float] = None,
+        max_results: Optional[int] = None,
+        skip_offsets: AbstractSet[int] = frozenset(),
+        count: Optional[int] = None,
+    ) -> Iterator[Tuple[int, List[Dict[str, Any]]]]:
+        """Yield ``(offset, features)`` per page until the window is exhausted."""
+        params = self._query_params(start_time, end_time, min_magnitude)
+        if count is None:
+            count = self.count_events(params)
+        stats = {"total": 0, "seconds": 0.0}
+        started = time.perf_counter()
+        if count is None:
+            pages = self._iter_pages_sequential(params, max_results, stats, skip_offsets)
+        else:
+            expected = min(count, max_results) if max_results else count
+            pages = self._iter_pages_concurrent(params, expected, skip_offsets)
+        for offset, features in pages:
+            stats["total"] += len(features)
+            metrics.API_PAGES.inc()
+            metrics.API_EVENTS_FETCHED.inc(len(features))
+            logger.info(f"Fetched {len(features)} events (total: {stats['total']})")
+            yield offset, features
+        fetch_seconds = stats["seconds"] or time.perf_counter() - started
+        if fetch_seconds > 0:
+            metrics.INGESTION_EVENTS_PER_SECOND.set(stats["total"] / fetch_seconds)
+        logger.info(f"Total events fetched: {stats['total']}")
+
+    def _fetch_page(self, params: Dict[str, Any], offset: int, limit: int):
+        data = self._make_request(
+            {**params, "limit": limit, "offset": offset, "orderby": "time"}
+        )
+        return data.get("features", [])
+
+    def _iter_pages_concurrent(
+        self, params: Dict[str, Any], expected: int, skip_offsets: AbstractSet[int]
+    ) -> Iterator[Tuple[int, List[Dict[str, Any]]]]:
+        """
+        Fetch the pages of a counted result set in parallel.
+
+        At most ``2 * max_concurrency`` pages are fetched ahead of the
+        consumer (the rate controller decides how many are in flight). Pages
+        that fail are re-queued for up to ``page_retry_rounds`` further
+        rounds; any still missing raise :class:`PageFetchError` instead of
+        ending the window early.
+        """
+        pending = [
+            offset
+            for offset in range(1, expected + 1, self.batch_size)
+            if offset not in skip_offsets
+        ]
+        for round_number in range(self.page_retry_rounds + 1):
+            if round_number:
+                logger.warning(
+                    f"Retrying {len(pending)} failed pages (round {round_number})"
+                )
+            failed = []
+            yield from self._fetch_round(params, pending, expected, failed)
+            if not failed:
+                return
+            pending = sorted(failed)
+        raise PageFetchError(
+            f"{len(pending)} pages failed after {self.page_retry_rounds} retry rounds "
+            f"(offsets {pending[:10]})",
+            pending,
+        )
+
+    def _fetch_page_in_worker(self, params: Dict[str, Any], offset: int, limit: int):
+        with self.worker_profile():
+            return self._fetch_page(params, offset, limit)
+
+    def _fetch_round(self, params, offsets, expected, failed):
+        window = 2 * self.max_concurrency
+        queue = iter(offsets)
+        pool = ThreadPoolExecutor(
+            max_workers=self.max_concurrency, thread_name_prefix="usgs-page"
+        )
+        in_flight = {}
+        try:
+            while True:
+                for offset in queue:
+                    limit = min(self.batch_size, expected - offset + 1)
+                    future = pool.submit(
+                        self._fetch_page_in_worker, params, offset, limit
+                    )
+                    in_flight[future] = offset
+                    if len(in_flight) >= window:
+                        break
+                if not in_flight:
+                    return
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    offset = in_flight.pop(future)
+                    try:
+                        features = future.result()
+                    except requests.RequestException as e:
+                        logger.error(f"Failed to fetch page at offset {offset}: {e}")
+                        metrics.API_PAGES_FAILED.inc()
+                        failed.append(offset)
+                        continue
+                    if features:
+                        yield offset, features
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    def _iter_pages_sequential(
+        self,
+        params: Dict[str, Any],
+        max_results: Optional[int],
+        stats: Dict[str, Any],
+        skip_offsets: AbstractSet[int],
+    ) -> Iterator[Tuple[int, List[Dict[str, Any]]]]:
+        """Offset pagination for servers without ``count``; errors propagate."""
+        total = 0
         offset = 1
+        # Pages are committed in order here, so skipped offsets are a prefix.
+        while offset in skip_offsets:
+            offset += self.batch_size
         while True:
-            params = {
-                "format": self.format,
-                "starttime": start_time.isoformat(),
-                "endtime": end_time.isoformat(),
-                "limit": self.batch_size,
-                "offset": offset,
-                "orderby": "time",
-            }
-            if min_magnitude:
-                params["minmagnitude"] = min_magnitude
+            started = time.perf_counter()
             try:
-                data = self._make_request(params)
-                features = data.get("features", [])
-                if not features:
-                    logger.info("No more events to fetch")
-                    break
-                all_events.extend(features)
-                logger.info(f"Fetched {len(features)} events (total: {len(all_events)})")
-                if max_results and len(all_events) >= max_results:
-                    all_events = all_events[:max_results]
-                    break
-                metadata = data.get("metadata", {})
-                total_count = metadata.get("count", 0)
-                if len(all_events) >= total_count:
-                    logger.info("Fetched all available events")
-                    break
-                offset += len(features)
-            except Exception as e:
-                logger.error(f"Failed to fetch batch at offset {offset}: {str(e)}")
-                break
-        logger.info(f"Total events fetched: {len(all_events)}")
-        return all_events
+                data = self._make_request(
+                    {
+                        **params,
+                        "limit": self.batch_size,
+                        "offset": offset,
+                        "orderby": "time",
+                    }
+                )
+            except requests.RequestException as e:
+                metrics.API_PAGES_FAILED.inc()
+                raise PageFetchError(
+                    f"Failed to fetch batch at offset {offset}: {e}", [offset]
+                ) from e
+            stats["seconds"] += time.perf_counter() - started
+            features = data.get("features", [])
+            if not features:
+                logger.info("No more events to fetch")
+                return
+            if max_results and total + len(features) > max_results:
+                features = features[: max_results - total]
+            total += len(features)
+            yield offset, features
+            if max_results and total >= max_results:
+                return
+            # metadata.count is the size of this page, not of the result set,
+            # so a short page is the only reliable end-of-results signal.
+            if len(data["features"]) < self.batch_size:
+                logger.info("Fetched all available events")
+                return
+            offset += len(data["features"])
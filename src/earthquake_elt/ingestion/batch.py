@@ -0,0 +1,221 @@
+# ============================================================================
+# FILE: src/earthquake_elt/ingestion/batch.py
+# ============================================================================
+import json
+import math
+from array import array
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+# Sentinels for missing values in the typed columns.
+MISSING_INT = -(2**63)
+MISSING_FLAG = -1
+
+_dumps = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False).encode
+
+
+def _as_float(value: Any) -> float:
+    if value is None:
+        return math.nan
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+def _as_str(value: Any) -> Optional[str]:
+    return None if value is None else str(value)
+
+
+def _as_int(value: Any) -> int:
+    if value is None:
+        return MISSING_INT
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return MISSING_INT
+
+
+class EventBatch:
+    """
+    Columnar batch of earthquake events.
+
+    Numeric fields are held in typed ``array`` columns (NaN or a sentinel for
+    missing values), the short string fields used by the transforms in lists
+    (``None`` when missing), and each event's parsed GeoJSON feature is
+    re-encoded once as compact UTF-8 JSON in ``payloads`` (equal as JSON to the
+    feature the API returned, though not byte-for-byte its response text). A
+    page of API results is converted once and then passed through validation
+    and loading without per-event dicts.
+    """
+
+    __slots__ = (
+        "ids",
+        "mag",
+        "time",
+        "updated",
+        "lat",
+        "lon",
+        "depth",
+        "sig",
+        "tsunami",
+        "n_coords",
+        "mag_type",
+        "place",
+        "status",
+        "payloads",
+    )
+
+    def __init__(self):
+        self.ids: List[str] = []
+        self.mag = array("d")
+        self.time = array("q")
+        self.updated = array("q")
+        self.lat = array("d")
+        self.lon = array("d")
+        self.depth = array("d")
+        self.sig = array("q")
+        self.tsunami = array("b")
+        self.n_coords = array("b")
+        self.mag_type: List[Optional[str]] = []
+        self.place: List[Optional[str]] = []
+        self.status: List[Optional[str]] = []
+        self.payloads: List[bytes] = []
+
+    @classmethod
+    def from_features(cls, features: Iterable[Dict[str, Any]]) -> "EventBatch":
+        """Build a batch from GeoJSON features as returned by the API."""
+        batch = cls()
+        for feature in features:
+            batch.append(feature)
+        return batch
+
+    def append(self, feature: Dict[str, Any]) -> None:
+        props = feature.get("properties") or {}
+        geometry = feature.get("geometry")
+        coords = geometry.get("coordinates") if isinstance(geometry, dict) else None
+        if not isinstance(coords, (list, tuple)):
+            coords = ()
+
+        self.ids.append(feature.get("id") or "")
+        self.mag.append(_as_float(props.get("mag")))
+        self.time.append(_as_int(props.get("time")))
+        self.updated.append(_as_int(props.get("updated")))
+        self.lon.append(_as_float(coords[0]) if len(coords) > 0 else math.nan)
+        self.lat.append(_as_float(coords[1]) if len(coords) > 1 else math.nan)
+        self.depth.append(_as_float(coords[2]) if len(coords) > 2 else math.nan)
+        self.sig.append(_as_int(props.get("sig")))
+        tsunami = props.get("tsunami")
+        self.tsunami.append(MISSING_FLAG if tsunami is None else int(bool(tsunami)))
+        self.n_coords.append(min(len(coords), 127))
+        self.mag_type.append(_as_str(props.get("magType")))
+        self.place.append(_as_str(props.get("place")))
+        self.status.append(_as_str(props.get("status")))
+        self.payloads.append(_dumps(feature).encode("utf-8"))
+
+    def take(self, indices: Iterable[int]) -> "EventBatch":
+        """Return a new batch holding the events at ``indices``, in order."""
+        indices = list(indices)
+        subset = EventBatch()
+        for name in self.__slots__:
+            source = getattr(self, name)
+            target = getattr(subset, name)
+            if isinstance(source, array):
+                target.extend(source[i] for i in indices)
+            else:
+                target.extend([source[i] for i in indices])
+        return subset
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __getitem__(self, index: int) -> "EventRow":
+        if index < 0:
+            index += len(self.ids)
+        if not 0 <= index < len(self.ids):
+            raise IndexError("EventBatch index out of range")
+        return EventRow(self, index)
+
+    def __iter__(self) -> Iterator["EventRow"]:
+        for index in range(len(self.ids)):
+            yield EventRow(self, index)
+
+    def __repr__(self) -> str:
+        return f"EventBatch(events={len(self)})"
+
+
+class EventRow:
+    """Lightweight view of one event in an :class:`EventBatch`."""
+
+    __slots__ = ("_batch", "_index")
+
+    def __init__(self, batch: EventBatch, index: int):
+        self._batch = batch
+        self._index = index
+
+    @property
+    def id(self) -> str:
+        return self._batch.ids[self._index]
+
+    @property
+    def mag(self) -> Optional[float]:
+        value = self._batch.mag[self._index]
+        return None if math.isnan(value) else value
+
+    @property
+    def time(self) -> Optional[int]:
+        value = self._batch.time[self._index]
+        return None if value == MISSING_INT else value
+
+    @property
+    def updated(self) -> Optional[int]:
+        value = self._batch.updated[self._index]
+        return None if value == MISSING_INT else value
+
+    @property
+    def latitude(self) -> Optional[float]:
+        value = self._batch.lat[self._index]
+        return None if math.isnan(value) else value
+
+    @property
+    def longitude(self) -> Optional[float]:
+        value = self._batch.lon[self._index]
+        return None if math.isnan(value) else value
+
+    @property
+    def depth(self) -> Optional[float]:
+        value = self._batch.depth[self._index]
+        return None if math.isnan(value) else value
+
+    @property
+    def sig(self) -> Optional[int]:
+        value = self._batch.sig[self._index]
+        return None if value == MISSING_INT else value
+
+    @property
+    def tsunami(self) -> Optional[bool]:
+        value = self._batch.tsunami[self._index]
+        return None if value == MISSING_FLAG else bool(value)
+
+    @property
+    def mag_type(self) -> Optional[str]:
+        return self._batch.mag_type[self._index]
+
+    @property
+    def place(self) -> Optional[str]:
+        return self._batch.place[self._index]
+
+    @property
+    def status(self) -> Optional[str]:
+        return self._batch.status[self._index]
+
+    @property
+    def payload(self) -> bytes:
+        """The event's GeoJSON feature, re-encoded as compact UTF-8 JSON."""
+        return self._batch.payloads[self._index]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Decode the original feature."""
+        return json.loads(self.payload)
+
+    def __repr__(self) -> str:
+        return f"EventRow(id={self.id!r}, mag={self.mag}, time={self.time})"
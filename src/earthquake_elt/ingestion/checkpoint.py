@@ -0,0 +1,297 @@
+# ============================================================================
+# FILE: src/earthquake_elt/ingestion/checkpoint.py
+# ============================================================================
+"""
+Page-level ingestion checkpoints (``sql/schema/06_checkpoints.sql``).
+
+A checkpoint row per batch records the batch's window and the offsets of
+the result pages already committed to the raw layer. Each page's raw rows
+and its checkpoint update are written in the same transaction, so after a
+crash the checkpoint matches the raw layer exactly: a run restarted with the
+same ``batch_id`` fetches only the pages not yet recorded, losing at most the
+page that was in flight.
+
+Offsets index the window's results ordered by time, so they only stay valid
+while the window holds the same events. The window's event count is stored
+with the offsets and checked again on resume (:meth:`CheckpointStore.verify`);
+if it changed, the offsets are dropped and the batch is fetched again. A server
+without a ``count`` method is paged in order, so the committed pages are a
+prefix of the window; there the id of the last committed event is checked at
+its position instead.
+"""
+
+import logging
+from datetime import datetime
+from typing import Callable, Dict, FrozenSet, Optional
+
+logger = logging.getLogger(__name__)
+
+COUNT_KEYS = ("fetched", "valid", "invalid", "loaded")
+
+_BEGIN = """
+    INSERT INTO ingestion_checkpoints (batch_id, start_time, end_time, page_size)
+    VALUES (%(batch_id)s, %(start)s, %(end)s, %(page_size)s)
+    ON CONFLICT (batch_id) DO UPDATE SET status = 'running', updated_at = NOW()
+        WHERE ingestion_checkpoints.status <> 'success'
+"""
+
+_SELECT = """
+    SELECT start_time, end_time, page_size, event_count, last_event_id,
+           completed_offsets, status,
+           events_fetched, events_valid, events_invalid, events_loaded
+    FROM ingestion_checkpoints
+    WHERE batch_id = %s
+"""
+
+# Raw rows already loaded stay (the refetch skips them), so events_loaded does
+# too; the other counts start over with the pages.
+_RESET = """
+    UPDATE ingestion_checkpoints SET
+        page_size = %(page_size)s,
+        event_count = %(event_count)s,
+        last_event_id = NULL,
+        completed_offsets = '{}',
+        events_fetched = 0,
+        events_valid = 0,
+        events_invalid = 0
+    WHERE batch_id = %(batch_id)s
+"""
+
+_SET_EVENT_COUNT = """
+    UPDATE ingestion_checkpoints SET event_count = %(event_count)s
+    WHERE batch_id = %(batch_id)s
+"""
+
+# The offset guard keeps a page that is re-committed (e.g. by a worker that
+# lost its lease) from being counted twice. last_event_id follows the page
+# with the highest offset (SET sees the old completed_offsets).
+_COMMIT_PAGE = """
+    UPDATE ingestion_checkpoints SET
+        last_event_id = CASE WHEN %(offset)s > ALL(completed_offsets)
+            THEN %(last_event_id)s ELSE last_event_id END,
+        completed_offsets = array_append(completed_offsets, %(offset)s),
+        events_fetched = events_fetched + %(fetched)s,
+        events_valid = events_valid + %(valid)s,
+        events_invalid = events_invalid + %(invalid)s,
+        events_loaded = events_loaded + %(loaded)s,
+        updated_at = NOW()
+    WHERE batch_id = %(batch_id)s
+      AND NOT (%(offset)s = ANY(completed_offsets))
+"""
+
+
+class Checkpoint:
+    """The committed progress of one batch."""
+
+    __slots__ = (
+        "batch_id",
+        "start_time",
+        "end_time",
+        "page_size",
+        "event_count",
+        "completed_offsets",
+        "status",
+        "counts",
+        "last_event_id",
+    )
+
+    def __init__(
+        self,
+        batch_id: str,
+        start_time: datetime,
+        end_time: datetime,
+        page_size: int,
+        event_count: Optional[int],
+        completed_offsets: FrozenSet[int],
+        status: str,
+        counts: Dict[str, int],
+        last_event_id: Optional[str] = None,
+    ):
+        self.batch_id = batch_id
+        self.start_time = start_time
+        self.end_time = end_time
+        self.page_size = page_size
+        self.event_count = event_count
+        self.completed_offsets = completed_offsets
+        self.status = status
+        self.counts = counts
+        self.last_event_id = last_event_id
+
+    @property
+    def resumed(self) -> bool:
+        return bool(self.completed_offsets)
+
+    def __repr__(self) -> str:
+        return (
+            f"Checkpoint({self.batch_id}, {self.status}, "
+            f"{len(self.completed_offsets)} pages)"
+        )
+
+
+class CheckpointStore:
+    """Reads and advances ``ingestion_checkpoints``."""
+
+    def __init__(self, db):
+        self.db = db
+
+    def begin(
+        self, batch_id: str, start_time: datetime, end_time: datetime, page_size: int
+    ) -> Checkpoint:
+        """
+        Start or resume ``batch_id``.
+
+        A batch that already has a checkpoint keeps its stored window, so a
+        resumed run fetches the same pages whatever window it was given.
+        """
+        with self.db.get_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    _BEGIN,
+                    {
+                        "batch_id": batch_id,
+                        "start": start_time,
+                        "end": end_time,
+                        "page_size": page_size,
+                    },
+                )
+                cur.execute(_SELECT, (batch_id,))
+                row = cur.fetchone()
+                start, end, stored_page_size, event_count, last_id = row[:5]
+                offsets, status = row[5:7]
+                counts = list(row[7:])
+                if status != "success" and stored_page_size != page_size:
+                    # Offsets of another page size do not line up with ours; the
+                    # raw insert ignores rows the batch already has, so start over.
+                    logger.warning(
+                        f"Batch {batch_id} was checkpointed with page size "
+                        f"{stored_page_size}, not {page_size}; refetching all pages"
+                    )
+                    self._reset(cur, batch_id, page_size, event_count=None)
+                    event_count, last_id, offsets = None, None, ()
+                    counts = [0] * (len(COUNT_KEYS) - 1) + counts[-1:]
+        checkpoint = Checkpoint(
+            batch_id,
+            start,
+            end,
+            page_size,
+            event_count,
+            frozenset(offsets or ()),
+            status,
+            dict(zip(COUNT_KEYS, counts)),
+            last_id,
+        )
+        if checkpoint.resumed:
+            logger.info(f"Resuming {checkpoint} ({checkpoint.counts['loaded']} loaded)")
+        return checkpoint
+
+    def verify(
+        self,
+        checkpoint: Checkpoint,
+        event_count: Optional[int],
+        event_id_at: Optional[Callable[[int], Optional[str]]] = None,
+    ) -> Checkpoint:
+        """
+        Check the window's current ``event_count`` against ``checkpoint``.
+
+        A resumed batch whose window gained or lost events has shifted
+        offsets, so its pages are dropped and fetched again; otherwise the
+        count is stored for the next resume. A window that cannot be counted
+        is trusted only if ``event_id_at(position)`` still finds the last
+        committed event where the checkpoint left it.
+        """
+        stored = checkpoint.event_count
+        if event_count is None and checkpoint.resumed:
+            reset = not self._last_event_in_place(checkpoint, event_id_at)
+        else:
+            reset = checkpoint.resumed and event_count != stored
+        if not reset and event_count == stored:
+            return checkpoint
+        counts, offsets = checkpoint.counts, checkpoint.completed_offsets
+        last_event_id = checkpoint.last_event_id
+        if reset:
+            logger.warning(
+                f"Batch {checkpoint.batch_id} window holds {event_count} events, "
+                f"checkpointed with {stored}; refetching all pages"
+            )
+            counts = dict.fromkeys(COUNT_KEYS, 0)
+            counts["loaded"] = checkpoint.counts["loaded"]
+            offsets, last_event_id = frozenset(), None
+        self._store_event_count(checkpoint, event_count, reset)
+        return Checkpoint(
+            checkpoint.batch_id,
+            checkpoint.start_time,
+            checkpoint.end_time,
+            checkpoint.page_size,
+            event_count,
+            offsets,
+            checkpoint.status,
+            counts,
+            last_event_id,
+        )
+
+    @staticmethod
+    def _last_event_in_place(
+        checkpoint: Checkpoint, event_id_at: Optional[Callable[[int], Optional[str]]]
+    ) -> bool:
+        """Whether the last committed event still ends the committed prefix."""
+        if event_id_at is None or checkpoint.last_event_id is None:
+            return False
+        offsets = checkpoint.completed_offsets
+        if offsets != frozenset(range(1, max(offsets) + 1, checkpoint.page_size)):
+            return False
+        # A prefix of pages holds events 1..fetched of the window.
+        return event_id_at(checkpoint.counts["fetched"]) == checkpoint.last_event_id
+
+    def _store_event_count(
+        self, checkpoint: Checkpoint, event_count: Optional[int], reset: bool
+    ) -> None:
+        with self.db.get_connection() as conn:
+            with conn.cursor() as cur:
+                if reset:
+                    self._reset(
+                        cur, checkpoint.batch_id, checkpoint.page_size, event_count
+                    )
+                else:
+                    cur.execute(
+                        _SET_EVENT_COUNT,
+                        {"batch_id": checkpoint.batch_id, "event_count": event_count},
+                    )
+
+    @staticmethod
+    def _reset(cur, batch_id: str, page_size: int, event_count: Optional[int]) -> None:
+        cur.execute(
+            _RESET,
+            {"batch_id": batch_id, "page_size": page_size, "event_count": event_count},
+        )
+
+    def commit_page(
+        self,
+        cur,
+        batch_id: str,
+        offset: int,
+        counts: Dict[str, int],
+        last_event_id: Optional[str] = None,
+    ) -> None:
+        """
+        Record a page on ``cur``, inside the transaction that loaded it.
+
+        ``last_event_id`` is the id of the page's last fetched event.
+        """
+        cur.execute(
+            _COMMIT_PAGE,
+            {
+                "batch_id": batch_id,
+                "offset": offset,
+                "last_event_id": last_event_id,
+                **{k: counts[k] for k in COUNT_KEYS},
+            },
+        )
+
+    def finish(self, batch_id: str, status: str) -> None:
+        with self.db.get_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    "UPDATE ingestion_checkpoints SET status = %s, updated_at = NOW() "
+                    "WHERE batch_id = %s",
+                    (status, batch_id),
+                )
@@ -5,9 +5,11 @@
 import json
 import uuid
 from datetime import datetime, timezone
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Union
 import logging
 
+from earthquake_elt.ingestion.batch import EventBatch
+
 logger = logging.getLogger(__name__)
 
 
@@ -20,7 +22,7 @@ class RawDataLoader:
         self.db = database
 
     def load_batch(
-        self, events: List[Dict[str, Any]], batch_id: str = None
+        self, events: Union[List[Dict[str, Any]], EventBatch], batch_id: str = None
     ) -> Dict[str, int]:
         """
         Load batch of events to raw layer.
@@ -36,20 +38,23 @@ class RawDataLoader:
         start_time = datetime.now(timezone.utc)
 
         try:
-            # Prepare records for insertion
-            records = []
-            for event in events:
-                records.append(
-                    {
-                        "batch_id": batch_id,
-                        "event_id": event["id"],
-                        "raw_data": json.dumps(event),
-                        "ingested_at": datetime.now(timezone.utc),
-                    }
-                )
-
-            # Bulk insert
-            inserted = self.db.bulk_insert("raw_earthquake_events", records)
+            if isinstance(events, EventBatch):
+                inserted = self.insert_batch(events, batch_id)
+            else:
+                # Prepare records for insertion
+                records = []
+                for event in events:
+                    records.append(
+                        {
+                            "batch_id": batch_id,
+                            "event_id": event["id"],
+                            "raw_data": json.dumps(event),
+                            "ingested_at": datetime.now(timezone.utc),
+                        }
+                    )
+
+                # Bulk insert
+                inserted = self.db.bulk_insert("raw_earthquake_events", records)
 
             # Log batch metadata
             self._log_batch_metadata(
@@ -80,6 +85,49 @@ class RawDataLoader:
 
             raise
 
+    def insert_batch(self, batch: EventBatch, batch_id: str, cursor=None) -> int:
+        """
+        Insert an :class:`EventBatch` into the raw layer without metadata.
+
+        Rows are streamed straight from the batch columns; the stored JSON is
+        the payload encoded when the page was parsed. An event repeated in
+        the same batch (e.g. across shifting result pages) is stored once and
+        counted once: the return value is the number of rows inserted.
+        ``cursor`` runs the insert in the caller's transaction.
+        """
+        ingested_at = datetime.now(timezone.utc)
+        rows = (
+            (batch_id, event_id, payload.decode("utf-8"), ingested_at)
+            for event_id, payload in zip(batch.ids, batch.payloads)
+        )
+        return self.db.bulk_insert_rows(
+            "raw_earthquake_events",
+            ("batch_id", "event_id", "raw_data", "ingested_at"),
+            rows,
+            on_conflict="ON CONFLICT (event_id, batch_id) DO NOTHING",
+            cursor=cursor,
+        )
+
+    def record_batch(
+        self,
+        batch_id: str,
+        start_time: datetime,
+        records_fetched: int,
+        records_inserted: int,
+        status: str,
+        error_message: str = None,
+    ) -> None:
+        """Log ingestion metadata for a batch loaded page by page."""
+        self._log_batch_metadata(
+            batch_id=batch_id,
+            start_time=start_time,
+            end_time=datetime.now(timezone.utc),
+            records_fetched=records_fetched,
+            records_inserted=records_inserted,
+            status=status,
+            error_message=error_message,
+        )
+
     def _log_batch_metadata(
         self,
         batch_id: str,
@@ -112,6 +160,12 @@ class RawDataLoader:
                     VALUES (%(batch_id)s, %(start_time)s, %(end_time)s,
                             %(records_fetched)s, %(records_inserted)s,
                             %(status)s, %(error_message)s)
+                    ON CONFLICT (batch_id) DO UPDATE SET
+                        end_time = EXCLUDED.end_time,
+                        records_fetched = EXCLUDED.records_fetched,
+                        records_inserted = EXCLUDED.records_inserted,
+                        status = EXCLUDED.status,
+                        error_message = EXCLUDED.error_message
                 """,
                     metadata,
                 )
@@ -0,0 +1,25 @@
+# ============================================================================
+# FILE: src/earthquake_elt/ingestion/models.py
+# ============================================================================
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+
+class EarthquakeEvent(BaseModel):
+    """Validation model for earthquake events."""
+
+    id: str
+    magnitude: Optional[float] = Field(
+        None, ge=-2.0, le=10.0
+    )  # Changed: allow negative, None OK
+    magnitude_type: Optional[str] = None
+    place: Optional[str] = None  # Changed: made optional
+    time: datetime
+    latitude: float = Field(..., ge=-90.0, le=90.0)
+    longitude: float = Field(..., ge=-180.0, le=180.0)
+    depth: Optional[float] = Field(None, ge=-10.0, le=800.0)  # Changed: made optional
+
+    class Config:
+        arbitrary_types_allowed = True
@@ -0,0 +1,193 @@
+# ============================================================================
+# FILE: src/earthquake_elt/ingestion/rate_control.py
+# ============================================================================
+"""
+Adaptive request rate and concurrency for the USGS API client.
+
+:class:`AdaptiveRateController` paces requests with a :class:`TokenBucket`
+and caps requests in flight, adjusting both by additive increase /
+multiplicative decrease (AIMD): every successful response raises the rate by
+``increase_per_minute`` and the concurrency by about one per round of
+requests; a 429/503, timeout or connection failure halves both, at most once
+per ``cooldown`` so a burst of throttled responses counts as one signal. A
+``Retry-After`` from the server pauses all requests until it has passed.
+"""
+
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Callable, Iterator, Optional
+
+from earthquake_elt import metrics
+
+logger = logging.getLogger(__name__)
+
+MAX_RETRY_AFTER_SECONDS = 300.0
+# Refill arithmetic leaves tokens at 0.999...; waiting for the last ulp would
+# sleep for less than the clock can resolve and spin forever.
+_EPSILON = 1e-9
+
+
+def parse_retry_after(
+    value: Optional[str], now: Optional[datetime] = None
+) -> Optional[float]:
+    """Seconds to wait from a ``Retry-After`` header (delta-seconds or HTTP-date)."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            when = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if when.tzinfo is None:
+            when = when.replace(tzinfo=timezone.utc)
+        seconds = (when - (now or datetime.now(timezone.utc))).total_seconds()
+    return min(max(seconds, 0.0), MAX_RETRY_AFTER_SECONDS)
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled at ``rate`` tokens per second."""
+
+    def __init__(
+        self,
+        rate: float,
+        burst: float = 1.0,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.rate = rate
+        self.burst = burst
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = burst
+        self._updated = clock()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def set_rate(self, rate: float) -> None:
+        with self._lock:
+            self._refill(self._clock())
+            self.rate = rate
+
+    def pause(self, seconds: float) -> None:
+        """Hand out no tokens for ``seconds`` (e.g. a server's ``Retry-After``)."""
+        with self._lock:
+            now = self._clock()
+            self._paused_until = max(self._paused_until, now + seconds)
+            self._tokens = 0.0
+            self._updated = max(now, self._paused_until)
+
+    def acquire(self) -> float:
+        """Take one token, sleeping until one is available; returns seconds slept."""
+        slept = 0.0
+        while True:
+            with self._lock:
+                now = self._clock()
+                if now < self._paused_until:
+                    wait = self._paused_until - now
+                else:
+                    self._refill(now)
+                    if self._tokens >= 1 - _EPSILON:
+                        self._tokens = max(self._tokens - 1, 0.0)
+                        return slept
+                    wait = (1 - self._tokens) / self.rate
+            self._sleep(wait)
+            slept += wait
+
+
+class AdaptiveRateController:
+    """AIMD control of the request rate (token bucket) and of requests in flight."""
+
+    def __init__(
+        self,
+        rate_per_minute: float,
+        max_rate_per_minute: Optional[float] = None,
+        min_rate_per_minute: float = 6.0,
+        max_concurrency: int = 4,
+        increase_per_minute: float = 1.0,
+        decrease_factor: float = 0.5,
+        cooldown: float = 1.0,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.rate_per_minute = float(rate_per_minute)
+        self.max_rate_per_minute = float(max_rate_per_minute or rate_per_minute)
+        self.min_rate_per_minute = min(min_rate_per_minute, self.rate_per_minute)
+        self.max_concurrency = max_concurrency
+        self.concurrency = 1.0
+        self.increase_per_minute = increase_per_minute
+        self.decrease_factor = decrease_factor
+        self.cooldown = cooldown
+        self._clock = clock
+        self.bucket = TokenBucket(
+            self.rate_per_minute / 60, burst=max_concurrency, clock=clock, sleep=sleep
+        )
+        self._in_flight = 0
+        self._last_decrease = float("-inf")
+        self._cond = threading.Condition()
+        self._publish()
+
+    @contextmanager
+    def request(self) -> Iterator[None]:
+        """Hold a concurrency slot and a rate token for one request."""
+        with self._cond:
+            while self._in_flight >= int(self.concurrency):
+                self._cond.wait()
+            self._in_flight += 1
+        try:
+            slept = self.bucket.acquire()
+            if slept:
+                metrics.API_RATE_LIMIT_SLEEP_SECONDS.inc(slept)
+            yield
+        finally:
+            with self._cond:
+                self._in_flight -= 1
+                self._cond.notify_all()
+
+    def on_success(self) -> None:
+        """Additive increase after a good response."""
+        with self._cond:
+            self.concurrency = min(
+                self.max_concurrency, self.concurrency + 1 / int(self.concurrency)
+            )
+            self.rate_per_minute = min(
+                self.max_rate_per_minute, self.rate_per_minute + self.increase_per_minute
+            )
+            self.bucket.set_rate(self.rate_per_minute / 60)
+            self._cond.notify_all()
+        self._publish()
+
+    def on_throttle(self, retry_after: Optional[float] = None) -> None:
+        """Multiplicative decrease after a 429/503, timeout or dropped connection."""
+        if retry_after:
+            self.bucket.pause(retry_after)
+        with self._cond:
+            now = self._clock()
+            if now - self._last_decrease < max(self.cooldown, retry_after or 0):
+                return
+            self._last_decrease = now
+            self.concurrency = max(1.0, self.concurrency * self.decrease_factor)
+            self.rate_per_minute = max(
+                self.min_rate_per_minute, self.rate_per_minute * self.decrease_factor
+            )
+            self.bucket.set_rate(self.rate_per_minute / 60)
+        logger.warning(
+            f"API throttled: rate {self.rate_per_minute:.0f}/min, "
+            f"concurrency {int(self.concurrency)}"
+            + (f", pausing {retry_after:g}s" if retry_after else "")
+        )
+        self._publish()
+
+    def _publish(self) -> None:
+        metrics.API_RATE_LIMIT_PER_MINUTE.set(self.rate_per_minute)
+        metrics.API_CONCURRENCY_LIMIT.set(int(self.concurrency))
@@ -1,30 +1,22 @@
 # ============================================================================
 # FILE: src/ingestion/validators.py
 # ============================================================================
-from typing import Dict, Any, List, Tuple, Optional
-from pydantic import BaseModel, Field
-from datetime import datetime
+from typing import Dict, Any, List, Tuple, Optional, Union
 import logging
 
-logger = logging.getLogger(__name__)
+from earthquake_elt import metrics
+from earthquake_elt.ingestion.batch import MISSING_INT, EventBatch, EventRow
 
+logger = logging.getLogger(__name__)
 
-class EarthquakeEvent(BaseModel):
-    """Validation model for earthquake events."""
 
-    id: str
-    magnitude: Optional[float] = Field(
-        None, ge=-2.0, le=10.0
-    )  # Changed: allow negative, None OK
-    magnitude_type: Optional[str] = None
-    place: Optional[str] = None  # Changed: made optional
-    time: datetime
-    latitude: float = Field(..., ge=-90.0, le=90.0)
-    longitude: float = Field(..., ge=-180.0, le=180.0)
-    depth: Optional[float] = Field(None, ge=-10.0, le=800.0)  # Changed: made optional
+def __getattr__(name: str):
+    # EarthquakeEvent moved to models.py so validation does not import pydantic.
+    if name == "EarthquakeEvent":
+        from .models import EarthquakeEvent
 
-    class Config:
-        arbitrary_types_allowed = True
+        return EarthquakeEvent
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 class DataValidator:
@@ -82,9 +74,16 @@ class DataValidator:
             return False, f"Validation error: {str(e)}"
 
     def validate_batch(
-        self, events: List[Dict[str, Any]]
+        self, events: Union[List[Dict[str, Any]], EventBatch]
     ) -> Tuple[List[Dict], List[Tuple[Dict, str]]]:
-        """Validate batch. Returns (valid_events, invalid_events_with_errors)."""
+        """Validate batch. Returns (valid_events, invalid_events_with_errors).
+
+        An :class:`EventBatch` is validated column-wise and yields an
+        ``EventBatch`` of valid events plus ``(EventRow, error)`` pairs.
+        """
+        if isinstance(events, EventBatch):
+            return self._validate_event_batch(events)
+
         valid_events = []
         invalid_events = []
 
@@ -95,6 +94,7 @@ class DataValidator:
                 valid_events.append(event)
             else:
                 invalid_events.append((event, error_msg))
+                metrics.VALIDATION_REJECTS.inc(reason=error_msg.split(":", 1)[0])
                 logger.warning(f"Invalid event {event.get('id', 'unknown')}: {error_msg}")
 
         logger.info(
@@ -103,6 +103,52 @@ class DataValidator:
 
         return valid_events, invalid_events
 
+    def _validate_event_batch(
+        self, batch: EventBatch
+    ) -> Tuple[EventBatch, List[Tuple[EventRow, str]]]:
+        """Apply the same checks as ``validate_event`` to the batch columns."""
+        checks = [
+            (field_path, self._column_check(batch, field_path))
+            for field_path in self.required_fields
+        ]
+        n_coords = batch.n_coords
+        valid_indices = []
+        invalid_events = []
+
+        for i in range(len(batch)):
+            error_msg = None
+            for field_path, present in checks:
+                if not present(i):
+                    error_msg = f"Missing required field: {field_path}"
+                    break
+            if error_msg is None and n_coords[i] < 2:
+                error_msg = "Invalid coordinates format"
+
+            if error_msg is None:
+                valid_indices.append(i)
+            else:
+                row = batch[i]
+                invalid_events.append((row, error_msg))
+                metrics.VALIDATION_REJECTS.inc(reason=error_msg.split(":", 1)[0])
+                logger.warning(f"Invalid event {row.id or 'unknown'}: {error_msg}")
+
+        valid = batch if len(valid_indices) == len(batch) else batch.take(valid_indices)
+        logger.info(f"Validation: {len(valid)} valid, {len(invalid_events)} invalid")
+        return valid, invalid_events
+
+    def _column_check(self, batch: EventBatch, field_path: str):
+        """Return ``index -> bool`` mirroring the truthiness test of the dict path."""
+        if field_path == "id":
+            return lambda i: bool(batch.ids[i])
+        if field_path == "properties.time":
+            return lambda i: batch.time[i] not in (MISSING_INT, 0)
+        if field_path == "properties.mag":
+            return lambda i: batch.mag[i] == batch.mag[i] and batch.mag[i] != 0
+        if field_path == "geometry.coordinates":
+            return lambda i: batch.n_coords[i] > 0
+        # Fields without a column are checked against the decoded payload.
+        return lambda i: bool(self._get_nested_value(batch[i].to_dict(), field_path))
+
     @staticmethod
     def _get_nested_value(d: Dict, path: str) -> Any:
         """Get value from nested dict using dot notation."""
@@ -0,0 +1,59 @@
+# ============================================================================
+# FILE: src/earthquake_elt/logging_config.py
+# ============================================================================
+import json
+import logging
+import os
+import sys
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+TEXT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+# Attributes every LogRecord carries; anything else was passed via ``extra``.
+_RESERVED = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+
+class JsonFormatter(logging.Formatter):
+    """Render records as one JSON object per line, including ``extra`` fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload: Dict[str, Any] = {
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED and not key.startswith("_"):
+                payload[key] = value
+        if record.exc_info:
+            payload["exception"] = self.formatException(record.exc_info)
+        return json.dumps(payload, default=str)
+
+
+def setup_logging(
+    config: Optional[Dict[str, Any]] = None, log_file: Optional[str] = "logs/pipeline.log"
+) -> None:
+    """
+    Configure root logging for a process entry point (CLI, container).
+
+    Library modules only create loggers; hosts such as Airflow keep their own
+    handlers and never call this. Applies ``[ingestion] log_level`` and
+    ``log_format`` and logs to stdout plus ``log_file`` when given.
+    """
+    ingestion = (config or {}).get("ingestion", {})
+    if ingestion.get("log_format", "text") == "json":
+        formatter = JsonFormatter()
+    else:
+        formatter = logging.Formatter(TEXT_FORMAT)
+
+    handlers: List[logging.Handler] = [logging.StreamHandler(sys.stdout)]
+    if log_file:
+        os.makedirs(os.path.dirname(log_file) or ".", exist_ok=True)
+        handlers.append(logging.FileHandler(log_file))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+    logging.basicConfig(
+        level=ingestion.get("log_level", "INFO"), handlers=handlers, force=True
+    )
@@ -0,0 +1,319 @@
+# ============================================================================
+# FILE: src/earthquake_elt/metrics.py
+# ============================================================================
+"""
+In-process metrics with Prometheus text exposition.
+
+Counters, gauges and histograms live in a :class:`MetricsRegistry`. The
+pipeline records into the module-level ``REGISTRY`` and exports it either as
+a node_exporter textfile or through a small ``/metrics`` scrape endpoint.
+"""
+
+import logging
+import math
+import os
+import tempfile
+import threading
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Tuple
+
+if TYPE_CHECKING:
+    from http.server import ThreadingHTTPServer
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict[str, str]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_labels(key: LabelKey, extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+    pairs = key + extra
+    if not pairs:
+        return ""
+    escaped = (
+        (k, v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for k, v in pairs
+    )
+    return "{" + ",".join(f'{k}="{v}"' for k, v in escaped) + "}"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+class _Metric:
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str):
+        self.name = name
+        self.documentation = documentation
+        self._lock = threading.Lock()
+
+    def header(self) -> List[str]:
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type_name}",
+        ]
+
+
+class Counter(_Metric):
+    """Monotonically increasing value."""
+
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str):
+        super().__init__(name, documentation)
+        self._values: Dict[LabelKey, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        if amount < 0:
+            raise ValueError("Counters can only increase")
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(_label_key(labels), 0.0)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(k)} {_format_value(v)}" for k, v in items]
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            return {_format_labels(k) or "total": v for k, v in self._values.items()}
+
+
+class Gauge(Counter):
+    """Value that can go up and down."""
+
+    type_name = "gauge"
+
+    def set(self, value: float, **labels) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+
+class Histogram(_Metric):
+    """Cumulative-bucket histogram of observed values."""
+
+    type_name = "histogram"
+
+    def __init__(
+        self, name: str, documentation: str, buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        super().__init__(name, documentation)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        # label key -> [bucket counts..., sum, count]
+        self._values: Dict[LabelKey, List[float]] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [0.0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[i] += 1
+                    break
+            state[-2] += value
+            state[-1] += 1
+
+    def count(self, **labels) -> int:
+        state = self._values.get(_label_key(labels))
+        return int(state[-1]) if state else 0
+
+    def sum(self, **labels) -> float:
+        state = self._values.get(_label_key(labels))
+        return state[-2] if state else 0.0
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = sorted((k, list(v)) for k, v in self._values.items())
+        lines = []
+        for key, state in items:
+            cumulative = 0.0
+            for bound, hits in zip(self.buckets, state):
+                cumulative += hits
+                le = (("le", _format_value(bound)),)
+                labels = _format_labels(key, le)
+                lines.append(f"{self.name}_bucket{labels} {_format_value(cumulative)}")
+            lines.append(
+                f"{self.name}_sum{_format_labels(key)} {_format_value(state[-2])}"
+            )
+            lines.append(
+                f"{self.name}_count{_format_labels(key)} {_format_value(state[-1])}"
+            )
+        return lines
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            return {
+                _format_labels(k) or "total": {"count": v[-1], "sum": round(v[-2], 6)}
+                for k, v in self._values.items()
+            }
+
+
+class MetricsRegistry:
+    """Named collection of metrics rendered together."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                if type(existing) is not type(metric):
+                    raise ValueError(f"Metric {metric.name} already registered")
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str) -> Counter:
+        return self._register(Counter(name, documentation))
+
+    def gauge(self, name: str, documentation: str) -> Gauge:
+        return self._register(Gauge(name, documentation))
+
+    def histogram(
+        self, name: str, documentation: str, buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, buckets))
+
+    def render(self) -> str:
+        """Render all metrics in the Prometheus text exposition format."""
+        lines: List[str] = []
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda m: m.name)
+        for metric in metrics:
+            lines.extend(metric.header())
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """Return recorded values as plain dicts, for JSON logs and stats."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return {m.name: snap for m in metrics if (snap := m.snapshot())}
+
+    def write_textfile(self, path: str) -> None:
+        """Atomically write metrics for the node_exporter textfile collector."""
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".prom.tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                f.write(self.render())
+            os.replace(tmp_path, path)
+        except Exception:
+            os.unlink(tmp_path)
+            raise
+        logger.info(f"Metrics written to {path}")
+
+
+def start_http_server(
+    port: int, host: str = "0.0.0.0", registry: Optional[MetricsRegistry] = None
+) -> "ThreadingHTTPServer":
+    """Serve ``/metrics`` from a daemon thread; returns the server for shutdown."""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    registry = registry or REGISTRY
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def log_message(self, format: str, *args) -> None:
+            logger.debug(format % args)
+
+        def do_GET(self) -> None:
+            if self.path.split("?")[0] not in ("/", "/metrics"):
+                self.send_error(404)
+                return
+            body = registry.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    logger.info(f"Serving metrics on http://{host}:{server.server_address[1]}/metrics")
+    return server
+
+
+REGISTRY = MetricsRegistry()
+
+API_REQUEST_SECONDS = REGISTRY.histogram(
+    "earthquake_api_request_seconds", "USGS API request latency by HTTP status"
+)
+API_RATE_LIMIT_SLEEP_SECONDS = REGISTRY.counter(
+    "earthquake_api_rate_limit_sleep_seconds_total",
+    "Time spent waiting on the rate limiter",
+)
+API_PAGES = REGISTRY.counter("earthquake_api_pages_total", "Result pages fetched")
+API_PAGES_FAILED = REGISTRY.counter(
+    "earthquake_api_pages_failed_total",
+    "Result page fetches that failed after all retries (pages are re-queued)",
+)
+API_THROTTLED = REGISTRY.counter(
+    "earthquake_api_throttled_total", "Throttling responses (429/503) by status"
+)
+API_RATE_LIMIT_PER_MINUTE = REGISTRY.gauge(
+    "earthquake_api_rate_limit_per_minute", "Current adaptive request rate"
+)
+API_CONCURRENCY_LIMIT = REGISTRY.gauge(
+    "earthquake_api_concurrency_limit", "Current adaptive limit on requests in flight"
+)
+API_BYTES_RECEIVED = REGISTRY.counter(
+    "earthquake_api_bytes_received_total", "Response body bytes received from the API"
+)
+API_EVENTS_FETCHED = REGISTRY.counter(
+    "earthquake_api_events_fetched_total", "Events returned by the API"
+)
+INGESTION_EVENTS_PER_SECOND = REGISTRY.gauge(
+    "earthquake_ingestion_events_per_second", "Fetch throughput of the last ingestion run"
+)
+VALIDATION_REJECTS = REGISTRY.counter(
+    "earthquake_validation_rejects_total", "Events rejected by validation, by reason"
+)
+DB_POOL_WAIT_SECONDS = REGISTRY.histogram(
+    "earthquake_db_pool_wait_seconds",
+    "Time spent acquiring a pooled database connection",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0),
+)
+ROWS_LOADED = REGISTRY.counter("earthquake_rows_loaded_total", "Rows inserted, by table")
+TRANSFORM_STEP_SECONDS = REGISTRY.histogram(
+    "earthquake_transform_step_seconds", "Duration of each transformation step"
+)
+STAGE_SECONDS = REGISTRY.histogram(
+    "earthquake_pipeline_stage_seconds", "Duration of each pipeline stage"
+)
+LAST_SUCCESS_TIMESTAMP = REGISTRY.gauge(
+    "earthquake_pipeline_last_success_timestamp_seconds",
+    "Unix time of the last successful pipeline run",
+)
+STREAM_POLLS = REGISTRY.counter(
+    "earthquake_stream_polls_total", "Streaming feed polls, by outcome"
+)
+STREAM_EVENT_LATENCY_SECONDS = REGISTRY.histogram(
+    "earthquake_stream_event_latency_seconds",
+    "Time from an event's USGS update to its fact row being committed",
+    buckets=(5.0, 10.0, 20.0, 30.0, 45.0, 60.0, 90.0, 120.0, 300.0, 600.0),
+)
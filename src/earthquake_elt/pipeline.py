@@ -2,39 +2,70 @@
 # FILE: src/pipeline.py
 # ============================================================================
 import logging
-import sys
+import time
+from contextlib import contextmanager
 from datetime import datetime, timedelta, timezone
-from typing import Dict, Any
+from functools import partial
+from typing import Callable, Dict, Any, Optional
 import uuid
 
+from earthquake_elt import metrics
+from earthquake_elt.analytics import INVALIDATION_CHANNEL
 from earthquake_elt.config import load_config
 from earthquake_elt.database import Database
-from earthquake_elt.ingestion import USGSAPIClient
-from earthquake_elt.ingestion import DataValidator
-from earthquake_elt.ingestion import ErrorHandler
-from earthquake_elt.ingestion import RawDataLoader
-
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    handlers=[
-        logging.FileHandler("logs/pipeline.log"),
-        logging.StreamHandler(sys.stdout),
-    ],
-)
+from earthquake_elt.profiling import StageProfiler
+
 logger = logging.getLogger(__name__)
 
 
 class EarthquakePipeline:
     """Main ELT pipeline orchestrator."""
 
-    def __init__(self, config_path: str = "config/config.toml"):
+    def __init__(
+        self,
+        config_path: str = "config/config.toml",
+        profile: Optional[bool] = None,
+        profile_memory: Optional[bool] = None,
+    ):
+        # Imported here so that importing this module (e.g. during Airflow DAG
+        # parsing) does not load requests/pydantic.
+        from earthquake_elt.ingestion import (
+            CheckpointStore,
+            DataValidator,
+            ErrorHandler,
+            RawDataLoader,
+            USGSAPIClient,
+        )
+        from earthquake_elt.analytics.sketches import SketchStore
+        from earthquake_elt.transform import create_engine
+
         self.config = load_config(config_path)
+        self.profiler = StageProfiler.from_config(
+            self.config, enabled=profile, trace_memory=profile_memory
+        )
+        self.metrics_config = self.config.get("metrics", {})
+        self._metrics_server = None
+        if self.metrics_config.get("http_port"):
+            self._metrics_server = metrics.start_http_server(
+                self.metrics_config["http_port"]
+            )
         self.db = Database(self.config)
+        if self.config["database"].get("apply_schema", True):
+            self.db.apply_schema()
         self.api_client = USGSAPIClient(self.config)
+        self.api_client.worker_profile = lambda: self.profiler.profile_thread("fetch")
         self.validator = DataValidator(self.config)
         self.loader = RawDataLoader(self.db)
         self.error_handler = ErrorHandler(self.db, self.config)
+        self.checkpoints = None
+        if self.config.get("ingestion", {}).get("checkpoint_enabled", False):
+            self.checkpoints = CheckpointStore(self.db)
+        self.transform_engine = create_engine(
+            self.config, self.db, step=self._transform_step
+        )
+        self.sketches = None
+        if self.config.get("sketches", {}).get("enabled", True):
+            self.sketches = SketchStore.from_config(self.db, self.config)
         logger.info("Pipeline initialized")
 
     def run_ingestion(
@@ -42,10 +73,25 @@ class EarthquakePipeline:
         start_time: datetime = None,
         end_time: datetime = None,
         lookback_days: int = None,
+        on_page: Optional[Callable[[], Optional[bool]]] = None,
+        batch_id: Optional[str] = None,
     ) -> Dict[str, Any]:
-        """Run ingestion phase."""
-        batch_id = str(uuid.uuid4())
+        """
+        Run ingestion phase; ``on_page`` is called after each loaded page.
+
+        If ``on_page`` returns ``False`` the batch is abandoned: the pages
+        loaded so far stay committed, the batch is neither finished nor
+        failed, and the returned status is ``"abandoned"``.
+
+        With ``[ingestion] checkpoint_enabled`` every page is committed
+        together with its checkpoint, and passing the ``batch_id`` of an
+        interrupted run resumes it with the pages it had not committed.
+        """
+        batch_id = batch_id or str(uuid.uuid4())
+        on_page = on_page or (lambda: None)
         logger.info(f"Starting ingestion (batch: {batch_id})")
+        # A worker ingests many shards; each gets its own error budget.
+        self.error_handler.reset()
         try:
             if not end_time:
                 # end_time = datetime.utcnow()
@@ -53,79 +99,382 @@ class EarthquakePipeline:
             if not start_time:
                 lookback = lookback_days or self.config["api"]["lookback_days"]
                 start_time = end_time - timedelta(days=lookback)
+            counts = {"fetched": 0, "valid": 0, "invalid": 0, "loaded": 0}
+            done_offsets, event_count = frozenset(), None
+            if self.checkpoints is not None:
+                checkpoint = self.checkpoints.begin(
+                    batch_id, start_time, end_time, self.api_client.batch_size
+                )
+                start_time, end_time = checkpoint.start_time, checkpoint.end_time
+                if checkpoint.status == "success":
+                    logger.info(f"Batch {batch_id} is already complete")
+                    return self._ingestion_stats(
+                        batch_id, checkpoint.counts, start_time, end_time
+                    )
+                event_count = self.api_client.count_window(start_time, end_time)
+                checkpoint = self.checkpoints.verify(
+                    checkpoint,
+                    event_count,
+                    partial(self.api_client.event_id_at, start_time, end_time),
+                )
+                counts = dict(checkpoint.counts)
+                done_offsets = checkpoint.completed_offsets
             logger.info(f"Fetching events from {start_time} to {end_time}")
 
-            # Extract
-            events = self.api_client.fetch_earthquakes(start_time, end_time)
-            logger.info(f"Fetched {len(events)} events from API")
-            if not events:
-                logger.warning("No events returned")
-                return {"status": "success", "events_fetched": 0}
+            # Extract, validate and load page by page so that only one page of
+            # events is held in memory at a time.
+            pages = self.api_client.iter_pages(
+                start_time, end_time, skip_offsets=done_offsets, event_count=event_count
+            )
+            load_started = datetime.now(timezone.utc)
+            try:
+                completed = self._ingest_pages(pages, batch_id, counts, on_page)
+            except Exception as e:
+                self._finish_batch(batch_id, load_started, counts, "failed", str(e))
+                raise
+            finally:
+                pages.close()
+            if not completed:
+                return self._ingestion_stats(
+                    batch_id, counts, start_time, end_time, "abandoned"
+                )
 
-            # Validate
-            valid_events, invalid_events = self.validator.validate_batch(events)
+            logger.info(f"Fetched {counts['fetched']} events from API")
+            self._finish_batch(batch_id, load_started, counts, "success")
+            if not counts["fetched"]:
+                logger.warning("No events returned")
+                return self._ingestion_stats(batch_id, counts, start_time, end_time)
             logger.info(
-                f"Validation: {len(valid_events)} valid, {len(invalid_events)} invalid"
+                f"Validation: {counts['valid']} valid, {counts['invalid']} invalid"
+            )
+            return self._ingestion_stats(batch_id, counts, start_time, end_time)
+        except Exception as e:
+            logger.error(f"Ingestion failed: {str(e)}", exc_info=True)
+            raise
+        finally:
+            self.profiler.write_reports()
+
+    def _ingest_pages(
+        self,
+        pages,
+        batch_id: str,
+        counts: Dict[str, int],
+        on_page: Callable[[], Optional[bool]],
+    ) -> bool:
+        """Load ``(offset, batch)`` pages; ``False`` if ``on_page`` abandoned them."""
+        while True:
+            with self._stage("fetch"):
+                page = next(pages, None)
+            if page is None:
+                return True
+            offset, batch = page
+            self._ingest_page(batch, batch_id, counts, offset=offset)
+            if on_page() is False:
+                logger.warning(f"Abandoning batch {batch_id} after offset {offset}")
+                return False
+
+    def _finish_batch(
+        self,
+        batch_id: str,
+        started: datetime,
+        counts: Dict[str, int],
+        status: str,
+        error_message: Optional[str] = None,
+    ) -> None:
+        if counts["loaded"]:
+            self.loader.record_batch(
+                batch_id,
+                started,
+                counts["valid"],
+                counts["loaded"],
+                status=status,
+                error_message=error_message,
+            )
+            if status == "success":
+                logger.info(f"Loaded {counts['loaded']} events to raw layer")
+        if self.checkpoints is not None:
+            self.checkpoints.finish(batch_id, status)
+
+    @staticmethod
+    def _ingestion_stats(
+        batch_id: str,
+        counts: Dict[str, int],
+        start_time: datetime,
+        end_time: datetime,
+        status: str = "success",
+    ) -> Dict[str, Any]:
+        return {
+            "status": status,
+            "batch_id": batch_id,
+            "events_fetched": counts["fetched"],
+            "events_valid": counts["valid"],
+            "events_invalid": counts["invalid"],
+            "events_loaded": counts["loaded"],
+            "start_time": start_time.isoformat(),
+            "end_time": end_time.isoformat(),
+        }
+
+    def run_worker(
+        self,
+        start_time: datetime = None,
+        end_time: datetime = None,
+        run_key: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Ingest shards of a time window claimed from ``ingestion_shards``.
+
+        Any number of workers started with the same window (or ``run_key``)
+        split its shards between them. The window defaults to the
+        ``lookback_days`` ending at today's UTC midnight, so workers started
+        on the same day agree on it. A worker whose lease on a shard is lost
+        (the heartbeat after a page fails) stops working on it and leaves it
+        to the worker that took it over. The worker that finds no shard left
+        to do runs the transformations.
+        """
+        from earthquake_elt.coordination import ShardQueue
+
+        if not end_time:
+            end_time = datetime.now(timezone.utc).replace(
+                hour=0, minute=0, second=0, microsecond=0
             )
+        if not start_time:
+            start_time = end_time - timedelta(days=self.config["api"]["lookback_days"])
+        queue = ShardQueue.from_config(
+            self.db, self.config, run_key or ShardQueue.run_key_for(start_time, end_time)
+        )
+        queue.plan(start_time, end_time)
+
+        done = failed = lost = loaded = 0
+        while True:
+            shard = queue.claim()
+            if shard is None:
+                break
+            try:
+                # A retried shard reuses its batch, resuming from its checkpoint.
+                stats = self.run_ingestion(
+                    shard.start_time,
+                    shard.end_time,
+                    on_page=lambda: queue.heartbeat(shard),
+                    batch_id=str(
+                        uuid.uuid5(
+                            uuid.NAMESPACE_URL, f"{queue.run_key}#{shard.shard_id}"
+                        )
+                    ),
+                )
+            except Exception as e:
+                queue.fail(shard, str(e))
+                failed += 1
+                continue
+            if stats.get("status") == "abandoned":
+                lost += 1
+                continue
+            events_loaded = stats.get("events_loaded", 0)
+            if queue.complete(shard, stats.get("batch_id"), events_loaded):
+                done += 1
+                loaded += events_loaded
+
+        stats = {
+            "status": "success" if not failed else "partial",
+            "run_key": queue.run_key,
+            "shards_done": done,
+            "shards_failed": failed,
+            "shards_lost": lost,
+            "events_loaded": loaded,
+        }
+        remaining = queue.remaining()
+        if remaining:
+            logger.info(f"{remaining} shards still in progress; leaving transforms")
+        else:
+            stats["shards"] = queue.status_counts()
+            stats["transformations"] = self.run_transformations()
+        logger.info(f"Worker finished: {stats}")
+        return stats
+
+    def _ingest_page(
+        self,
+        batch,
+        batch_id: str,
+        counts: Dict[str, int],
+        transform: bool = True,
+        offset: Optional[int] = None,
+    ):
+        """
+        Validate one page, log its rejects and load the valid events.
+
+        With checkpoints, the page's raw rows, its ``offset`` and the
+        engine's page writes share one transaction, in that order, so the
+        three commit or roll back together.
+        """
+        # Validate
+        with self._stage("validate"):
+            valid_events, invalid_events = self.validator.validate_batch(batch)
+        page = {"fetched": len(batch), "valid": len(valid_events), "loaded": 0}
+        page["invalid"] = len(invalid_events)
 
-            # Log errors
-            for event, error_msg in invalid_events:
+        # Log errors
+        with self._stage("log_errors"):
+            for row, error_msg in invalid_events:
                 self.error_handler.log_error(
-                    event_id=event.get("id", "unknown"),
+                    event_id=row.id or "unknown",
                     error_type="validation_error",
                     error_message=error_msg,
-                    raw_data=event,
+                    raw_data=row.to_dict(),
                     batch_id=batch_id,
                 )
 
-            if self.error_handler.check_threshold():
-                raise Exception("Error threshold exceeded")
+        if self.error_handler.check_threshold():
+            raise Exception("Error threshold exceeded")
 
-            # Load
-            if valid_events:
-                load_stats = self.loader.load_batch(valid_events, batch_id)
-                logger.info(f"Loaded {load_stats['inserted']} events to raw layer")
-
-            return {
-                "status": "success",
-                "batch_id": batch_id,
-                "events_fetched": len(events),
-                "events_valid": len(valid_events),
-                "events_invalid": len(invalid_events),
-                "events_loaded": len(valid_events),
-                "start_time": start_time.isoformat(),
-                "end_time": end_time.isoformat(),
-            }
-        except Exception as e:
-            logger.error(f"Ingestion failed: {str(e)}", exc_info=True)
-            raise
+        # Load
+        transform = transform and len(valid_events) > 0
+        if offset is None or self.checkpoints is None:
+            if len(valid_events):
+                with self._stage("raw_load"):
+                    page["loaded"] = self.loader.insert_batch(valid_events, batch_id)
+            if transform:
+                self.transform_engine.on_batch_loaded(valid_events, batch_id)
+        else:
+            with self.db.get_connection() as conn:
+                with conn.cursor() as cur:
+                    with self._stage("raw_load"):
+                        if len(valid_events):
+                            page["loaded"] = self.loader.insert_batch(
+                                valid_events, batch_id, cursor=cur
+                            )
+                        self.checkpoints.commit_page(
+                            cur, batch_id, offset, page, batch.ids[-1]
+                        )
+                    if transform:
+                        self.transform_engine.on_batch_loaded(
+                            valid_events, batch_id, cursor=cur
+                        )
+        for key, value in page.items():
+            counts[key] += value
+        return valid_events
 
     def run_transformations(self) -> Dict[str, Any]:
-        """Run SQL transformations."""
-        logger.info("Starting transformations")
+        """Run the configured transform engine over the ingested data."""
+        logger.info(f"Starting transformations ({self.transform_engine.name} engine)")
         try:
-            logger.info("Transforming raw → staging")
-            self.db.execute_sql_file("sql/transformations/load_staging.sql")
-            logger.info("Transforming staging → warehouse")
-            self.db.execute_sql_file("sql/transformations/load_warehouse.sql")
+            self.transform_engine.finalize()
+            self._update_sketches()
+            self._notify_warehouse_updated()
             stats = self._get_layer_counts()
             logger.info(f"Transformations complete: {stats}")
             return stats
         except Exception as e:
             logger.error(f"Transformations failed: {str(e)}", exc_info=True)
             raise
+        finally:
+            self.profiler.write_reports()
+
+    def process_micro_batch(self, batch) -> Dict[str, Any]:
+        """
+        Validate, load and transform one micro-batch of changed events.
+
+        Only the batch's events are staged and upserted into the warehouse
+        (:meth:`TransformEngine.load_events`), so the cost scales with the
+        batch, not the table.
+        """
+        batch_id = str(uuid.uuid4())
+        counts = {"fetched": 0, "valid": 0, "invalid": 0, "loaded": 0}
+        started = datetime.now(timezone.utc)
+        self.error_handler.reset()
+        try:
+            valid_events = self._ingest_page(batch, batch_id, counts, transform=False)
+            event_ids = list(valid_events.ids)
+            if counts["loaded"]:
+                self.transform_engine.load_events(valid_events, batch_id)
+                self.loader.record_batch(
+                    batch_id, started, counts["valid"], counts["loaded"], "success"
+                )
+                self._update_sketches()
+                self._notify_warehouse_updated()
+        except Exception as e:
+            if counts["loaded"]:
+                self.loader.record_batch(
+                    batch_id,
+                    started,
+                    counts["valid"],
+                    counts["loaded"],
+                    status="failed",
+                    error_message=str(e),
+                )
+            raise
+        finally:
+            self.profiler.write_reports()
+        metrics.LAST_SUCCESS_TIMESTAMP.set(datetime.now(timezone.utc).timestamp())
+        return {
+            "batch_id": batch_id,
+            "events_valid": counts["valid"],
+            "events_invalid": counts["invalid"],
+            "events_loaded": counts["loaded"],
+            "event_ids": event_ids if counts["loaded"] else [],
+        }
+
+    def run_daemon(
+        self,
+        feed: Optional[str] = None,
+        poll_interval: Optional[float] = None,
+        max_polls: Optional[int] = None,
+    ) -> None:
+        """Run as a long-lived streaming daemon over the real-time feed."""
+        import signal
+        import threading
+
+        from earthquake_elt.streaming import StreamingDaemon
+
+        daemon = StreamingDaemon.from_config(
+            self, self.config, feed=feed, poll_interval=poll_interval
+        )
+        if threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGTERM, lambda *_: daemon.stop())
+        try:
+            daemon.run(max_polls=max_polls)
+        except KeyboardInterrupt:
+            logger.info("Streaming daemon interrupted")
+        finally:
+            self.db.close_pool()
+            self.export_metrics()
+
+    def _update_sketches(self) -> None:
+        """Fold newly inserted facts into the daily sketches."""
+        if self.sketches is None:
+            return
+        try:
+            with self._transform_step("update_sketches"):
+                self.sketches.update()
+        except Exception as e:
+            # The watermark did not move; the next run picks these facts up.
+            logger.warning(f"Failed to update sketches: {str(e)}")
+
+    def _notify_warehouse_updated(self) -> None:
+        """Tell query services listening on the channel to drop cached results."""
+        try:
+            with self.db.get_connection() as conn:
+                with conn.cursor() as cur:
+                    cur.execute(
+                        "SELECT pg_notify(%s, %s)",
+                        (INVALIDATION_CHANNEL, datetime.now(timezone.utc).isoformat()),
+                    )
+        except Exception as e:
+            # Cached results still expire by TTL; the load itself succeeded.
+            logger.warning(f"Failed to notify {INVALIDATION_CHANNEL}: {str(e)}")
 
     def run_full_pipeline(
-        self, start_time: datetime = None, end_time: datetime = None
+        self,
+        start_time: datetime = None,
+        end_time: datetime = None,
+        batch_id: Optional[str] = None,
     ) -> Dict[str, Any]:
-        """Run complete pipeline."""
+        """Run complete pipeline; ``batch_id`` resumes an interrupted ingestion."""
         logger.info("=" * 80)
         logger.info("Starting full pipeline execution")
         logger.info("=" * 80)
         # pipeline_start = datetime.utcnow()
         pipeline_start = datetime.now(timezone.utc)
         try:
-            ingestion_stats = self.run_ingestion(start_time, end_time)
+            ingestion_stats = self.run_ingestion(start_time, end_time, batch_id=batch_id)
             transform_stats = self.run_transformations()
             # pipeline_end = datetime.utcnow()
             pipeline_end = datetime.now(timezone.utc)
@@ -137,6 +486,7 @@ class EarthquakePipeline:
                 "transformations": transform_stats,
                 "completed_at": pipeline_end.isoformat(),
             }
+            metrics.LAST_SUCCESS_TIMESTAMP.set(pipeline_end.timestamp())
             logger.info("=" * 80)
             logger.info(f"Pipeline completed in {duration:.2f}s")
             logger.info("=" * 80)
@@ -146,6 +496,42 @@ class EarthquakePipeline:
             raise
         finally:
             self.db.close_pool()
+            self.export_metrics()
+
+    def export_metrics(self, log_snapshot: bool = True) -> None:
+        """Log a metrics snapshot and write the Prometheus textfile if configured."""
+        if log_snapshot:
+            logger.info(
+                "Pipeline metrics", extra={"metrics": metrics.REGISTRY.snapshot()}
+            )
+        textfile_path = self.metrics_config.get("textfile_path")
+        if textfile_path:
+            try:
+                metrics.REGISTRY.write_textfile(textfile_path)
+            except OSError as e:
+                logger.error(f"Failed to write metrics textfile: {str(e)}")
+
+    @contextmanager
+    def _stage(self, name: str):
+        """Record the duration of a pipeline stage, profiling it if enabled."""
+        started = time.perf_counter()
+        try:
+            with self.profiler.profile(name):
+                yield
+        finally:
+            metrics.STAGE_SECONDS.observe(time.perf_counter() - started, stage=name)
+
+    @contextmanager
+    def _transform_step(self, name: str):
+        """Record the duration of a transformation step, profiling it if enabled."""
+        started = time.perf_counter()
+        try:
+            with self.profiler.profile(f"transform_{name}"):
+                yield
+        finally:
+            metrics.TRANSFORM_STEP_SECONDS.observe(
+                time.perf_counter() - started, step=name
+            )
 
     def run(self):
         """
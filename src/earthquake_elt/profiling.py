@@ -0,0 +1,219 @@
+# ============================================================================
+# FILE: src/earthquake_elt/profiling.py
+# ============================================================================
+import io
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+if TYPE_CHECKING:
+    import cProfile
+    import tracemalloc
+
+logger = logging.getLogger(__name__)
+
+_DISABLED = nullcontext()
+
+
+class _StageRecord:
+    """Accumulated profile of every invocation of one stage."""
+
+    def __init__(self, profiler: "cProfile.Profile"):
+        self.profiler = profiler
+        self.calls = 0
+        self.wall_seconds = 0.0
+        self.cpu_seconds = 0.0
+        self.peak_memory_bytes: Optional[int] = None
+        self.snapshot: Optional["tracemalloc.Snapshot"] = None
+        # One profile per invocation of :meth:`StageProfiler.profile_thread`.
+        self.thread_profiles: List["cProfile.Profile"] = []
+
+
+class StageProfiler:
+    """
+    Optional CPU and memory profiling of pipeline stages.
+
+    When enabled, each stage wrapped in :meth:`profile` is profiled with
+    cProfile; a stage entered several times (e.g. once per page) accumulates
+    into one profile. :meth:`write_reports` then writes ``<stage>.pstats``, a
+    top-N text summary and, with ``tracemalloc``, the peak traced memory plus
+    the largest allocation sites still live at the end of the invocation that
+    reached it, to ``<output_dir>/<run_id>/``. cProfile only sees the thread
+    that enables it, so work a stage hands to worker threads is profiled with
+    :meth:`profile_thread` in those threads and merged into the stage's
+    report. When disabled, :meth:`profile` returns a shared no-op context
+    manager.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = False,
+        output_dir: str = "profiles",
+        trace_memory: bool = False,
+        top_n: int = 25,
+        run_id: Optional[str] = None,
+    ):
+        self.enabled = enabled
+        self.trace_memory = trace_memory
+        self.top_n = top_n
+        self.run_id = run_id or datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        self.run_dir = Path(output_dir) / self.run_id
+        self._stages: Dict[str, _StageRecord] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(
+        cls,
+        config: Dict[str, Any],
+        enabled: Optional[bool] = None,
+        trace_memory: Optional[bool] = None,
+    ) -> "StageProfiler":
+        """Build from ``[profiling]``; explicit arguments override the config."""
+        profiling = config.get("profiling", {})
+        if enabled is None:
+            enabled = profiling.get("enabled", False)
+        if trace_memory is None:
+            trace_memory = profiling.get("tracemalloc", False)
+        return cls(
+            enabled=enabled,
+            output_dir=profiling.get("output_dir", "profiles"),
+            trace_memory=trace_memory,
+            top_n=profiling.get("top_n", 25),
+        )
+
+    def profile(self, stage: str):
+        """Context manager profiling ``stage``; a no-op when disabled."""
+        if not self.enabled:
+            return _DISABLED
+        return self._profile(stage)
+
+    def profile_thread(self, stage: str):
+        """
+        Context manager profiling part of ``stage`` in a worker thread.
+
+        Each invocation gets its own cProfile profile (one profiler cannot be
+        active in several threads), merged into the stage's report. Time and
+        memory are left to the calling thread's :meth:`profile`.
+        """
+        if not self.enabled:
+            return _DISABLED
+        return self._profile_thread(stage)
+
+    @contextmanager
+    def _profile_thread(self, stage: str):
+        import cProfile
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            self._record(stage).thread_profiles.append(profiler)
+
+    def _record(self, stage: str) -> _StageRecord:
+        import cProfile
+
+        with self._lock:
+            record = self._stages.get(stage)
+            if record is None:
+                record = self._stages[stage] = _StageRecord(cProfile.Profile())
+            return record
+
+    @contextmanager
+    def _profile(self, stage: str):
+        import tracemalloc
+
+        record = self._record(stage)
+
+        started_memory = False
+        if self.trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                started_memory = True
+            tracemalloc.reset_peak()
+
+        wall_started = time.perf_counter()
+        cpu_started = time.process_time()
+        record.profiler.enable()
+        try:
+            yield
+        finally:
+            record.profiler.disable()
+            record.calls += 1
+            record.wall_seconds += time.perf_counter() - wall_started
+            record.cpu_seconds += time.process_time() - cpu_started
+            if self.trace_memory:
+                _, peak = tracemalloc.get_traced_memory()
+                if record.peak_memory_bytes is None or peak > record.peak_memory_bytes:
+                    record.peak_memory_bytes = peak
+                    record.snapshot = tracemalloc.take_snapshot()
+                if started_memory:
+                    tracemalloc.stop()
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """Per-stage totals in the order stages were first entered."""
+        entries = []
+        for name, record in self._stages.items():
+            entry = {
+                "stage": name,
+                "calls": record.calls,
+                "wall_seconds": round(record.wall_seconds, 6),
+                "cpu_seconds": round(record.cpu_seconds, 6),
+            }
+            if record.peak_memory_bytes is not None:
+                entry["peak_memory_bytes"] = record.peak_memory_bytes
+            if record.thread_profiles:
+                entry["worker_thread_calls"] = len(record.thread_profiles)
+            entries.append(entry)
+        return entries
+
+    def write_reports(self) -> None:
+        """Write reports for every profiled stage; safe to call repeatedly."""
+        if not self._stages:
+            return
+        try:
+            self.run_dir.mkdir(parents=True, exist_ok=True)
+            for name, record in self._stages.items():
+                self._write_report(name, record)
+            (self.run_dir / "summary.json").write_text(
+                json.dumps(self.summary(), indent=2)
+            )
+            logger.info(f"Stage profiles written to {self.run_dir}")
+        except OSError as e:
+            logger.error(f"Failed to write stage profiles: {str(e)}")
+
+    def _write_report(self, name: str, record: _StageRecord) -> None:
+        import pstats
+
+        out = io.StringIO()
+        stats = pstats.Stats(record.profiler, stream=out)
+        if record.thread_profiles:
+            stats.add(*list(record.thread_profiles))
+        stats.dump_stats(str(self.run_dir / f"{name}.pstats"))
+        out.write(
+            f"Stage: {name} ({record.calls} calls)\n"
+            f"Wall time: {record.wall_seconds:.3f}s  "
+            f"CPU time: {record.cpu_seconds:.3f}s\n"
+        )
+        if record.thread_profiles:
+            out.write(
+                f"Includes {len(record.thread_profiles)} worker-thread calls; wall, "
+                f"CPU and memory cover the calling thread only\n"
+            )
+        if record.snapshot is not None:
+            out.write(f"Peak traced memory: {record.peak_memory_bytes / 1e6:.1f} MB\n")
+            out.write(
+                f"\nTop {self.top_n} allocation sites live at the end of the "
+                f"peak invocation:\n"
+            )
+            for stat in record.snapshot.statistics("lineno")[: self.top_n]:
+                out.write(f"  {stat}\n")
+        out.write(f"\nTop {self.top_n} functions by cumulative time:\n")
+        stats.sort_stats("cumulative").print_stats(self.top_n)
+        (self.run_dir / f"{name}.txt").write_text(out.getvalue())
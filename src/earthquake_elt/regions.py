@@ -0,0 +1,371 @@
+# ============================================================================
+# FILE: src/earthquake_elt/regions.py
+# ============================================================================
+"""
+Point-in-region classification backed by a precomputed lookup grid.
+
+The region polygons (a GeoJSON FeatureCollection, ``data/regions.json`` by
+default) are rasterized once into a global grid of ``cell_degrees`` cells
+holding a region id. A cell crossed by any polygon edge holds ``BOUNDARY``
+instead, and points falling in it are resolved by an exact point-in-polygon
+test. The grid is cached on disk next to a hash of the polygon file and
+memory-mapped, so classification is one array lookup for almost every point.
+
+Build or refresh the cache, or reclassify ``dim_location``, with
+``python -m earthquake_elt.regions --help``.
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import math
+import mmap
+import os
+import struct
+import sys
+from array import array
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_REGION = "Other"
+NO_REGION = 0
+BOUNDARY = 0xFFFF
+
+_MAGIC = b"EQRGRID1"
+_FORMAT_VERSION = 1
+
+Ring = List[Tuple[float, float]]
+
+
+class _Polygon:
+    """One polygon part (outer ring plus holes) of a region."""
+
+    __slots__ = ("region_id", "rings", "bbox")
+
+    def __init__(self, region_id: int, rings: List[Ring]):
+        self.region_id = region_id
+        self.rings = rings
+        lons = [lon for ring in rings for lon, _ in ring]
+        lats = [lat for ring in rings for _, lat in ring]
+        self.bbox = (min(lons), min(lats), max(lons), max(lats))
+
+    def contains(self, lon: float, lat: float) -> bool:
+        min_lon, min_lat, max_lon, max_lat = self.bbox
+        if not (min_lon <= lon <= max_lon and min_lat <= lat <= max_lat):
+            return False
+        inside = False
+        for ring in self.rings:
+            x1, y1 = ring[-1]
+            for x2, y2 in ring:
+                if (y1 > lat) != (y2 > lat) and lon < (x2 - x1) * (lat - y1) / (
+                    y2 - y1
+                ) + x1:
+                    inside = not inside
+                x1, y1 = x2, y2
+        return inside
+
+    def edges(self):
+        for ring in self.rings:
+            x1, y1 = ring[-1]
+            for x2, y2 in ring:
+                yield x1, y1, x2, y2
+                x1, y1 = x2, y2
+
+
+def _read_polygons(path: Path) -> Tuple[List[str], List[_Polygon]]:
+    """Parse Polygon/MultiPolygon features; ids are 1-based in file order."""
+    with open(path, "rb") as f:
+        collection = json.load(f)
+    names: List[str] = []
+    polygons: List[_Polygon] = []
+    for feature in collection["features"]:
+        names.append(feature["properties"]["name"])
+        region_id = len(names)
+        geometry = feature["geometry"]
+        if geometry["type"] == "Polygon":
+            parts = [geometry["coordinates"]]
+        elif geometry["type"] == "MultiPolygon":
+            parts = geometry["coordinates"]
+        else:
+            raise ValueError(f"Unsupported geometry type: {geometry['type']}")
+        for part in parts:
+            rings = [[(float(x), float(y)) for x, y, *_ in ring] for ring in part]
+            polygons.append(_Polygon(region_id, rings))
+    if len(names) >= BOUNDARY:
+        raise ValueError(f"Too many regions: {len(names)}")
+    return names, polygons
+
+
+def rasterize(polygons: Sequence[_Polygon], cell_degrees: float) -> array:
+    """
+    Build the lookup grid (row-major from lat -90 / lon -180, uint16 cells).
+
+    Interior cells are filled by scanlines through the cell centres, earlier
+    polygons taking precedence; every cell touched by an edge is then marked
+    ``BOUNDARY``. Edges are split into pieces shorter than half a cell and the
+    bounding box of each piece is marked, so no crossed cell is missed.
+    """
+    n_lon = round(360 / cell_degrees)
+    n_lat = round(180 / cell_degrees)
+    grid = array("H", bytes(2 * n_lon * n_lat))
+    for polygon in polygons:
+        _fill(grid, polygon, cell_degrees, n_lon, n_lat)
+    for polygon in polygons:
+        _mark_edges(grid, polygon, cell_degrees, n_lon, n_lat)
+    return grid
+
+
+def _fill(grid: array, polygon: _Polygon, cell_degrees: float, n_lon: int, n_lat: int):
+    edges = list(polygon.edges())
+    first_row = max(0, math.floor((polygon.bbox[1] + 90) / cell_degrees))
+    last_row = min(n_lat - 1, math.floor((polygon.bbox[3] + 90) / cell_degrees))
+    for row in range(first_row, last_row + 1):
+        y = -90 + (row + 0.5) * cell_degrees
+        crossings = sorted(
+            x1 + (x2 - x1) * (y - y1) / (y2 - y1)
+            for x1, y1, x2, y2 in edges
+            if (y1 > y) != (y2 > y)
+        )
+        offset = row * n_lon
+        for start, end in zip(crossings[::2], crossings[1::2]):
+            first = max(0, math.ceil((start + 180) / cell_degrees - 0.5))
+            last = min(n_lon - 1, math.floor((end + 180) / cell_degrees - 0.5))
+            for col in range(first, last + 1):
+                if grid[offset + col] == NO_REGION:
+                    grid[offset + col] = polygon.region_id
+
+
+def _mark_edges(
+    grid: array, polygon: _Polygon, cell_degrees: float, n_lon: int, n_lat: int
+):
+    step = cell_degrees / 2
+    for x1, y1, x2, y2 in polygon.edges():
+        pieces = max(1, math.ceil(math.hypot(x2 - x1, y2 - y1) / step))
+        for k in range(pieces):
+            ax = x1 + (x2 - x1) * k / pieces
+            ay = y1 + (y2 - y1) * k / pieces
+            bx = x1 + (x2 - x1) * (k + 1) / pieces
+            by = y1 + (y2 - y1) * (k + 1) / pieces
+            cols = _cell_range(min(ax, bx) + 180, max(ax, bx) + 180, cell_degrees, n_lon)
+            for row in _cell_range(
+                min(ay, by) + 90, max(ay, by) + 90, cell_degrees, n_lat
+            ):
+                offset = row * n_lon
+                for col in cols:
+                    grid[offset + col] = BOUNDARY
+
+
+def _cell_range(low: float, high: float, cell_degrees: float, count: int) -> range:
+    # Points on a cell edge belong to both neighbours.
+    first = max(0, math.ceil(low / cell_degrees) - 1)
+    last = min(count - 1, math.floor(high / cell_degrees))
+    return range(first, last + 1)
+
+
+class RegionClassifier:
+    """
+    Classifies points into the named regions of a polygon file.
+
+    The grid is built or memory-mapped on first use; construction is cheap.
+    Points outside every polygon (or with missing coordinates) get
+    ``DEFAULT_REGION``.
+    """
+
+    def __init__(
+        self,
+        polygons_path: str = "data/regions.json",
+        cache_dir: str = ".cache/regions",
+        cell_degrees: float = 0.25,
+    ):
+        if (360 / cell_degrees) % 1 or (180 / cell_degrees) % 1:
+            raise ValueError("cell_degrees must divide 180 evenly")
+        self.polygons_path = Path(polygons_path)
+        self.cache_dir = Path(cache_dir)
+        self.cell_degrees = cell_degrees
+        self.n_lon = round(360 / cell_degrees)
+        self.n_lat = round(180 / cell_degrees)
+        self.names: List[str] = []
+        self._polygons: List[_Polygon] = []
+        self._grid: Optional[memoryview] = None
+        self._mmap: Optional[mmap.mmap] = None
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "RegionClassifier":
+        regions = config.get("regions", {})
+        return cls(
+            polygons_path=regions.get("polygons", "data/regions.json"),
+            cache_dir=regions.get("cache_dir", ".cache/regions"),
+            cell_degrees=regions.get("cell_degrees", 0.25),
+        )
+
+    @property
+    def cache_path(self) -> Path:
+        digest = hashlib.sha256(self.polygons_path.read_bytes()).hexdigest()[:16]
+        return self.cache_dir / f"regions-{digest}-{self.cell_degrees:g}.grid"
+
+    def load(self) -> "RegionClassifier":
+        """Parse the polygons and map the cached grid, building it if needed."""
+        if self._grid is not None:
+            return self
+        self.names, self._polygons = _read_polygons(self.polygons_path)
+        path = self.cache_path
+        if not path.exists():
+            self._build(path)
+        self._map(path)
+        return self
+
+    def _build(self, path: Path) -> None:
+        logger.info(f"Rasterizing {self.polygons_path} at {self.cell_degrees:g} degrees")
+        grid = rasterize(self._polygons, self.cell_degrees)
+        if sys.byteorder != "little":
+            grid.byteswap()
+        header = json.dumps(
+            {
+                "version": _FORMAT_VERSION,
+                "cell_degrees": self.cell_degrees,
+                "n_lon": self.n_lon,
+                "n_lat": self.n_lat,
+                "names": self.names,
+            }
+        ).encode("utf-8")
+        padding = -(len(_MAGIC) + 4 + len(header)) % 8
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp, "wb") as f:
+            f.write(_MAGIC + struct.pack("<I", len(header) + padding))
+            f.write(header + b" " * padding)
+            grid.tofile(f)
+        os.replace(tmp, path)
+
+    def _map(self, path: Path) -> None:
+        with open(path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        (header_size,) = struct.unpack_from("<I", mapped, len(_MAGIC))
+        start = len(_MAGIC) + 4
+        header = json.loads(mapped[start : start + header_size])
+        if mapped[: len(_MAGIC)] != _MAGIC or header["names"] != self.names:
+            mapped.close()
+            raise ValueError(f"Region grid {path} does not match {self.polygons_path}")
+        cells = memoryview(mapped)[start + header_size :]
+        if sys.byteorder != "little":
+            # Not mappable as-is; fall back to an in-memory copy.
+            swapped = array("H", cells.tobytes())
+            swapped.byteswap()
+            cells.release()
+            mapped.close()
+            self._grid = memoryview(swapped)
+            return
+        self._mmap = mapped
+        self._grid = cells.cast("H")
+
+    def close(self) -> None:
+        if self._grid is not None:
+            self._grid.release()
+            self._grid = None
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+    def classify(self, latitude: Optional[float], longitude: Optional[float]) -> str:
+        """Region containing the point (grid lookup, exact test on boundaries)."""
+        if self._grid is None:
+            self.load()
+        if latitude is None or longitude is None:
+            return DEFAULT_REGION
+        if math.isnan(latitude) or math.isnan(longitude) or abs(latitude) > 90:
+            return DEFAULT_REGION
+        row = min(int((latitude + 90) / self.cell_degrees), self.n_lat - 1)
+        col = math.floor((longitude + 180) / self.cell_degrees) % self.n_lon
+        region_id = self._grid[row * self.n_lon + col]
+        if region_id == BOUNDARY:
+            return self.classify_exact(latitude, longitude)
+        return self.names[region_id - 1] if region_id else DEFAULT_REGION
+
+    def classify_many(
+        self, latitudes: Sequence[Optional[float]], longitudes: Sequence[Optional[float]]
+    ) -> List[str]:
+        """Classify paired coordinate columns."""
+        classify = self.classify
+        return [classify(lat, lon) for lat, lon in zip(latitudes, longitudes)]
+
+    def classify_exact(self, latitude: float, longitude: float) -> str:
+        """Point-in-polygon over all regions in priority order (no grid)."""
+        if not self._polygons:
+            self.names, self._polygons = _read_polygons(self.polygons_path)
+        for polygon in self._polygons:
+            if polygon.contains(longitude, latitude):
+                return self.names[polygon.region_id - 1]
+        return DEFAULT_REGION
+
+    def boundary_fraction(self) -> float:
+        """Share of grid cells that need the exact fallback."""
+        self.load()
+        return sum(1 for cell in self._grid if cell == BOUNDARY) / len(self._grid)
+
+
+def assign_regions(db, classifier: RegionClassifier, only_missing: bool = True) -> int:
+    """Set ``dim_location.region`` (only where it is NULL unless ``only_missing``)."""
+    from psycopg2.extras import execute_values
+
+    # idx_location_region_missing keeps the NULL-region lookup proportional to
+    # the locations just loaded rather than to the whole dimension.
+    where = " WHERE region IS NULL" if only_missing else ""
+    with db.get_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute(
+                f"SELECT location_key, latitude, longitude FROM dim_location{where}"
+            )
+            rows = cur.fetchall()
+            if not rows:
+                return 0
+            regions = classifier.classify_many(
+                [float(lat) for _, lat, _ in rows], [float(lon) for _, _, lon in rows]
+            )
+            execute_values(
+                cur,
+                """
+                UPDATE dim_location AS l SET region = v.region
+                FROM (VALUES %s) AS v(location_key, region)
+                WHERE l.location_key = v.location_key
+                """,
+                [(key, region) for (key, _, _), region in zip(rows, regions)],
+                page_size=1000,
+            )
+    logger.info(f"Assigned regions to {len(rows)} locations")
+    return len(rows)
+
+
+def main(argv: List[str] = None) -> None:
+    from earthquake_elt.config import load_config
+    from earthquake_elt.database import Database
+
+    parser = argparse.ArgumentParser(description="Region lookup grid")
+    parser.add_argument("command", choices=["build", "lookup", "reclassify"])
+    parser.add_argument("--config", default="config/config.toml")
+    parser.add_argument("--lat", type=float)
+    parser.add_argument("--lon", type=float)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    config = load_config(args.config)
+    classifier = RegionClassifier.from_config(config).load()
+    if args.command == "build":
+        logger.info(
+            f"{classifier.cache_path}: {len(classifier.names)} regions, "
+            f"{classifier.boundary_fraction():.2%} boundary cells"
+        )
+    elif args.command == "lookup":
+        print(classifier.classify(args.lat, args.lon))
+    else:
+        db = Database(config)
+        try:
+            assign_regions(db, classifier, only_missing=False)
+        finally:
+            db.close_pool()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,267 @@
+# ============================================================================
+# FILE: src/earthquake_elt/streaming.py
+# ============================================================================
+"""
+Near-real-time ingestion from the USGS real-time feeds.
+
+:class:`StreamingDaemon` polls a :class:`FeedSource`, keeps only events that
+are new or carry a newer ``updated`` timestamp (:class:`ChangeTracker`) and
+hands them to :meth:`EarthquakePipeline.process_micro_batch`, which validates,
+loads and transforms just those events. Publication-to-fact latency is
+measured per event from its ``updated`` time.
+"""
+
+import json
+import logging
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+import requests
+
+from earthquake_elt import metrics
+from earthquake_elt.ingestion.batch import MISSING_INT, EventBatch
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FEED_URL = (
+    "https://earthquake.usgs.gov/earthquakes/feed/v1.0/summary/all_hour.geojson"
+)
+
+
+class FeedSource:
+    """
+    Source of GeoJSON feature collections to poll.
+
+    ``location`` may be a summary feed URL (fetched whole on every poll), an
+    FDSN ``.../query`` URL (polled with ``updatedafter`` trailing the newest
+    processed ``updated`` by ``overlap_seconds``), or a local file path. The
+    query cursor moves only through :meth:`advance`, once the polled events
+    have been processed, so a failed micro-batch is fetched again.
+    """
+
+    def __init__(
+        self,
+        location: str,
+        timeout: float = 30,
+        overlap_seconds: float = 120,
+        initial_lookback_seconds: float = 3600,
+        session: Optional[requests.Session] = None,
+    ):
+        self.location = location
+        self.timeout = timeout
+        self.overlap_seconds = overlap_seconds
+        parsed = urlparse(location)
+        self.is_remote = parsed.scheme in ("http", "https")
+        self.is_query = self.is_remote and parsed.path.rstrip("/").endswith("/query")
+        self.path = Path(parsed.path if parsed.scheme == "file" else location)
+        self.session = session or (requests.Session() if self.is_remote else None)
+        self._cursor_ms = int(
+            (datetime.now(timezone.utc).timestamp() - initial_lookback_seconds) * 1000
+        )
+
+    def poll(self) -> List[Dict[str, Any]]:
+        """Fetch the current features."""
+        if not self.is_remote:
+            with open(self.path, "rb") as f:
+                data = json.load(f)
+        else:
+            params = None
+            if self.is_query:
+                updated_after = datetime.fromtimestamp(
+                    self._cursor_ms / 1000, tz=timezone.utc
+                ) - timedelta(seconds=self.overlap_seconds)
+                params = {
+                    "format": "geojson",
+                    "updatedafter": updated_after.replace(tzinfo=None).isoformat(
+                        timespec="milliseconds"
+                    ),
+                    "orderby": "time",
+                }
+            response = self.session.get(
+                self.location, params=params, timeout=self.timeout
+            )
+            metrics.API_BYTES_RECEIVED.inc(len(response.content))
+            response.raise_for_status()
+            data = response.json()
+        return data.get("features", [])
+
+    def advance(self, features: List[Dict[str, Any]]) -> None:
+        """Move the query cursor past ``features`` once they are processed."""
+        if not self.is_query:
+            return
+        for feature in features:
+            updated = (feature.get("properties") or {}).get("updated")
+            if isinstance(updated, int) and updated > self._cursor_ms:
+                self._cursor_ms = updated
+
+
+class ChangeTracker:
+    """
+    In-memory ``id -> updated`` map of events already processed.
+
+    Entries not seen for ``retention_seconds`` are dropped, which bounds the
+    map to roughly one feed window of events.
+    """
+
+    def __init__(
+        self,
+        retention_seconds: float = 7200,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.retention_seconds = retention_seconds
+        self._clock = clock
+        self._seen: Dict[str, Tuple[int, float]] = {}
+
+    def changed(self, features: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Return features that are new or newer than the processed version."""
+        now = self._clock()
+        latest: Dict[str, Dict[str, Any]] = {}
+        for feature in features:
+            event_id = feature.get("id")
+            if not event_id:
+                continue
+            updated = _updated(feature)
+            previous = latest.get(event_id)
+            if previous is not None and _updated(previous) >= updated:
+                continue
+            seen = self._seen.get(event_id)
+            if seen is not None:
+                self._seen[event_id] = (seen[0], now)
+                if seen[0] >= updated:
+                    continue
+            latest[event_id] = feature
+        return list(latest.values())
+
+    def mark(self, features: List[Dict[str, Any]]) -> None:
+        """Record ``features`` as processed and prune stale entries."""
+        now = self._clock()
+        for feature in features:
+            self._seen[feature["id"]] = (_updated(feature), now)
+        cutoff = now - self.retention_seconds
+        stale = [key for key, (_, seen_at) in self._seen.items() if seen_at < cutoff]
+        for key in stale:
+            del self._seen[key]
+
+    def __len__(self) -> int:
+        return len(self._seen)
+
+
+def _updated(feature: Dict[str, Any]) -> int:
+    props = feature.get("properties") or {}
+    updated = props.get("updated") or props.get("time")
+    return updated if isinstance(updated, int) else -1
+
+
+class StreamingDaemon:
+    """Poll a feed on a fixed interval and micro-batch changed events."""
+
+    def __init__(
+        self,
+        pipeline,
+        source: FeedSource,
+        tracker: Optional[ChangeTracker] = None,
+        poll_interval: float = 30.0,
+        latency_target: float = 60.0,
+    ):
+        self.pipeline = pipeline
+        self.source = source
+        self.tracker = tracker or ChangeTracker()
+        self.poll_interval = poll_interval
+        self.latency_target = latency_target
+        self._stop = threading.Event()
+
+    @classmethod
+    def from_config(
+        cls,
+        pipeline,
+        config: Dict[str, Any],
+        feed: Optional[str] = None,
+        poll_interval: Optional[float] = None,
+    ) -> "StreamingDaemon":
+        """Build from ``[streaming]``; explicit arguments override the config."""
+        streaming = config.get("streaming", {})
+        source = FeedSource(
+            feed or streaming.get("feed_url", DEFAULT_FEED_URL),
+            timeout=config["api"]["timeout"],
+            overlap_seconds=streaming.get("overlap_seconds", 120),
+        )
+        return cls(
+            pipeline,
+            source,
+            ChangeTracker(streaming.get("retention_seconds", 7200)),
+            poll_interval=poll_interval or streaming.get("poll_interval_seconds", 30),
+            latency_target=streaming.get("latency_target_seconds", 60),
+        )
+
+    def poll_once(self) -> Dict[str, Any]:
+        """Poll the source once and process whatever changed."""
+        with self.pipeline._stage("stream_poll"):
+            features = self.source.poll()
+        changed = self.tracker.changed(features)
+        stats: Dict[str, Any] = {
+            "events_seen": len(features),
+            "events_changed": len(changed),
+        }
+        if not changed:
+            self.source.advance(features)
+            metrics.STREAM_POLLS.inc(outcome="idle")
+            return stats
+
+        batch = EventBatch.from_features(changed)
+        stats.update(self.pipeline.process_micro_batch(batch))
+        finished_ms = time.time() * 1000
+        loaded = set(stats.get("event_ids", ()))
+        latencies = sorted(
+            (finished_ms - updated) / 1000
+            for event_id, updated in zip(batch.ids, batch.updated)
+            if event_id in loaded and updated != MISSING_INT
+        )
+        for latency in latencies:
+            metrics.STREAM_EVENT_LATENCY_SECONDS.observe(latency)
+        self.tracker.mark(changed)
+        self.source.advance(features)
+        metrics.STREAM_POLLS.inc(outcome="processed")
+
+        if latencies:
+            stats["latency_p50_seconds"] = latencies[len(latencies) // 2]
+            stats["latency_max_seconds"] = latencies[-1]
+            late = sum(1 for latency in latencies if latency > self.latency_target)
+            if late:
+                logger.warning(
+                    f"{late}/{len(latencies)} events exceeded the "
+                    f"{self.latency_target:.0f}s latency target"
+                )
+        logger.info(
+            f"Micro-batch: {stats['events_changed']} changed, "
+            f"{stats.get('events_loaded', 0)} loaded, "
+            f"p50 latency {stats.get('latency_p50_seconds', 0):.1f}s"
+        )
+        return stats
+
+    def run(self, max_polls: Optional[int] = None) -> None:
+        """Poll until :meth:`stop` is called (or ``max_polls`` polls)."""
+        logger.info(
+            f"Streaming from {self.source.location} every {self.poll_interval:.0f}s"
+        )
+        polls = 0
+        while not self._stop.is_set():
+            started = time.monotonic()
+            try:
+                self.poll_once()
+            except Exception as e:
+                # Unprocessed events stay unmarked and are retried next poll.
+                metrics.STREAM_POLLS.inc(outcome="failed")
+                logger.error(f"Streaming poll failed: {str(e)}", exc_info=True)
+            self.pipeline.export_metrics(log_snapshot=False)
+            polls += 1
+            if max_polls is not None and polls >= max_polls:
+                break
+            self._stop.wait(max(0.0, self.poll_interval - (time.monotonic() - started)))
+        logger.info("Streaming daemon stopped")
+
+    def stop(self) -> None:
+        self._stop.set()
@@ -0,0 +1,11 @@
+from .synthetic import SyntheticCatalog, feature_collection, generate_features
+from .fdsn_server import Catalog, FaultInjector, MockFDSNServer
+
+__all__ = [
+    "SyntheticCatalog",
+    "feature_collection",
+    "generate_features",
+    "Catalog",
+    "FaultInjector",
+    "MockFDSNServer",
+]
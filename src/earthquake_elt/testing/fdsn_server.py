@@ -0,0 +1,358 @@
+# ============================================================================
+# FILE: src/earthquake_elt/testing/fdsn_server.py
+# ============================================================================
+"""
+Local stand-in for the USGS FDSN event web service.
+
+Serves the ``query`` and ``count`` methods over a synthetic catalog and can
+inject latency, 429/503 responses, hung requests and truncated bodies, so
+ingestion throughput and failure handling can be exercised reproducibly::
+
+    with MockFDSNServer(catalog_size=5000, faults=FaultInjector(rate_429=0.1)) as srv:
+        config["api"]["base_url"] = srv.query_url
+        USGSAPIClient(config).fetch_earthquakes(start, end)
+
+Run standalone with ``python -m earthquake_elt.testing.fdsn_server --help``.
+"""
+
+import argparse
+import bisect
+import json
+import logging
+import random
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from .synthetic import SyntheticCatalog, _epoch_ms, feature_collection
+
+logger = logging.getLogger(__name__)
+
+SERVICE_PATH = "/fdsnws/event/1"
+MAX_LIMIT = 20000
+
+
+class FaultInjector:
+    """
+    Decides per request whether to delay or fail it.
+
+    ``script`` lists faults (``"429"``, ``"503"``, ``"timeout"``,
+    ``"truncate"`` or ``None`` for a clean response) applied to the first
+    requests in order; afterwards faults are drawn from the seeded rates.
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        rate_429: float = 0.0,
+        rate_503: float = 0.0,
+        rate_timeout: float = 0.0,
+        rate_truncate: float = 0.0,
+        retry_after: Optional[float] = 1.0,
+        hang_seconds: float = 60.0,
+        script: Optional[List[Optional[str]]] = None,
+        seed: int = 0,
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.rates = [
+            ("429", rate_429),
+            ("503", rate_503),
+            ("timeout", rate_timeout),
+            ("truncate", rate_truncate),
+        ]
+        self.retry_after = retry_after
+        self.hang_seconds = hang_seconds
+        self.script = list(script or [])
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def next_fault(self) -> Tuple[float, Optional[str]]:
+        """Return ``(delay_seconds, fault)`` for the next request."""
+        with self._lock:
+            delay = self.latency + (
+                self._rng.uniform(0, self.jitter) if self.jitter else 0
+            )
+            if self.script:
+                return delay, self.script.pop(0)
+            roll = self._rng.random()
+            for fault, rate in self.rates:
+                if roll < rate:
+                    return delay, fault
+                roll -= rate
+            return delay, None
+
+
+class Catalog:
+    """Synthetic events indexed by origin time for FDSN-style filtering."""
+
+    def __init__(self, features: List[Dict[str, Any]]):
+        self.features = sorted(
+            (f for f in features if f["properties"].get("time")),
+            key=lambda f: f["properties"]["time"],
+        )
+        self._times = [f["properties"]["time"] for f in self.features]
+
+    @classmethod
+    def synthetic(
+        cls,
+        size: int,
+        seed: int = 42,
+        start_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None,
+        revision_rate: float = 0.05,
+    ) -> "Catalog":
+        """Build a catalog where a share of events carries a later revision."""
+        generator = SyntheticCatalog(
+            seed=seed,
+            start_time=start_time,
+            end_time=end_time,
+            invalid_rate=0.0,
+            revision_rate=revision_rate,
+        )
+        features = generator.generate(size)
+        revised = {f["id"]: f for f in generator.iter_revisions(features)}
+        return cls([revised.get(f["id"], f) for f in features])
+
+    def select(self, params: Dict[str, str]) -> List[Dict[str, Any]]:
+        """Apply the FDSN filters and ordering supported by the stand-in."""
+        lo, hi = 0, len(self.features)
+        if "starttime" in params:
+            lo = bisect.bisect_left(self._times, _parse_time(params["starttime"]))
+        if "endtime" in params:
+            hi = bisect.bisect_right(self._times, _parse_time(params["endtime"]))
+        selected = self.features[lo:hi]
+
+        if "minmagnitude" in params:
+            min_mag = float(params["minmagnitude"])
+            selected = [
+                f
+                for f in selected
+                if f["properties"]["mag"] is not None
+                and f["properties"]["mag"] >= min_mag
+            ]
+        if "updatedafter" in params:
+            updated_after = _parse_time(params["updatedafter"])
+            selected = [f for f in selected if f["properties"]["updated"] > updated_after]
+
+        orderby = params.get("orderby", "time")
+        if orderby == "time":
+            selected = selected[::-1]
+        elif orderby in ("magnitude", "magnitude-asc"):
+            selected = sorted(
+                selected,
+                key=lambda f: f["properties"]["mag"] or -10.0,
+                reverse=orderby == "magnitude",
+            )
+        elif orderby != "time-asc":
+            raise ValueError(f"Unsupported orderby: {orderby}")
+        return selected
+
+
+def _parse_time(value: str) -> int:
+    """Parse an FDSN time parameter into epoch milliseconds."""
+    parsed = datetime.fromisoformat(value.strip().replace("Z", "+00:00"))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return _epoch_ms(parsed)
+
+
+class _FDSNHandler(BaseHTTPRequestHandler):
+    server: "_FDSNHTTPServer"
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format: str, *args) -> None:
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+    def do_GET(self) -> None:
+        parsed = urlparse(self.path)
+        params = {k: v[-1] for k, v in parse_qs(parsed.query).items()}
+        method = parsed.path.rstrip("/").rsplit("/", 1)[-1]
+        if not parsed.path.startswith(SERVICE_PATH) or method not in ("query", "count"):
+            self._send(404, b"Not Found", "text/plain")
+            return
+
+        delay, fault = self.server.faults.next_fault()
+        self.server.record(fault or "ok")
+        if delay:
+            time.sleep(delay)
+        if fault in ("429", "503"):
+            headers = {}
+            if self.server.faults.retry_after is not None:
+                headers["Retry-After"] = f"{self.server.faults.retry_after:g}"
+            reason = b"Too Many Requests" if fault == "429" else b"Service Unavailable"
+            self._send(int(fault), reason, "text/plain", headers)
+            return
+        if fault == "timeout":
+            time.sleep(self.server.faults.hang_seconds)
+
+        try:
+            limit = min(int(params.get("limit", MAX_LIMIT)), MAX_LIMIT)
+            offset = int(params.get("offset", 1))
+            selected = self.server.catalog.select(params)
+        except ValueError as e:
+            self._send(400, f"Bad Request: {e}".encode(), "text/plain")
+            return
+
+        if method == "count":
+            if params.get("format") == "geojson":
+                body = json.dumps({"count": len(selected), "maxAllowed": MAX_LIMIT})
+                self._send(200, body.encode(), "application/json")
+            else:
+                self._send(200, str(len(selected)).encode(), "text/plain")
+            return
+
+        page = selected[offset - 1 : offset - 1 + limit]
+        body = json.dumps(feature_collection(page)).encode()
+        if fault == "truncate":
+            self._send(200, body, "application/json", truncate=True)
+            return
+        self._send(200, body, "application/json")
+
+    def _send(
+        self,
+        status: int,
+        body: bytes,
+        content_type: str,
+        headers: Optional[Dict[str, str]] = None,
+        truncate: bool = False,
+    ) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        if truncate:
+            self.send_header("Connection", "close")
+            self.close_connection = True
+        self.end_headers()
+        self.wfile.write(body[: len(body) // 2] if truncate else body)
+
+
+class _FDSNHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, catalog: Catalog, faults: FaultInjector):
+        super().__init__(address, _FDSNHandler)
+        self.catalog = catalog
+        self.faults = faults
+        self.stats: Dict[str, int] = {}
+        self._stats_lock = threading.Lock()
+
+    def handle_error(self, request, client_address) -> None:
+        # Clients abandoning hung or truncated responses are expected here.
+        logger.debug(f"Connection from {client_address} closed early", exc_info=True)
+
+    def record(self, outcome: str) -> None:
+        with self._stats_lock:
+            self.stats[outcome] = self.stats.get(outcome, 0) + 1
+            self.stats["requests"] = self.stats.get("requests", 0) + 1
+
+
+class MockFDSNServer:
+    """Threaded FDSN stand-in bound to a local port (``port=0`` picks a free one)."""
+
+    def __init__(
+        self,
+        catalog: Optional[Catalog] = None,
+        catalog_size: int = 1000,
+        seed: int = 42,
+        faults: Optional[FaultInjector] = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ):
+        self.catalog = catalog or Catalog.synthetic(catalog_size, seed=seed)
+        self.faults = faults or FaultInjector()
+        self._server = _FDSNHTTPServer((host, port), self.catalog, self.faults)
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}{SERVICE_PATH}"
+
+    @property
+    def query_url(self) -> str:
+        """URL to use as ``api.base_url`` for ``USGSAPIClient``."""
+        return f"{self.base_url}/query"
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """Requests served, keyed by outcome (``ok`` or the injected fault)."""
+        return dict(self._server.stats)
+
+    def start(self) -> "MockFDSNServer":
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, kwargs={"poll_interval": 0.1}, daemon=True
+        )
+        self._thread.start()
+        logger.info(f"Mock FDSN service listening on {self.base_url}")
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread:
+            self._thread.join()
+
+    def __enter__(self) -> "MockFDSNServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description="Mock FDSN event service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--events", type=int, default=10000, help="Catalog size")
+    parser.add_argument("--days", type=int, default=7, help="Catalog span ending now")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds per request")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Extra random latency")
+    parser.add_argument("--rate-429", type=float, default=0.0)
+    parser.add_argument("--rate-503", type=float, default=0.0)
+    parser.add_argument("--rate-timeout", type=float, default=0.0)
+    parser.add_argument("--rate-truncate", type=float, default=0.0)
+    parser.add_argument("--retry-after", type=float, default=1.0)
+    parser.add_argument("--hang-seconds", type=float, default=60.0)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(message)s")
+    end_time = datetime.now(timezone.utc)
+    catalog = Catalog.synthetic(
+        args.events,
+        seed=args.seed,
+        start_time=end_time - timedelta(days=args.days),
+        end_time=end_time,
+    )
+    faults = FaultInjector(
+        latency=args.latency,
+        jitter=args.jitter,
+        rate_429=args.rate_429,
+        rate_503=args.rate_503,
+        rate_timeout=args.rate_timeout,
+        rate_truncate=args.rate_truncate,
+        retry_after=args.retry_after,
+        hang_seconds=args.hang_seconds,
+        seed=args.seed,
+    )
+    server = MockFDSNServer(
+        catalog=catalog, faults=faults, host=args.host, port=args.port
+    )
+    server.start()
+    try:
+        while True:
+            time.sleep(60)
+            logger.info(f"Requests served: {server.stats}")
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,262 @@
+# ============================================================================
+# FILE: src/earthquake_elt/testing/synthetic.py
+# ============================================================================
+import json
+import math
+import random
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+# Seismically active areas as
+# (name, network, lat, lon, spread_deg, weight, deep_fraction).
+# Weights roughly follow the share of events USGS reports for each area.
+HOTSPOTS = [
+    ("California", "ci", 36.5, -119.5, 2.5, 0.30, 0.00),
+    ("Alaska", "ak", 61.0, -150.5, 3.0, 0.22, 0.10),
+    ("Nevada", "nn", 38.5, -117.5, 1.5, 0.08, 0.00),
+    ("Hawaii", "hv", 19.4, -155.3, 0.6, 0.07, 0.00),
+    ("Puerto Rico", "pr", 18.0, -66.8, 0.8, 0.05, 0.02),
+    ("Japan", "us", 37.0, 141.5, 3.0, 0.05, 0.20),
+    ("Chile", "us", -30.0, -71.5, 4.0, 0.04, 0.25),
+    ("Indonesia", "us", -3.5, 122.0, 6.0, 0.04, 0.30),
+    ("Tonga", "us", -20.0, -175.0, 3.0, 0.03, 0.45),
+    ("Oklahoma", "ok", 36.0, -97.5, 1.0, 0.03, 0.00),
+    ("Italy", "us", 42.5, 13.5, 2.0, 0.02, 0.00),
+]
+BACKGROUND_WEIGHT = 0.07
+
+DIRECTIONS = ["N", "NNE", "NE", "E", "SE", "S", "SW", "W", "NW", "WNW", "ESE", "SSW"]
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def _epoch_ms(value: datetime) -> int:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int((value - EPOCH).total_seconds() * 1000)
+
+
+class SyntheticCatalog:
+    """
+    Seeded generator of realistic USGS GeoJSON features.
+
+    Magnitudes follow a Gutenberg-Richter distribution, epicentres are
+    clustered around known seismic areas, and a configurable share of events
+    have missing fields or are invalid. Later revisions of already generated
+    events are available through :meth:`iter_revisions`.
+    Features are produced newest-first, like the FDSN default ordering, and
+    are streamed so very large catalogs never need to fit in memory.
+    """
+
+    def __init__(
+        self,
+        seed: int = 42,
+        start_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None,
+        b_value: float = 1.0,
+        min_magnitude: float = -0.5,
+        missing_rate: float = 0.02,
+        invalid_rate: float = 0.005,
+        revision_rate: float = 0.05,
+    ):
+        self.seed = seed
+        self.end_time = end_time or datetime(2024, 1, 8, tzinfo=timezone.utc)
+        self.start_time = start_time or self.end_time - timedelta(days=7)
+        self.b_value = b_value
+        self.min_magnitude = min_magnitude
+        self.missing_rate = missing_rate
+        self.invalid_rate = invalid_rate
+        self.revision_rate = revision_rate
+        self._weights = [h[5] for h in HOTSPOTS] + [BACKGROUND_WEIGHT]
+
+    def iter_features(self, count: int) -> Iterator[Dict[str, Any]]:
+        """Yield ``count`` distinct events, newest first."""
+        rng = random.Random(self.seed)
+        start_ms = _epoch_ms(self.start_time)
+        end_ms = _epoch_ms(self.end_time)
+        mean_gap = (end_ms - start_ms) / max(count, 1)
+        event_time = end_ms
+        for sequence in range(count):
+            if mean_gap:
+                event_time = max(
+                    event_time - int(rng.expovariate(1.0 / mean_gap)), start_ms
+                )
+            yield self._make_feature(rng, sequence, event_time)
+
+    def iter_revisions(
+        self, features: Iterable[Dict[str, Any]]
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Yield later revisions for a ``revision_rate`` share of ``features``.
+
+        A revision keeps the event id but carries a newer ``updated`` time, a
+        reviewed status and an adjusted magnitude, as USGS publishes them.
+        """
+        rng = random.Random(self.seed + 1)
+        for feature in features:
+            if rng.random() < self.revision_rate:
+                yield self._revise(rng, feature)
+
+    def generate(self, count: int) -> List[Dict[str, Any]]:
+        """Return ``count`` distinct events as a list."""
+        return list(self.iter_features(count))
+
+    def iter_pages(self, count: int, page_size: int) -> Iterator[List[Dict[str, Any]]]:
+        """Yield the ``count`` events of :meth:`iter_features` in pages."""
+        page = []
+        for feature in self.iter_features(count):
+            page.append(feature)
+            if len(page) == page_size:
+                yield page
+                page = []
+        if page:
+            yield page
+
+    def _magnitude(self, rng: random.Random) -> float:
+        beta = self.b_value * math.log(10)
+        return round(min(self.min_magnitude + rng.expovariate(beta), 9.5), 2)
+
+    def _location(self, rng: random.Random):
+        index = rng.choices(range(len(self._weights)), weights=self._weights)[0]
+        if index == len(HOTSPOTS):
+            lat = math.degrees(math.asin(rng.uniform(-1.0, 1.0)))
+            lon = rng.uniform(-180.0, 180.0)
+            return "Background", "us", lat, lon, 0.05
+        name, net, lat, lon, spread, _, deep_fraction = HOTSPOTS[index]
+        lat = max(-90.0, min(90.0, rng.gauss(lat, spread)))
+        lon = ((rng.gauss(lon, spread) + 180.0) % 360.0) - 180.0
+        return name, net, lat, lon, deep_fraction
+
+    @staticmethod
+    def _mag_type(rng: random.Random, mag: float) -> str:
+        if mag < 2.5:
+            return rng.choice(["ml", "md", "ml"])
+        if mag < 5.0:
+            return rng.choice(["ml", "mb", "mb_lg", "mwr"])
+        return rng.choice(["mww", "mb", "mwc", "ms_20"])
+
+    def _make_feature(
+        self, rng: random.Random, sequence: int, event_time: int
+    ) -> Dict[str, Any]:
+        area, net, lat, lon, deep_fraction = self._location(rng)
+        code = f"{self.seed % 1000:03d}{sequence:09d}"
+        event_id = f"{net}{code}"
+        if rng.random() < deep_fraction:
+            depth = rng.uniform(70.0, 650.0)
+        else:
+            depth = min(rng.expovariate(1.0 / 12.0), 69.0)
+        mag = self._magnitude(rng)
+        updated = event_time + int(rng.uniform(60_000, 3_600_000))
+        distance = rng.randint(1, 150)
+
+        feature = {
+            "type": "Feature",
+            "properties": {
+                "mag": mag,
+                "place": f"{distance} km {rng.choice(DIRECTIONS)} of {area}",
+                "time": event_time,
+                "updated": updated,
+                "tz": None,
+                "url": f"https://earthquake.usgs.gov/earthquakes/eventpage/{event_id}",
+                "detail": (
+                    "https://earthquake.usgs.gov/fdsnws/event/1/query"
+                    f"?eventid={event_id}&format=geojson"
+                ),
+                "felt": (
+                    rng.randint(1, 500) if mag >= 3.0 and rng.random() < 0.3 else None
+                ),
+                "cdi": None,
+                "mmi": None,
+                "alert": "green" if mag >= 5.5 else None,
+                "status": "automatic" if rng.random() < 0.6 else "reviewed",
+                "tsunami": 1 if mag >= 6.5 and depth < 70 and rng.random() < 0.5 else 0,
+                "sig": int(max(0.0, mag) ** 2 * 20),
+                "net": net,
+                "code": code,
+                "ids": f",{event_id},",
+                "sources": f",{net},",
+                "types": ",origin,phase-data,",
+                "nst": rng.randint(4, 120),
+                "dmin": round(rng.uniform(0.0, 2.0), 4),
+                "rms": round(rng.uniform(0.05, 1.2), 2),
+                "gap": rng.randint(20, 300),
+                "magType": self._mag_type(rng, mag),
+                "type": "earthquake",
+                "title": f"M {mag} - {distance} km of {area}",
+            },
+            "geometry": {
+                "type": "Point",
+                "coordinates": [round(lon, 4), round(lat, 4), round(depth, 2)],
+            },
+            "id": event_id,
+        }
+
+        roll = rng.random()
+        if roll < self.invalid_rate:
+            self._break(rng, feature)
+        elif roll < self.invalid_rate + self.missing_rate:
+            self._drop_optional(rng, feature)
+        return feature
+
+    @staticmethod
+    def _break(rng: random.Random, feature: Dict[str, Any]) -> None:
+        """Remove a field the validator requires."""
+        choice = rng.randrange(3)
+        if choice == 0:
+            feature["properties"]["time"] = None
+        elif choice == 1:
+            feature["geometry"] = None
+        else:
+            feature["geometry"]["coordinates"] = feature["geometry"]["coordinates"][:1]
+
+    @staticmethod
+    def _drop_optional(rng: random.Random, feature: Dict[str, Any]) -> None:
+        """Null out fields USGS leaves empty for poorly constrained events."""
+        props = feature["properties"]
+        choice = rng.randrange(4)
+        if choice == 0:
+            props["mag"] = None
+            props["magType"] = None
+        elif choice == 1:
+            props["place"] = None
+        elif choice == 2:
+            props["sig"] = None
+            props["nst"] = None
+            props["gap"] = None
+        else:
+            feature["geometry"]["coordinates"] = feature["geometry"]["coordinates"][:2]
+
+    @staticmethod
+    def _revise(rng: random.Random, feature: Dict[str, Any]) -> Dict[str, Any]:
+        """Return a later revision of ``feature`` with the same id."""
+        revised = json.loads(json.dumps(feature))
+        props = revised["properties"]
+        props["updated"] = (props["updated"] or props["time"] or 0) + rng.randint(
+            600_000, 86_400_000
+        )
+        props["status"] = "reviewed"
+        if props["mag"] is not None:
+            props["mag"] = round(props["mag"] + rng.uniform(-0.3, 0.3), 2)
+        return revised
+
+
+def generate_features(count: int, seed: int = 42, **kwargs) -> List[Dict[str, Any]]:
+    """Convenience wrapper around :class:`SyntheticCatalog`."""
+    return SyntheticCatalog(seed=seed, **kwargs).generate(count)
+
+
+def feature_collection(
+    features: List[Dict[str, Any]], count: Optional[int] = None
+) -> Dict[str, Any]:
+    """Wrap features in a GeoJSON FeatureCollection as the FDSN API returns it."""
+    return {
+        "type": "FeatureCollection",
+        "metadata": {
+            "generated": _epoch_ms(datetime.now(timezone.utc)),
+            "url": "https://earthquake.usgs.gov/fdsnws/event/1/query",
+            "title": "USGS Earthquakes",
+            "status": 200,
+            "api": "1.14.1",
+            "count": len(features) if count is None else count,
+        },
+        "features": features,
+    }
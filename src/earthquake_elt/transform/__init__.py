@@ -0,0 +1,3 @@
+from .engine import SqlTransformEngine, TransformEngine, create_engine
+
+__all__ = ["SqlTransformEngine", "TransformEngine", "create_engine"]
@@ -0,0 +1,50 @@
+# ============================================================================
+# FILE: src/earthquake_elt/transform/classify.py
+# ============================================================================
+"""
+Dimension attribute rules shared by the transform engines.
+
+These mirror the ``CASE`` expressions in ``sql/transformations`` exactly,
+including their handling of missing values, so both engines produce the same
+warehouse rows. The ``*_column`` variants classify a whole batch column.
+Regions come from :class:`earthquake_elt.regions.RegionClassifier`.
+"""
+
+import math
+from typing import Iterable, List, Optional
+
+SHALLOW_MAX_DEPTH_KM = 70
+INTERMEDIATE_MAX_DEPTH_KM = 300
+
+# magnitude type -> (category, description)
+MAGNITUDE_TYPES = {
+    **dict.fromkeys(("mb", "mb_lg"), ("Body Wave", "Body wave magnitude")),
+    **dict.fromkeys(("ms", "ms_20"), ("Surface Wave", "Surface wave magnitude")),
+    **dict.fromkeys(("mw", "mww", "mwc", "mwb"), ("Moment", "Moment magnitude")),
+    **dict.fromkeys(("ml", "mlg"), ("Local", "Local (Richter) magnitude")),
+    "md": ("Duration", "Duration magnitude"),
+}
+OTHER_MAGNITUDE_TYPE = ("Other", "Other magnitude type")
+
+
+def depth_category(depth: Optional[float]) -> str:
+    """Shallow (< 70 km), Intermediate (< 300 km) or Deep; unknown depth is Deep."""
+    if depth is None or math.isnan(depth):
+        return "Deep"
+    if depth < SHALLOW_MAX_DEPTH_KM:
+        return "Shallow"
+    if depth < INTERMEDIATE_MAX_DEPTH_KM:
+        return "Intermediate"
+    return "Deep"
+
+
+def magnitude_category(magnitude_type: Optional[str]) -> str:
+    return MAGNITUDE_TYPES.get(magnitude_type, OTHER_MAGNITUDE_TYPE)[0]
+
+
+def magnitude_description(magnitude_type: Optional[str]) -> str:
+    return MAGNITUDE_TYPES.get(magnitude_type, OTHER_MAGNITUDE_TYPE)[1]
+
+
+def depth_category_column(depths: Iterable[float]) -> List[str]:
+    return [depth_category(depth) for depth in depths]
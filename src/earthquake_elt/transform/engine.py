@@ -0,0 +1,100 @@
+# ============================================================================
+# FILE: src/earthquake_elt/transform/engine.py
+# ============================================================================
+import logging
+from contextlib import nullcontext
+from typing import Any, Callable, ContextManager, Dict, Optional
+
+from earthquake_elt.database import Database
+from earthquake_elt.ingestion.batch import EventBatch
+from earthquake_elt.regions import RegionClassifier, assign_regions
+
+logger = logging.getLogger(__name__)
+
+StepFactory = Callable[[str], ContextManager]
+
+STAGING_SQL = "sql/transformations/load_staging.sql"
+WAREHOUSE_SQL = "sql/transformations/load_warehouse.sql"
+EVENTS_SQL = "sql/transformations/load_events.sql"
+
+
+class TransformEngine:
+    """
+    Builds the staging and warehouse layers from ingested events.
+
+    The pipeline calls :meth:`on_batch_loaded` after each validated page is in
+    the raw layer, :meth:`finalize` once ingestion is complete, and
+    :meth:`load_events` for streaming micro-batches (which must also apply
+    revisions to already-loaded events). ``step`` wraps each unit of work
+    for metrics and profiling; ``regions`` assigns ``dim_location.region``.
+    """
+
+    name = "base"
+
+    def __init__(
+        self,
+        db: Database,
+        step: Optional[StepFactory] = None,
+        regions: Optional[RegionClassifier] = None,
+    ):
+        self.db = db
+        self._step = step or (lambda name: nullcontext())
+        self.regions = regions or RegionClassifier()
+
+    def on_batch_loaded(self, batch: EventBatch, batch_id: str, cursor=None) -> None:
+        """
+        Called with each page's valid events once they are in the raw layer.
+
+        With checkpoints the page is still uncommitted: ``cursor`` is the
+        transaction holding its raw rows and checkpoint, and any writes must
+        use it so they commit (or roll back) with them.
+        """
+
+    def finalize(self) -> None:
+        """Bring the warehouse up to date after ingestion."""
+
+    def load_events(self, batch: EventBatch, batch_id: str) -> None:
+        """Stage and upsert exactly the events of one micro-batch."""
+        raise NotImplementedError
+
+
+class SqlTransformEngine(TransformEngine):
+    """The SQL scripts in ``sql/transformations``, run inside Postgres."""
+
+    name = "sql"
+
+    def finalize(self) -> None:
+        logger.info("Transforming raw → staging")
+        with self._step("load_staging"):
+            self.db.execute_sql_file(STAGING_SQL)
+        logger.info("Transforming staging → warehouse")
+        with self._step("load_warehouse"):
+            self.db.execute_sql_file(WAREHOUSE_SQL)
+        self._assign_regions()
+
+    def load_events(self, batch: EventBatch, batch_id: str) -> None:
+        with self._step("load_events"):
+            self.db.execute_sql_file(
+                EVENTS_SQL, {"batch_id": batch_id, "event_ids": list(batch.ids)}
+            )
+        self._assign_regions()
+
+    def _assign_regions(self) -> None:
+        # The scripts insert new locations with a NULL region.
+        with self._step("assign_regions"):
+            assign_regions(self.db, self.regions)
+
+
+def create_engine(
+    config: Dict[str, Any], db: Database, step: Optional[StepFactory] = None
+) -> TransformEngine:
+    """Build the engine selected by ``[transform] engine`` (default ``sql``)."""
+    name = config.get("transform", {}).get("engine", "sql")
+    regions = RegionClassifier.from_config(config)
+    if name == "sql":
+        return SqlTransformEngine(db, step, regions)
+    if name == "python":
+        from earthquake_elt.transform.python_engine import PythonTransformEngine
+
+        return PythonTransformEngine(db, step, regions)
+    raise ValueError(f"Unknown transform engine: {name!r} (expected 'sql' or 'python')")
@@ -0,0 +1,281 @@
+# ============================================================================
+# FILE: src/earthquake_elt/transform/python_engine.py
+# ============================================================================
+import logging
+import math
+from datetime import date, datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from earthquake_elt.coordination import LOCK_TRANSFORM_SQL, TRANSFORM_LOCK
+from earthquake_elt.ingestion.batch import MISSING_FLAG, MISSING_INT, EventBatch
+from earthquake_elt.regions import RegionClassifier
+from earthquake_elt.transform import classify
+from earthquake_elt.transform.engine import TransformEngine
+
+logger = logging.getLogger(__name__)
+
+# English names padded to 9 characters, as produced by TO_CHAR(..., 'Month'/'Day').
+_MONTH_NAMES = (
+    "January", "February", "March", "April", "May", "June", "July",
+    "August", "September", "October", "November", "December",
+)  # fmt: skip
+_DAY_NAMES = (
+    "Sunday", "Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday",
+)  # fmt: skip
+
+STAGING_COLUMNS = (
+    "event_id",
+    "magnitude",
+    "magnitude_type",
+    "place",
+    "event_time",
+    "updated_time",
+    "latitude",
+    "longitude",
+    "depth",
+    "status",
+    "tsunami",
+    "significance",
+    "source_batch_id",
+)
+
+_INSERT_STAGING = f"""
+    INSERT INTO stg_earthquakes ({", ".join(STAGING_COLUMNS)})
+    VALUES %s
+    ON CONFLICT (event_id) DO NOTHING
+"""
+
+_UPSERT_STAGING = f"""
+    INSERT INTO stg_earthquakes ({", ".join(STAGING_COLUMNS)})
+    VALUES %s
+    ON CONFLICT (event_id) DO UPDATE SET
+        {", ".join(f"{c} = EXCLUDED.{c}" for c in STAGING_COLUMNS[1:])},
+        processed_at = CURRENT_TIMESTAMP
+    WHERE stg_earthquakes.updated_time IS NULL
+       OR stg_earthquakes.updated_time <= EXCLUDED.updated_time
+"""
+
+_INSERT_DIM_TIME = """
+    INSERT INTO dim_time (
+        date_actual, year, quarter, month, month_name, day,
+        day_of_week, day_name, week_of_year, is_weekend
+    )
+    VALUES %s
+    ON CONFLICT (date_actual) DO NOTHING
+"""
+
+_INSERT_DIM_LOCATION = """
+    INSERT INTO dim_location (latitude, longitude, depth_category, region, place)
+    SELECT v.latitude, v.longitude, v.depth_category, v.region, v.place
+    FROM (VALUES %s) AS v(latitude, longitude, depth_category, region, place)
+    WHERE NOT EXISTS (
+        SELECT 1 FROM dim_location l
+        WHERE l.latitude = v.latitude
+          AND l.longitude = v.longitude
+          AND COALESCE(l.place, '') = COALESCE(v.place, '')
+    )
+"""
+_DIM_LOCATION_TEMPLATE = "(%s::DECIMAL(9,6), %s::DECIMAL(9,6), %s, %s, %s::TEXT)"
+
+_INSERT_DIM_EVENT_TYPE = """
+    INSERT INTO dim_event_type (magnitude_type, magnitude_category, description)
+    VALUES %s
+    ON CONFLICT (magnitude_type) DO NOTHING
+"""
+
+_FACT_SELECT = """
+    INSERT INTO fact_earthquake_events (
+        event_id, time_key, location_key, event_type_key,
+        magnitude, depth, significance, tsunami, status, event_time
+    )
+    SELECT
+        se.event_id, dt.time_key, dl.location_key, det.event_type_key,
+        se.magnitude, se.depth, se.significance, se.tsunami, se.status, se.event_time
+    FROM stg_earthquakes se
+    LEFT JOIN dim_time dt ON dt.date_actual = se.event_time::DATE
+    LEFT JOIN dim_location dl ON
+        dl.latitude = se.latitude
+        AND dl.longitude = se.longitude
+        AND COALESCE(dl.place, '') = COALESCE(se.place, '')
+    LEFT JOIN dim_event_type det ON det.magnitude_type = se.magnitude_type
+    WHERE se.event_id = ANY(%(event_ids)s)
+"""
+_INSERT_FACTS = _FACT_SELECT + "ON CONFLICT (event_id) DO NOTHING"
+_UPSERT_FACTS = _FACT_SELECT + """
+    ON CONFLICT (event_id) DO UPDATE SET
+        time_key = EXCLUDED.time_key,
+        location_key = EXCLUDED.location_key,
+        event_type_key = EXCLUDED.event_type_key,
+        magnitude = EXCLUDED.magnitude,
+        depth = EXCLUDED.depth,
+        significance = EXCLUDED.significance,
+        tsunami = EXCLUDED.tsunami,
+        status = EXCLUDED.status,
+        event_time = EXCLUDED.event_time,
+        loaded_at = CURRENT_TIMESTAMP
+"""
+
+
+def _timestamp(epoch_ms: int) -> Optional[datetime]:
+    """Naive UTC timestamp, as TO_TIMESTAMP stores it under a UTC server."""
+    if epoch_ms == MISSING_INT:
+        return None
+    return datetime.fromtimestamp(epoch_ms / 1000, tz=timezone.utc).replace(tzinfo=None)
+
+
+def _optional(value: float, digits: int) -> Optional[float]:
+    return None if math.isnan(value) else round(value, digits)
+
+
+def dim_time_row(day: date) -> Tuple[Any, ...]:
+    dow = day.isoweekday() % 7  # 0 = Sunday, as EXTRACT(DOW)
+    return (
+        day,
+        day.year,
+        (day.month - 1) // 3 + 1,
+        day.month,
+        _MONTH_NAMES[day.month - 1].ljust(9),
+        day.day,
+        dow,
+        _DAY_NAMES[dow].ljust(9),
+        day.isocalendar()[1],
+        dow in (0, 6),
+    )
+
+
+class TransformRows:
+    """Staging and dimension rows computed from one batch."""
+
+    def __init__(self):
+        self.event_ids: List[str] = []
+        self.staging: List[Tuple[Any, ...]] = []
+        self.dim_time: List[Tuple[Any, ...]] = []
+        self.dim_location: List[Tuple[Any, ...]] = []
+        self.dim_event_type: List[Tuple[Any, ...]] = []
+
+
+def build_rows(
+    batch: EventBatch, batch_id: str, regions: RegionClassifier
+) -> TransformRows:
+    """
+    Compute staging rows and dimension attributes from the batch columns.
+
+    Applies the same filters and rules as the SQL scripts: events without a
+    magnitude or coordinates are not staged, and only the latest revision of
+    an event id in the batch is kept. Values are rounded to the column scale
+    before classification so boundaries match the DECIMAL comparisons in SQL,
+    and regions are looked up with ``regions`` as new locations are built.
+    """
+    latest: Dict[str, int] = {}
+    ids, updated, mags, n_coords = batch.ids, batch.updated, batch.mag, batch.n_coords
+    for i in range(len(batch)):
+        if math.isnan(mags[i]) or n_coords[i] == 0:
+            continue
+        current = latest.get(ids[i])
+        if current is None or updated[i] >= updated[current]:
+            latest[ids[i]] = i
+    indices = sorted(latest.values())
+
+    lat = [_optional(batch.lat[i], 6) for i in indices]
+    lon = [_optional(batch.lon[i], 6) for i in indices]
+    depth = [_optional(batch.depth[i], 3) for i in indices]
+    event_time = [_timestamp(batch.time[i]) for i in indices]
+    depth_categories = classify.depth_category_column(depth)
+    location_regions = regions.classify_many(lat, lon)
+
+    rows = TransformRows()
+    rows.event_ids = [ids[i] for i in indices]
+    for k, i in enumerate(indices):
+        tsunami = batch.tsunami[i]
+        sig = batch.sig[i]
+        rows.staging.append(
+            (
+                ids[i],
+                round(mags[i], 2),
+                batch.mag_type[i],
+                batch.place[i],
+                event_time[k],
+                _timestamp(updated[i]),
+                lat[k],
+                lon[k],
+                depth[k],
+                batch.status[i],
+                tsunami != MISSING_FLAG and bool(tsunami),
+                None if sig == MISSING_INT else sig,
+                batch_id,
+            )
+        )
+
+    days = {t.date() for t in event_time if t is not None}
+    rows.dim_time = [dim_time_row(day) for day in sorted(days)]
+
+    locations: Dict[Tuple[Any, Any, Any], Tuple[Any, ...]] = {}
+    for k, i in enumerate(indices):
+        if lat[k] is None or lon[k] is None:
+            continue
+        key = (lat[k], lon[k], batch.place[i] or "")  # matched via COALESCE
+        if key not in locations:
+            locations[key] = (
+                lat[k],
+                lon[k],
+                depth_categories[k],
+                location_regions[k],
+                batch.place[i],
+            )
+    rows.dim_location = list(locations.values())
+
+    mag_types = {batch.mag_type[i] for i in indices} - {None}
+    rows.dim_event_type = [
+        (t, classify.magnitude_category(t), classify.magnitude_description(t))
+        for t in sorted(mag_types)
+    ]
+    return rows
+
+
+class PythonTransformEngine(TransformEngine):
+    """
+    Builds staging and warehouse rows in Python from the validated batch.
+
+    Each page is transformed right after its raw load, in a single
+    transaction, so :meth:`finalize` has nothing left to do and the raw JSONB
+    is never re-parsed.
+    """
+
+    name = "python"
+
+    def on_batch_loaded(self, batch: EventBatch, batch_id: str, cursor=None) -> None:
+        self._load(batch, batch_id, upsert=False, cursor=cursor)
+
+    def finalize(self) -> None:
+        logger.info("Python transform engine: warehouse already current")
+
+    def load_events(self, batch: EventBatch, batch_id: str) -> None:
+        self._load(batch, batch_id, upsert=True)
+
+    def _load(self, batch: EventBatch, batch_id: str, upsert: bool, cursor=None) -> None:
+        with self._step("python_rows"):
+            rows = build_rows(batch, batch_id, self.regions)
+        if not rows.staging:
+            return
+        with self._step("python_load"):
+            if cursor is not None:
+                _write_rows(cursor, rows, upsert)
+            else:
+                with self.db.get_connection() as conn:
+                    with conn.cursor() as cur:
+                        _write_rows(cur, rows, upsert)
+        logger.info(f"Transformed {len(rows.staging)} events (batch: {batch_id})")
+
+
+def _write_rows(cur, rows: TransformRows, upsert: bool) -> None:
+    from psycopg2.extras import execute_values
+
+    cur.execute(LOCK_TRANSFORM_SQL, (TRANSFORM_LOCK,))
+    execute_values(cur, _UPSERT_STAGING if upsert else _INSERT_STAGING, rows.staging)
+    execute_values(cur, _INSERT_DIM_TIME, rows.dim_time)
+    execute_values(
+        cur, _INSERT_DIM_LOCATION, rows.dim_location, template=_DIM_LOCATION_TEMPLATE
+    )
+    if rows.dim_event_type:
+        execute_values(cur, _INSERT_DIM_EVENT_TYPE, rows.dim_event_type)
+    cur.execute(_UPSERT_FACTS if upsert else _INSERT_FACTS, {"event_ids": rows.event_ids})
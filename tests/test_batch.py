@@ -0,0 +1,133 @@
+# ============================================================================
+# FILE: tests/test_batch.py
+# ============================================================================
+import json
+import math
+import re
+
+import pytest
+
+from earthquake_elt.database import Database
+from earthquake_elt.ingestion import DataValidator, RawDataLoader
+from earthquake_elt.ingestion.batch import EventBatch
+from earthquake_elt.testing import SyntheticCatalog
+
+
+@pytest.fixture
+def feature():
+    return {
+        "type": "Feature",
+        "id": "test123",
+        "properties": {
+            "mag": 5.2,
+            "magType": "mw",
+            "place": "Test Location",
+            "time": 1699999999000,
+            "updated": 1700000999000,
+            "sig": 416,
+            "tsunami": 0,
+        },
+        "geometry": {"type": "Point", "coordinates": [-122.4, 37.8, 10.5]},
+    }
+
+
+def test_columns_and_row_view(feature):
+    sparse = {"id": "x1", "properties": {"time": 1}, "geometry": {"coordinates": [1, 2]}}
+    batch = EventBatch.from_features([feature, sparse])
+    assert len(batch) == 2
+    assert batch.mag[0] == 5.2 and math.isnan(batch.mag[1])
+
+    row = batch[0]
+    assert (row.id, row.mag, row.time, row.updated) == (
+        "test123",
+        5.2,
+        1699999999000,
+        1700000999000,
+    )
+    assert (row.latitude, row.longitude, row.depth) == (37.8, -122.4, 10.5)
+    assert row.sig == 416 and row.tsunami is False
+    assert row.to_dict() == feature
+
+    sparse_row = batch[-1]
+    assert sparse_row.mag is None
+    assert sparse_row.depth is None
+    assert sparse_row.sig is None
+    assert sparse_row.tsunami is None
+    assert not hasattr(sparse_row, "__dict__")
+
+
+def test_take_preserves_order(feature):
+    features = SyntheticCatalog().generate(10)
+    batch = EventBatch.from_features(features)
+    subset = batch.take([7, 2])
+    assert subset.ids == [features[7]["id"], features[2]["id"]]
+    assert subset[0].to_dict() == features[7]
+
+
+def test_batch_validation_matches_dict_validation():
+    features = SyntheticCatalog(invalid_rate=0.05, missing_rate=0.05).generate(2000)
+    validator = DataValidator({})
+    valid_dicts, invalid_dicts = validator.validate_batch(features)
+    valid_batch, invalid_rows = validator.validate_batch(
+        EventBatch.from_features(features)
+    )
+
+    assert isinstance(valid_batch, EventBatch)
+    assert valid_batch.ids == [f["id"] for f in valid_dicts]
+    assert [(r.id, msg) for r, msg in invalid_rows] == [
+        (e["id"], msg) for e, msg in invalid_dicts
+    ]
+
+
+def test_loader_streams_batch_rows(feature):
+    class FakeDatabase:
+        def bulk_insert_rows(
+            self, table, columns, rows, page_size=1000, on_conflict="", cursor=None
+        ):
+            self.table, self.columns, self.rows = table, columns, list(rows)
+            self.on_conflict = on_conflict
+            return len(self.rows)
+
+    db = FakeDatabase()
+    inserted = RawDataLoader(db).insert_batch(EventBatch.from_features([feature]), "b1")
+    assert inserted == 1
+    assert db.table == "raw_earthquake_events"
+    assert db.on_conflict == "ON CONFLICT (event_id, batch_id) DO NOTHING"
+    batch_id, event_id, raw_data, _ = db.rows[0]
+    assert (batch_id, event_id) == ("b1", "test123")
+    assert json.loads(raw_data) == feature
+
+
+def test_bulk_insert_rows_counts_rows_inserted():
+    class Cursor:
+        """Inserts each multi-row statement, skipping ids already stored."""
+
+        class connection:
+            encoding = "UTF8"
+
+        def __init__(self):
+            self.stored = set()
+            self.statements = 0
+
+        def mogrify(self, template, args):
+            return repr(args).encode()
+
+        def execute(self, sql):
+            self.statements += 1
+            ids = set(re.findall(rb"\('(\w+)',", sql))
+            self.rowcount = len(ids - self.stored)
+            self.stored |= ids
+
+    cur = Cursor()
+    db = Database({})
+    rows = [("a",), ("b",), ("a",), ("c",), ("b",)]
+    inserted = db.bulk_insert_rows(
+        "t",
+        ("id",),
+        iter(rows),
+        page_size=2,
+        on_conflict="ON CONFLICT DO NOTHING",
+        cursor=cur,
+    )
+    assert cur.statements == 3
+    assert inserted == 3
@@ -0,0 +1,469 @@
+# ============================================================================
+# FILE: tests/test_checkpoint.py
+# ============================================================================
+import re
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pytest
+
+from earthquake_elt.database import Database
+from earthquake_elt.ingestion import DataValidator, USGSAPIClient
+from earthquake_elt.ingestion.checkpoint import COUNT_KEYS, Checkpoint, CheckpointStore
+from earthquake_elt.ingestion.error_handler import ErrorHandler
+from earthquake_elt.pipeline import EarthquakePipeline
+from earthquake_elt.profiling import StageProfiler
+from earthquake_elt.testing import Catalog, MockFDSNServer, SyntheticCatalog
+from earthquake_elt.transform import TransformEngine
+
+SCHEMA = Path(__file__).resolve().parents[1] / "sql" / "schema"
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+END = datetime(2024, 1, 8, tzinfo=timezone.utc)
+
+
+class ScriptedDatabase:
+    """Records statements; each fetchone pops the next scripted row."""
+
+    def __init__(self, rows=()):
+        self.rows = list(rows)
+        self.statements = []
+
+    @contextmanager
+    def get_connection(self):
+        yield self
+
+    @contextmanager
+    def cursor(self):
+        yield self
+
+    def execute(self, sql, params=None):
+        self.statements.append((" ".join(sql.split()), params))
+
+    def fetchone(self):
+        return self.rows.pop(0)
+
+
+def test_schema_applies_to_an_existing_database():
+    scripted = ScriptedDatabase()
+    db = Database({})
+    db.get_connection = scripted.get_connection
+    db.apply_schema(str(SCHEMA))
+
+    lock, *files = [sql for sql, _ in scripted.statements]
+    assert lock.startswith("SELECT pg_advisory_xact_lock")
+    assert len(files) == len(list(SCHEMA.glob("*.sql")))
+    # Every file must run cleanly against a database that already has it.
+    for sql in files:
+        for create in re.findall(r"CREATE (?:TABLE|INDEX) \S+ \S+ \S+", sql):
+            assert create.endswith("IF NOT EXISTS"), create
+    assert "ADD COLUMN IF NOT EXISTS event_count" in files[-1]
+    assert "ADD COLUMN IF NOT EXISTS last_event_id" in files[-1]
+
+
+def test_begin_resumes_stored_window_and_offsets():
+    stored = (START, END, 100, 1000, "ev200", [1, 201], "failed", 200, 198, 2, 198)
+    db = ScriptedDatabase([stored])
+    checkpoint = CheckpointStore(db).begin("b1", datetime.now(timezone.utc), END, 100)
+
+    assert (checkpoint.start_time, checkpoint.end_time) == (START, END)
+    assert checkpoint.completed_offsets == {1, 201} and checkpoint.resumed
+    assert checkpoint.last_event_id == "ev200"
+    assert checkpoint.counts == {
+        "fetched": 200,
+        "valid": 198,
+        "invalid": 2,
+        "loaded": 198,
+    }
+    assert db.statements[0][0].startswith("INSERT INTO ingestion_checkpoints")
+
+
+def test_begin_starts_over_when_page_size_changed():
+    db = ScriptedDatabase(
+        [(START, END, 50, 1000, "ev100", [1, 51], "failed", 100, 98, 2, 90)]
+    )
+    checkpoint = CheckpointStore(db).begin("b1", START, END, 100)
+
+    assert not checkpoint.resumed and checkpoint.event_count is None
+    # Rows already in the raw layer stay counted; the refetch skips them.
+    assert checkpoint.counts == {"fetched": 0, "valid": 0, "invalid": 0, "loaded": 90}
+    sql, params = db.statements[-1]
+    assert "completed_offsets = '{}'" in sql and params["page_size"] == 100
+
+
+def test_verify_drops_offsets_when_window_count_changed():
+    counts = dict(fetched=200, valid=198, invalid=2, loaded=198)
+    checkpoint = Checkpoint("b1", START, END, 100, 1000, {1, 101}, "failed", counts)
+    db = ScriptedDatabase()
+    store = CheckpointStore(db)
+
+    assert store.verify(checkpoint, 1000) is checkpoint
+    assert db.statements == []
+
+    verified = store.verify(checkpoint, 1001)
+    assert not verified.resumed and verified.event_count == 1001
+    assert verified.counts == {"fetched": 0, "valid": 0, "invalid": 0, "loaded": 198}
+    sql, params = db.statements[-1]
+    assert "completed_offsets = '{}'" in sql and params["event_count"] == 1001
+
+    # A resumed window that cannot be counted cannot be trusted either.
+    assert not store.verify(checkpoint, None).resumed
+
+
+def test_verify_keeps_uncountable_window_whose_last_event_is_in_place():
+    counts = dict(fetched=200, valid=198, invalid=2, loaded=198)
+    checkpoint = Checkpoint(
+        "b1", START, END, 100, None, {1, 101}, "failed", counts, "ev200"
+    )
+    db = ScriptedDatabase()
+    store = CheckpointStore(db)
+
+    assert store.verify(checkpoint, None, {200: "ev200"}.get) is checkpoint
+    assert db.statements == []
+    # An event added or removed before position 200 moves another one there.
+    assert not store.verify(checkpoint, None, {200: "ev199"}.get).resumed
+
+    # Out-of-order pages leave a gap, so "fetched" is not the last position.
+    gapped = Checkpoint("b1", START, END, 100, None, {1, 201}, "failed", counts, "ev300")
+    assert not store.verify(gapped, None, {200: "ev300"}.get).resumed
+
+
+class Transaction:
+    """Buffers writes until the connection context exits cleanly."""
+
+    def __init__(self):
+        self.ops = []
+
+    @contextmanager
+    def cursor(self):
+        yield self
+
+
+class MemoryDatabase:
+    def __init__(self):
+        self.raw = []
+        self.batches = {}
+
+    @contextmanager
+    def get_connection(self):
+        txn = Transaction()
+        yield txn
+        for op in txn.ops:
+            op()
+
+
+class MemoryLoader:
+    def __init__(self, db):
+        self.db = db
+
+    def insert_batch(self, batch, batch_id, cursor=None):
+        new = [event_id for event_id in batch.ids if event_id not in self.db.raw]
+        cursor.ops.append(lambda: self.db.raw.extend(new))
+        return len(new)
+
+    def record_batch(self, batch_id, start_time, fetched, inserted, status, **kwargs):
+        self.db.batches[batch_id] = (status, inserted)
+
+
+class MemoryCheckpoints(CheckpointStore):
+    def __init__(self, db):
+        super().__init__(db)
+        self.row = None
+
+    def begin(self, batch_id, start_time, end_time, page_size):
+        if self.row is None:
+            self.row = {"window": (start_time, end_time), "offsets": set()}
+            self.row.update(event_count=None, last_event_id=None)
+            self.row.update({key: 0 for key in COUNT_KEYS}, status="running")
+        counts = {key: self.row[key] for key in COUNT_KEYS}
+        return Checkpoint(
+            batch_id,
+            *self.row["window"],
+            page_size,
+            self.row["event_count"],
+            frozenset(self.row["offsets"]),
+            self.row["status"],
+            counts,
+            self.row["last_event_id"],
+        )
+
+    def _store_event_count(self, checkpoint, event_count, reset):
+        self.row["event_count"] = event_count
+        if reset:
+            self.row["offsets"] = set()
+            self.row.update(fetched=0, valid=0, invalid=0, last_event_id=None)
+
+    def commit_page(self, cur, batch_id, offset, counts, last_event_id=None):
+        def apply():
+            if offset > max(self.row["offsets"], default=0):
+                self.row["last_event_id"] = last_event_id
+            self.row["offsets"].add(offset)
+            for key in COUNT_KEYS:
+                self.row[key] += counts[key]
+
+        cur.ops.append(apply)
+
+    def finish(self, batch_id, status):
+        self.row["status"] = status
+
+
+class NoErrors:
+    def log_error(self, **kwargs):
+        pass
+
+    def check_threshold(self):
+        return False
+
+    def reset(self):
+        pass
+
+
+@pytest.fixture
+def pipeline():
+    pipeline = object.__new__(EarthquakePipeline)
+    pipeline.config = {"api": {"lookback_days": 7}}
+    pipeline.profiler = StageProfiler()
+    pipeline.db = MemoryDatabase()
+    pipeline.loader = MemoryLoader(pipeline.db)
+    pipeline.checkpoints = MemoryCheckpoints(pipeline.db)
+    pipeline.validator = DataValidator({})
+    pipeline.error_handler = NoErrors()
+    pipeline.transform_engine = TransformEngine(pipeline.db)
+    return pipeline
+
+
+def test_interrupted_batch_resumes_from_committed_pages(pipeline):
+    catalog = Catalog.synthetic(1000, start_time=START, end_time=END)
+    config = {
+        "api": {
+            "base_url": "",
+            "format": "geojson",
+            "timeout": 5,
+            "batch_size": 100,
+            "rate_limit_per_minute": 10**6,
+        }
+    }
+    pages = []
+
+    def evict_after_three_pages():
+        pages.append(1)
+        if len(pages) == 3:
+            raise RuntimeError("worker evicted")
+
+    with MockFDSNServer(catalog=catalog) as server:
+        config["api"]["base_url"] = server.query_url
+        pipeline.api_client = USGSAPIClient(config)
+        with pytest.raises(RuntimeError):
+            pipeline.run_ingestion(
+                START, END, on_page=evict_after_three_pages, batch_id="b1"
+            )
+        assert len(pipeline.db.raw) == 300
+        assert pipeline.checkpoints.row["status"] == "failed"
+        assert pipeline.db.batches["b1"] == ("failed", 300)
+
+        first_run = server.stats["requests"]
+        assert pipeline.checkpoints.row["event_count"] == 1000
+        # The restart passes another window; the stored one wins.
+        stats = pipeline.run_ingestion(batch_id="b1")
+        assert server.stats["requests"] - first_run == 1 + 7  # count + missing pages
+
+    assert sorted(pipeline.db.raw) == sorted(f["id"] for f in catalog.features)
+    assert stats["events_loaded"] == stats["events_fetched"] == 1000
+    assert (stats["start_time"], stats["end_time"]) == (
+        START.isoformat(),
+        END.isoformat(),
+    )
+    assert pipeline.checkpoints.row["status"] == "success"
+    assert pipeline.db.batches["b1"] == ("success", 1000)
+
+    assert pipeline.run_ingestion(batch_id="b1")["events_loaded"] == 1000
+    assert len(pipeline.db.raw) == 1000
+
+
+def test_uncountable_window_resumes_without_relogging_rejects(pipeline, monkeypatch):
+    generator = SyntheticCatalog(start_time=START, end_time=END, invalid_rate=0.05)
+    catalog = Catalog(generator.generate(500))
+    config = {
+        "api": {
+            "base_url": "",
+            "format": "geojson",
+            "timeout": 5,
+            "batch_size": 100,
+            "rate_limit_per_minute": 10**6,
+        }
+    }
+    rejects = []
+    pipeline.error_handler.log_error = lambda **error: rejects.append(error)
+    pages = []
+
+    def evict_after_two_pages():
+        pages.append(1)
+        if len(pages) == 2:
+            raise RuntimeError("worker evicted")
+
+    with MockFDSNServer(catalog=catalog) as server:
+        config["api"]["base_url"] = server.query_url
+        pipeline.api_client = USGSAPIClient(config)
+        # A server without the FDSN count method is paged in order.
+        monkeypatch.setattr(pipeline.api_client, "count_events", lambda params: None)
+        with pytest.raises(RuntimeError):
+            pipeline.run_ingestion(
+                START, END, on_page=evict_after_two_pages, batch_id="b1"
+            )
+        assert pipeline.checkpoints.row["offsets"] == {1, 101}
+
+        first_run = server.stats["requests"]
+        stats = pipeline.run_ingestion(batch_id="b1")
+        # The probe of event 200, then pages 201-401 (the last one short).
+        assert server.stats["requests"] - first_run == 1 + 3
+
+    assert stats["events_fetched"] == len(catalog.features)
+    assert len(rejects) == stats["events_invalid"] > 0
+
+
+def test_lost_lease_abandons_batch_without_finishing_it(pipeline):
+    catalog = Catalog.synthetic(300, start_time=START, end_time=END)
+    config = {
+        "api": {
+            "base_url": "",
+            "format": "geojson",
+            "timeout": 5,
+            "batch_size": 100,
+            "rate_limit_per_minute": 10**6,
+        }
+    }
+    with MockFDSNServer(catalog=catalog) as server:
+        config["api"]["base_url"] = server.query_url
+        pipeline.api_client = USGSAPIClient(config)
+        stats = pipeline.run_ingestion(START, END, on_page=lambda: False, batch_id="b1")
+
+    assert stats["status"] == "abandoned" and stats["events_loaded"] == 100
+    assert pipeline.checkpoints.row["status"] == "running"
+    assert "b1" not in pipeline.db.batches
+
+
+def test_each_batch_gets_a_fresh_error_budget(pipeline):
+    catalog = Catalog.synthetic(200, start_time=START, end_time=END)
+    config = {
+        "api": {
+            "base_url": "",
+            "format": "geojson",
+            "timeout": 5,
+            "batch_size": 100,
+            "rate_limit_per_minute": 10**6,
+        }
+    }
+    handler = ErrorHandler(pipeline.db, {"ingestion": {"max_errors_per_batch": 5}})
+    # Rejects left over from the worker's previous shard.
+    handler.error_count = 5
+    pipeline.error_handler = handler
+    with MockFDSNServer(catalog=catalog) as server:
+        config["api"]["base_url"] = server.query_url
+        pipeline.api_client = USGSAPIClient(config)
+        stats = pipeline.run_ingestion(START, END, batch_id="b2")
+
+    assert stats["status"] == "success" and stats["events_loaded"] == 200
+
+
+def test_empty_window_reports_its_batch(pipeline):
+    config = {
+        "api": {
+            "base_url": "",
+            "format": "geojson",
+            "timeout": 5,
+            "batch_size": 100,
+            "rate_limit_per_minute": 10**6,
+        }
+    }
+    with MockFDSNServer(catalog=Catalog([])) as server:
+        config["api"]["base_url"] = server.query_url
+        pipeline.api_client = USGSAPIClient(config)
+        stats = pipeline.run_ingestion(START, END, batch_id="b3")
+
+    assert stats["batch_id"] == "b3" and stats["events_fetched"] == 0
+    assert pipeline.checkpoints.row["status"] == "success"
+
+
+class PageEngine(TransformEngine):
+    """Writes on the page's cursor; fails on the ``fail_on``-th page."""
+
+    def __init__(self, db, fail_on=None):
+        super().__init__(db)
+        self.fail_on = fail_on
+        self.pages = 0
+        self.warehouse = []
+
+    def on_batch_loaded(self, batch, batch_id, cursor=None):
+        self.pages += 1
+        if self.pages == self.fail_on:
+            raise RuntimeError("transform failed")
+        cursor.ops.append(lambda: self.warehouse.extend(batch.ids))
+
+
+def test_page_transform_commits_with_raw_rows_and_checkpoint(pipeline):
+    catalog = Catalog.synthetic(300, start_time=START, end_time=END)
+    config = {
+        "api": {
+            "base_url": "",
+            "format": "geojson",
+            "timeout": 5,
+            "batch_size": 100,
+            "rate_limit_per_minute": 10**6,
+        }
+    }
+    engine = PageEngine(pipeline.db, fail_on=3)
+    pipeline.transform_engine = engine
+    with MockFDSNServer(catalog=catalog) as server:
+        config["api"]["base_url"] = server.query_url
+        pipeline.api_client = USGSAPIClient(config)
+        with pytest.raises(RuntimeError):
+            pipeline.run_ingestion(START, END, batch_id="b1")
+
+        # The failed page left no raw rows, checkpoint or warehouse rows.
+        assert pipeline.db.raw == engine.warehouse
+        # Pages arrive in any order when fetched concurrently; two committed.
+        assert len(pipeline.checkpoints.row["offsets"]) == 2
+
+        engine.fail_on = None
+        pipeline.run_ingestion(batch_id="b1")
+    assert sorted(engine.warehouse) == sorted(pipeline.db.raw)
+    assert pipeline.checkpoints.row["offsets"] == {1, 101, 201}
+
+
+def test_resume_refetches_when_window_changed(pipeline):
+    catalog = Catalog.synthetic(500, start_time=START, end_time=END)
+    config = {
+        "api": {
+            "base_url": "",
+            "format": "geojson",
+            "timeout": 5,
+            "batch_size": 100,
+            "rate_limit_per_minute": 10**6,
+        }
+    }
+    pages = []
+
+    def evict_after_two_pages():
+        pages.append(1)
+        if len(pages) == 2:
+            raise RuntimeError("worker evicted")
+
+    with MockFDSNServer(catalog=catalog) as server:
+        config["api"]["base_url"] = server.query_url
+        pipeline.api_client = USGSAPIClient(config)
+        with pytest.raises(RuntimeError):
+            pipeline.run_ingestion(
+                START, END, on_page=evict_after_two_pages, batch_id="b1"
+            )
+
+        # The newest event is deleted upstream, shifting every page by one.
+        original = [f["id"] for f in catalog.features]
+        server._server.catalog = Catalog(catalog.features[:-1])
+        first_run = server.stats["requests"]
+        stats = pipeline.run_ingestion(batch_id="b1")
+        assert server.stats["requests"] - first_run == 1 + 5  # count + every page
+
+    assert pipeline.checkpoints.row["event_count"] == len(original) - 1
+    assert sorted(pipeline.db.raw) == sorted(original)
+    assert stats["events_fetched"] == len(original) - 1
+    assert stats["events_loaded"] == len(original)
@@ -0,0 +1,190 @@
+# ============================================================================
+# FILE: tests/test_coordination.py
+# ============================================================================
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+
+from earthquake_elt.coordination import TRANSFORM_LOCK, Shard, ShardQueue
+from earthquake_elt.pipeline import EarthquakePipeline
+
+ROOT = Path(__file__).resolve().parents[1]
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+class FakeDatabase:
+    """Records statements; each execute pops the next scripted result."""
+
+    def __init__(self, results=()):
+        self.results = list(results)
+        self.statements = []
+        self.rowcount = 0
+        self._row = None
+
+    @contextmanager
+    def get_connection(self):
+        yield self
+
+    @contextmanager
+    def cursor(self):
+        yield self
+
+    def execute(self, sql, params=None):
+        self.statements.append((" ".join(sql.split()), params))
+        result = self.results.pop(0) if self.results else (0, None)
+        self.rowcount, self._row = result
+
+    def fetchone(self):
+        return self._row
+
+
+def test_transform_scripts_take_the_transform_lock():
+    statement = f"SELECT pg_advisory_xact_lock(hashtext('{TRANSFORM_LOCK}'));"
+    for path in sorted((ROOT / "sql" / "transformations").glob("*.sql")):
+        first = next(
+            line
+            for line in path.read_text().splitlines()
+            if line.strip() and not line.startswith("--")
+        )
+        assert first == statement, path.name
+
+
+def test_claim_and_complete_are_scoped_to_the_lease():
+    row = (7, START, START + timedelta(days=1), 1)
+    db = FakeDatabase([(1, row), (1, None), (0, None)])
+    queue = ShardQueue(db, "run-1", worker_id="w1", lease_seconds=60)
+
+    shard = queue.claim()
+    assert (shard.shard_id, shard.attempts) == (7, 1)
+    sql, params = db.statements[0]
+    assert "FOR UPDATE SKIP LOCKED" in sql
+    assert params["lease"] == timedelta(seconds=60) and params["worker"] == "w1"
+
+    assert queue.heartbeat(shard) is True
+    assert queue.complete(shard, "b1", 10) is False  # taken over meanwhile
+    sql, params = db.statements[-1]
+    assert "claimed_by = %(worker)s AND status = 'running'" in sql
+    assert params["shard_id"] == 7 and params["loaded"] == 10
+
+
+def test_claim_returns_none_when_no_shard_is_left():
+    assert ShardQueue(FakeDatabase([(0, None)]), "run-1").claim() is None
+
+
+def test_remaining_fails_shards_whose_last_lease_expired():
+    db = FakeDatabase([(1, None), (1, (2,))])
+    assert ShardQueue(db, "run-1", max_attempts=3).remaining() == 2
+
+    (expire, params), (count, _) = db.statements
+    assert expire.startswith("UPDATE ingestion_shards SET status = 'failed'")
+    assert "lease_expires_at < NOW() AND attempts >= %(max_attempts)s" in expire
+    assert params == {"run_key": "run-1", "max_attempts": 3}
+    assert count.startswith("SELECT COUNT(*)")
+
+
+class FakeQueue:
+    def __init__(self, shards, remaining=0, lost=()):
+        self.run_key = "run-1"
+        self.lost = set(lost)
+        self.shards = list(shards)
+        self.remaining_count = remaining
+        self.planned = None
+        self.done, self.failed, self.heartbeats = [], [], 0
+
+    def plan(self, start_time, end_time):
+        self.planned = (start_time, end_time)
+
+    def claim(self):
+        return self.shards.pop(0) if self.shards else None
+
+    def heartbeat(self, shard):
+        self.heartbeats += 1
+        return shard.shard_id not in self.lost
+
+    def complete(self, shard, batch_id, events_loaded):
+        self.done.append((shard.shard_id, events_loaded))
+        return True
+
+    def fail(self, shard, error_message):
+        self.failed.append((shard.shard_id, error_message))
+        return True
+
+    def remaining(self):
+        return self.remaining_count
+
+    def status_counts(self):
+        return {"done": len(self.done), "failed": len(self.failed)}
+
+
+@pytest.fixture
+def worker():
+    pipeline = object.__new__(EarthquakePipeline)
+    pipeline.config = {"api": {"lookback_days": 2}}
+    pipeline.db = None
+    pipeline.transformed = 0
+    pipeline.batch_ids = []
+
+    def run_ingestion(start_time, end_time, on_page=None, batch_id=None):
+        pipeline.batch_ids.append(batch_id)
+        if start_time.day == 2:
+            raise RuntimeError("API down")
+        if on_page() is False:
+            return {"status": "abandoned", "batch_id": "b", "events_loaded": 1}
+        return {"status": "success", "batch_id": "b", "events_loaded": 5}
+
+    def run_transformations():
+        pipeline.transformed += 1
+        return {"fact_events": 10}
+
+    pipeline.run_ingestion = run_ingestion
+    pipeline.run_transformations = run_transformations
+    return pipeline
+
+
+def _shards(days):
+    return [
+        Shard(d, START + timedelta(days=d - 1), START + timedelta(days=d), 1)
+        for d in days
+    ]
+
+
+def test_worker_processes_claimed_shards_and_transforms_last(worker, monkeypatch):
+    queue = FakeQueue(_shards([1, 2, 3]))
+    monkeypatch.setattr(ShardQueue, "from_config", classmethod(lambda *a: queue))
+
+    stats = worker.run_worker(START, START + timedelta(days=3))
+
+    assert queue.done == [(1, 5), (3, 5)]
+    assert queue.failed == [(2, "API down")]
+    assert queue.heartbeats == 2
+    assert stats["status"] == "partial" and stats["events_loaded"] == 10
+    assert worker.transformed == 1
+    # Batch ids are stable per shard so that a retried shard resumes.
+    assert len(set(worker.batch_ids)) == 3
+    assert worker.batch_ids[0] == str(uuid.uuid5(uuid.NAMESPACE_URL, "run-1#1"))
+
+
+def test_worker_leaves_transforms_while_shards_remain(worker, monkeypatch):
+    queue = FakeQueue(_shards([1]), remaining=2)
+    monkeypatch.setattr(ShardQueue, "from_config", classmethod(lambda *a: queue))
+
+    stats = worker.run_worker()
+
+    assert worker.transformed == 0 and "transformations" not in stats
+    start, end = queue.planned
+    assert end - start == timedelta(days=2)
+    assert (end.hour, end.minute, end.tzinfo) == (0, 0, timezone.utc)
+
+
+def test_worker_drops_a_shard_whose_lease_was_lost(worker, monkeypatch):
+    queue = FakeQueue(_shards([1, 3]), lost={1})
+    monkeypatch.setattr(ShardQueue, "from_config", classmethod(lambda *a: queue))
+
+    stats = worker.run_worker(START, START + timedelta(days=3))
+
+    # The new owner finishes shard 1; this worker neither completes nor fails it.
+    assert queue.done == [(3, 5)] and queue.failed == []
+    assert stats["shards_lost"] == 1 and stats["status"] == "success"
@@ -0,0 +1,110 @@
+# ============================================================================
+# FILE: tests/test_fdsn_server.py
+# ============================================================================
+from datetime import datetime, timezone
+
+import pytest
+import requests
+
+from earthquake_elt import metrics
+from earthquake_elt.ingestion import USGSAPIClient
+from earthquake_elt.ingestion.api_client import PageFetchError
+from earthquake_elt.testing import Catalog, FaultInjector, MockFDSNServer
+
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+END = datetime(2024, 1, 8, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def catalog():
+    return Catalog.synthetic(1000, start_time=START, end_time=END)
+
+
+def client_config(base_url, batch_size=100, **api):
+    return {
+        "api": {
+            "base_url": base_url,
+            "format": "geojson",
+            "timeout": 5,
+            "batch_size": batch_size,
+            "rate_limit_per_minute": 10**6,
+            "retry_backoff": 0.01,
+            **api,
+        }
+    }
+
+
+def test_client_paginates_whole_window(catalog):
+    with MockFDSNServer(catalog=catalog) as server:
+        client = USGSAPIClient(client_config(server.query_url))
+        events = client.fetch_earthquakes(START, END)
+        assert server.stats["requests"] == 11  # count + ten pages
+    assert len(events) == len(catalog.features)
+    assert len({e["id"] for e in events}) == len(events)
+
+
+def test_count_and_filters(catalog):
+    with MockFDSNServer(catalog=catalog) as server:
+        params = {"format": "geojson", "starttime": START.isoformat()}
+        total = requests.get(f"{server.base_url}/count", params=params).json()
+        assert total["count"] == len(catalog.features)
+
+        params.update(minmagnitude=2.0, orderby="time-asc", limit=5, offset=1)
+        data = requests.get(server.query_url, params=params).json()
+        times = [f["properties"]["time"] for f in data["features"]]
+        assert times == sorted(times)
+        assert all(f["properties"]["mag"] >= 2.0 for f in data["features"])
+        assert data["metadata"]["count"] == len(data["features"]) <= 5
+
+
+def test_injected_faults(catalog):
+    faults = FaultInjector(script=["429", "503", "truncate"], retry_after=3)
+    with MockFDSNServer(catalog=catalog, faults=faults) as server:
+        params = {"format": "geojson", "limit": 50}
+        throttled = requests.get(server.query_url, params=params)
+        assert throttled.status_code == 429
+        assert throttled.headers["Retry-After"] == "3"
+        assert requests.get(server.query_url, params=params).status_code == 503
+        with pytest.raises(requests.RequestException):
+            requests.get(server.query_url, params=params).json()
+        assert requests.get(server.query_url, params=params).ok
+        assert server.stats == {
+            "requests": 4,
+            "429": 1,
+            "503": 1,
+            "truncate": 1,
+            "ok": 1,
+        }
+
+
+def test_client_honours_retry_after_and_backs_off(catalog):
+    faults = FaultInjector(script=[None, None, "429"], retry_after=0.2)
+    throttled = metrics.API_THROTTLED.value(status="429")
+    with MockFDSNServer(catalog=catalog, faults=faults) as server:
+        client = USGSAPIClient(client_config(server.query_url))
+        events = client.fetch_earthquakes(START, END)
+        assert server.stats["429"] == 1 and server.stats["requests"] == 12
+    assert len({e["id"] for e in events}) == len(catalog.features)
+    assert metrics.API_THROTTLED.value(status="429") == throttled + 1
+    assert client.rate_controller.rate_per_minute < 10**6
+
+
+def test_failed_pages_are_retried_in_a_later_round(catalog):
+    # Every request fails once after count; pages come back in later rounds.
+    faults = FaultInjector(script=[None] + ["503"] * 10, retry_after=None)
+    with MockFDSNServer(catalog=catalog, faults=faults) as server:
+        client = USGSAPIClient(client_config(server.query_url, max_retries=1))
+        events = client.fetch_earthquakes(START, END)
+        assert server.stats["503"] == 10
+    assert len({e["id"] for e in events}) == len(catalog.features)
+
+
+def test_pages_still_failing_raise_instead_of_truncating(catalog):
+    faults = FaultInjector(script=[None], rate_503=1.0, retry_after=None)
+    with MockFDSNServer(catalog=catalog, faults=faults) as server:
+        client = USGSAPIClient(
+            client_config(server.query_url, max_retries=1, page_retry_rounds=1)
+        )
+        with pytest.raises(PageFetchError) as excinfo:
+            client.fetch_earthquakes(START, END)
+    assert excinfo.value.failed_offsets == list(range(1, 1001, 100))
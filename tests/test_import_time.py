@@ -0,0 +1,51 @@
+# ============================================================================
+# FILE: tests/test_import_time.py
+# ============================================================================
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+HEAVY_MODULES = ["requests", "tenacity", "pydantic", "psycopg2", "http.server"]
+
+# Budget for `import earthquake_elt.pipeline` in a fresh interpreter. Generous
+# enough for slow CI runners; override with EARTHQUAKE_ELT_IMPORT_BUDGET_MS.
+IMPORT_BUDGET_MS = float(os.environ.get("EARTHQUAKE_ELT_IMPORT_BUDGET_MS", 150))
+
+PROBE = f"""
+import json, logging, sys, time
+started = time.perf_counter()
+import earthquake_elt.pipeline
+import earthquake_elt.ingestion
+elapsed_ms = (time.perf_counter() - started) * 1000
+print(json.dumps({{
+    "elapsed_ms": elapsed_ms,
+    "loaded": [m for m in {HEAVY_MODULES!r} if m in sys.modules],
+    "root_handlers": len(logging.getLogger().handlers),
+}}))
+"""
+
+
+def _probe(cwd):
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE], cwd=cwd, capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout)
+
+
+def test_import_has_no_side_effects(tmp_path):
+    probe = _probe(tmp_path)
+    assert probe["loaded"] == []
+    assert probe["root_handlers"] == 0
+    assert not (tmp_path / "logs").exists()
+
+
+@pytest.mark.skipif(
+    os.environ.get("EARTHQUAKE_ELT_SKIP_IMPORT_BUDGET") == "1",
+    reason="import budget check disabled",
+)
+def test_import_time_budget(tmp_path):
+    fastest = min(_probe(tmp_path)["elapsed_ms"] for _ in range(3))
+    assert fastest < IMPORT_BUDGET_MS, f"import took {fastest:.1f}ms"
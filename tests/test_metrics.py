@@ -0,0 +1,64 @@
+# ============================================================================
+# FILE: tests/test_metrics.py
+# ============================================================================
+import json
+import logging
+from urllib.request import urlopen
+
+import pytest
+
+from earthquake_elt.logging_config import JsonFormatter
+from earthquake_elt.metrics import MetricsRegistry, start_http_server
+
+
+@pytest.fixture
+def registry():
+    return MetricsRegistry()
+
+
+def test_counter_render(registry):
+    rejects = registry.counter("rejects_total", "Rejected events")
+    rejects.inc(reason="Missing time")
+    rejects.inc(2, reason="Missing time")
+    text = registry.render()
+    assert "# TYPE rejects_total counter" in text
+    assert 'rejects_total{reason="Missing time"} 3.0' in text
+    with pytest.raises(ValueError):
+        rejects.inc(-1)
+
+
+def test_histogram_buckets_are_cumulative(registry):
+    latency = registry.histogram("latency_seconds", "Latency", buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.7, 3.0):
+        latency.observe(value, status="200")
+    text = registry.render()
+    assert 'latency_seconds_bucket{status="200",le="0.1"} 1.0' in text
+    assert 'latency_seconds_bucket{status="200",le="1.0"} 3.0' in text
+    assert 'latency_seconds_bucket{status="200",le="+Inf"} 4.0' in text
+    assert 'latency_seconds_count{status="200"} 4.0' in text
+    assert latency.sum(status="200") == pytest.approx(4.25)
+
+
+def test_textfile_and_http_export(registry, tmp_path):
+    registry.gauge("events_per_second", "Throughput").set(125.5)
+    path = tmp_path / "textfile" / "earthquake.prom"
+    registry.write_textfile(str(path))
+    assert "events_per_second 125.5" in path.read_text()
+
+    server = start_http_server(0, host="127.0.0.1", registry=registry)
+    try:
+        port = server.server_address[1]
+        body = urlopen(f"http://127.0.0.1:{port}/metrics").read().decode()
+    finally:
+        server.shutdown()
+    assert body == registry.render()
+
+
+def test_json_formatter_includes_extra_fields():
+    record = logging.makeLogRecord(
+        {"name": "earthquake_elt", "levelname": "INFO", "msg": "done", "rows": 42}
+    )
+    payload = json.loads(JsonFormatter().format(record))
+    assert payload["message"] == "done"
+    assert payload["rows"] == 42
+    assert payload["logger"] == "earthquake_elt"
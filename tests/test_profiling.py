@@ -0,0 +1,74 @@
+# ============================================================================
+# FILE: tests/test_profiling.py
+# ============================================================================
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+from earthquake_elt.profiling import StageProfiler
+
+
+def test_disabled_profiler_is_noop(tmp_path):
+    profiler = StageProfiler(enabled=False, output_dir=str(tmp_path))
+    with profiler.profile("fetch"):
+        sum(range(1000))
+    profiler.write_reports()
+    assert profiler.profile("fetch") is profiler.profile("validate")
+    assert not any(tmp_path.iterdir())
+
+
+def test_enabled_profiler_writes_stage_reports(tmp_path):
+    profiler = StageProfiler(
+        enabled=True, output_dir=str(tmp_path), trace_memory=True, run_id="run1"
+    )
+    for _ in range(2):
+        with profiler.profile("validate"):
+            data = [str(i) * 10 for i in range(10000)]
+            del data
+    with profiler.profile("raw_load"):
+        pass
+    profiler.write_reports()
+
+    run_dir = tmp_path / "run1"
+    assert (run_dir / "validate.pstats").exists()
+    assert (run_dir / "raw_load.pstats").exists()
+    report = (run_dir / "validate.txt").read_text()
+    assert "(2 calls)" in report
+    assert "Peak traced memory" in report
+    assert "cumulative time" in report
+
+    summary = json.loads((run_dir / "summary.json").read_text())
+    assert [s["stage"] for s in summary] == ["validate", "raw_load"]
+    assert summary[0]["calls"] == 2
+    assert summary[0]["peak_memory_bytes"] > 100_000
+
+
+def _page_work():
+    return sorted(str(i) for i in range(5000))
+
+
+def test_worker_thread_profiles_merge_into_stage(tmp_path):
+    profiler = StageProfiler(enabled=True, output_dir=str(tmp_path), run_id="run1")
+
+    def in_worker():
+        with profiler.profile_thread("fetch"):
+            return _page_work()
+
+    with profiler.profile("fetch"):
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            list(pool.map(lambda _: in_worker(), range(3)))
+    profiler.write_reports()
+
+    report = (tmp_path / "run1" / "fetch.txt").read_text()
+    assert "Includes 3 worker-thread calls" in report
+    assert "_page_work" in report
+    summary = json.loads((tmp_path / "run1" / "summary.json").read_text())
+    assert summary[0]["worker_thread_calls"] == 3
+
+
+def test_from_config_overrides():
+    config = {"profiling": {"enabled": False, "tracemalloc": True, "top_n": 5}}
+    profiler = StageProfiler.from_config(config, enabled=True)
+    assert profiler.enabled
+    assert profiler.trace_memory
+    assert profiler.top_n == 5
+    assert not StageProfiler.from_config({}).enabled
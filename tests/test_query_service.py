@@ -0,0 +1,196 @@
+# ============================================================================
+# FILE: tests/test_query_service.py
+# ============================================================================
+import json
+import re
+import threading
+import time
+from contextlib import contextmanager
+from decimal import Decimal
+from pathlib import Path
+from urllib.error import HTTPError
+from urllib.request import urlopen
+
+import pytest
+
+from earthquake_elt.analytics import QUERIES, QueryCache
+from earthquake_elt.analytics.queries import QUERY_PARAMS, psql_script
+from earthquake_elt.analytics.service import QueryServer, QueryService
+from earthquake_elt.regions import RegionClassifier
+
+REGIONS = Path(__file__).resolve().parents[1] / "data" / "regions.json"
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+        self.description = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params=None):
+        self.conn.statements.append(sql)
+        if sql.startswith("EXECUTE"):
+            self.conn.db.executions += 1
+            self.conn.db.gate.wait()
+            self.description = [("region",), ("event_count",)]
+
+    def fetchall(self):
+        return [("Alaska", Decimal("12"))]
+
+
+class FakeConnection:
+    def __init__(self, db):
+        self.db = db
+        self.statements = []
+        self.readonly = False
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def rollback(self):
+        pass
+
+    def set_session(self, readonly=False):
+        self.readonly = readonly
+
+
+class FakeDatabase:
+    def __init__(self):
+        self.conn = FakeConnection(self)
+        self.executions = 0
+        self.gate = threading.Event()
+        self.gate.set()
+
+    @contextmanager
+    def get_connection(self):
+        yield self.conn
+
+    def close_pool(self):
+        pass
+
+
+@pytest.fixture
+def db():
+    return FakeDatabase()
+
+
+@pytest.fixture
+def service(db, tmp_path):
+    regions = RegionClassifier(REGIONS, cache_dir=tmp_path)
+    return QueryService(
+        db, QueryCache(maxsize=8, ttl=60), max_concurrency=2, regions=regions
+    )
+
+
+def test_cache_lru_and_ttl():
+    now = [0.0]
+    cache = QueryCache(maxsize=2, ttl=10, clock=lambda: now[0])
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)  # evicts "b", the least recently used
+    assert cache.get("b") is None
+    now[0] = 11
+    assert cache.get("a") is None
+    assert cache.stats()["hits"] == 1
+
+
+def test_cache_rejects_value_computed_before_invalidation():
+    cache = QueryCache()
+    generation = cache.generation
+    cache.invalidate()
+    assert cache.set("k", "stale", generation) is False
+    assert cache.get("k") is None
+
+
+def test_bind_parses_and_rejects_params():
+    query = QUERIES["high_impact_events"]
+    assert query.bind({"min_magnitude": "6.5"}) == (6.5, 30, 20)
+    with pytest.raises(ValueError):
+        query.bind({"limit": "0"})
+    with pytest.raises(ValueError):
+        query.bind({"unknown": "1"})
+    assert QUERIES["monthly_trends"].bind({}) == (None, None)
+
+
+def test_queries_load_from_sql_file():
+    assert set(QUERIES) == set(QUERY_PARAMS)
+    for query in QUERIES.values():
+        placeholders = {int(n) for n in re.findall(r"\$(\d+)", query.sql)}
+        assert placeholders == set(range(1, len(query.params) + 1)), query.name
+        assert not query.sql.endswith(";") and "-- " not in query.sql
+    assert QUERIES["magnitude_types"].description == "Magnitude type analysis"
+
+
+def test_psql_script_runs_each_query_with_defaults():
+    script = psql_script()
+    assert "EXECUTE analytics_magnitude_by_region(NULL);" in script
+    assert "EXECUTE analytics_high_impact_events('5.0', '30', '20');" in script
+    assert "EXECUTE analytics_magnitude_types;" in script
+    assert script.count("DEALLOCATE") == len(QUERIES)
+
+
+def test_service_prepares_once_and_caches(service, db):
+    body, cached = service.run("magnitude_by_region", {"min_magnitude": "4"})
+    assert not cached
+    assert json.loads(body)["rows"] == [{"region": "Alaska", "event_count": 12.0}]
+    assert db.conn.readonly
+
+    body, cached = service.run("magnitude_by_region", {"min_magnitude": "4"})
+    assert cached
+    service.run("magnitude_by_region", {"min_magnitude": "5"})
+    assert db.executions == 2
+    prepares = [s for s in db.conn.statements if s.startswith("PREPARE")]
+    assert len(prepares) == 1
+
+    service.invalidate()
+    service.run("magnitude_by_region", {"min_magnitude": "4"})
+    assert db.executions == 3
+
+
+def test_concurrent_misses_share_one_query(service, db):
+    db.gate.clear()
+    results = []
+    threads = [
+        threading.Thread(
+            target=lambda: results.append(service.run("magnitude_types", {}))
+        )
+        for _ in range(5)
+    ]
+    for thread in threads:
+        thread.start()
+    while db.executions == 0:
+        time.sleep(0.001)
+    db.gate.set()
+    for thread in threads:
+        thread.join()
+    assert db.executions == 1
+    assert len({body for body, _ in results}) == 1
+
+
+def test_http_endpoints(service):
+    with QueryServer(service) as server:
+        with urlopen(f"{server.url}/queries/magnitude_types") as response:
+            assert response.headers["X-Cache"] == "MISS"
+        with urlopen(f"{server.url}/queries/magnitude_types") as response:
+            assert response.headers["X-Cache"] == "HIT"
+        with urlopen(f"{server.url}/queries") as response:
+            names = {q["name"] for q in json.loads(response.read())}
+        assert names == set(QUERIES)
+        with pytest.raises(HTTPError) as excinfo:
+            urlopen(f"{server.url}/queries/nope")
+        assert excinfo.value.code == 404
+        with pytest.raises(HTTPError) as excinfo:
+            urlopen(f"{server.url}/queries/high_impact_events?days=abc")
+        assert excinfo.value.code == 400
+        with urlopen(f"{server.url}/regions?lat=35.7,0&lon=139.7,-150") as response:
+            points = json.loads(response.read())["points"]
+        assert [p["region"] for p in points] == ["Japan", "Other"]
+        with pytest.raises(HTTPError) as excinfo:
+            urlopen(f"{server.url}/regions?lat=35.7")
+        assert excinfo.value.code == 400
@@ -0,0 +1,66 @@
+# ============================================================================
+# FILE: tests/test_rate_control.py
+# ============================================================================
+from datetime import datetime, timezone
+
+from earthquake_elt.ingestion.rate_control import (
+    AdaptiveRateController,
+    TokenBucket,
+    parse_retry_after,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+def test_parse_retry_after_seconds_and_http_date():
+    now = datetime(2024, 1, 1, 12, 0, 0, tzinfo=timezone.utc)
+    assert parse_retry_after("3") == 3.0
+    assert parse_retry_after("Mon, 01 Jan 2024 12:00:30 GMT", now=now) == 30.0
+    assert parse_retry_after("Mon, 01 Jan 2024 11:00:00 GMT", now=now) == 0.0
+    assert parse_retry_after("86400") == 300.0
+    assert parse_retry_after(None) is None and parse_retry_after("soon") is None
+
+
+def test_token_bucket_paces_and_pauses():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2.0, burst=2, clock=clock, sleep=clock.sleep)
+    assert [bucket.acquire() for _ in range(2)] == [0.0, 0.0]
+    assert bucket.acquire() == 0.5
+
+    bucket.pause(10)
+    assert bucket.acquire() == 10.5
+    assert clock.now == 11.0
+
+
+def test_controller_increases_additively_and_decreases_once_per_cooldown():
+    clock = FakeClock()
+    controller = AdaptiveRateController(
+        60, max_rate_per_minute=600, max_concurrency=4, clock=clock, sleep=clock.sleep
+    )
+    for _ in range(20):
+        with controller.request():
+            pass
+        controller.on_success()
+    assert int(controller.concurrency) == 4
+    assert controller.rate_per_minute == 80
+
+    throttled_at = clock.now
+    controller.on_throttle(retry_after=5)
+    controller.on_throttle(retry_after=5)  # same congestion event
+    assert int(controller.concurrency) == 2
+    assert controller.rate_per_minute == 40
+
+    with controller.request():
+        assert clock.now >= throttled_at + 5
+    clock.now += 6
+    controller.on_throttle()
+    assert (int(controller.concurrency), controller.rate_per_minute) == (1, 20)
@@ -0,0 +1,97 @@
+# ============================================================================
+# FILE: tests/test_regions.py
+# ============================================================================
+import json
+import random
+from pathlib import Path
+
+import pytest
+
+from earthquake_elt.regions import DEFAULT_REGION, RegionClassifier
+
+REGIONS = Path(__file__).resolve().parents[1] / "data" / "regions.json"
+
+
+def _write_polygons(path, features):
+    path.write_text(
+        json.dumps(
+            {
+                "type": "FeatureCollection",
+                "features": [
+                    {
+                        "type": "Feature",
+                        "properties": {"name": name},
+                        "geometry": {"type": "Polygon", "coordinates": rings},
+                    }
+                    for name, rings in features
+                ],
+            }
+        )
+    )
+    return path
+
+
+@pytest.fixture
+def polygons(tmp_path):
+    # A triangle overlapping a square with a hole; the triangle comes first.
+    return _write_polygons(
+        tmp_path / "regions.json",
+        [
+            ("Triangle", [[[0, 0], [30, 0], [0, 30], [0, 0]]]),
+            (
+                "Square",
+                [
+                    [[10, 10], [50, 10], [50, 50], [10, 50], [10, 10]],
+                    [[30, 30], [40, 30], [40, 40], [30, 40], [30, 30]],
+                ],
+            ),
+        ],
+    )
+
+
+def test_grid_agrees_with_exact_test(polygons, tmp_path):
+    classifier = RegionClassifier(polygons, tmp_path / "cache", cell_degrees=1.0)
+    rng = random.Random(7)
+    points = [(rng.uniform(-5, 55), rng.uniform(-5, 55)) for _ in range(5000)]
+    for lat, lon in points:
+        assert classifier.classify(lat, lon) == classifier.classify_exact(lat, lon)
+    assert classifier.classify(12, 12) == "Triangle"
+    assert classifier.classify(35, 35) == DEFAULT_REGION  # inside the hole
+    assert classifier.classify(45, 45) == "Square"
+    assert classifier.classify(None, 10) == DEFAULT_REGION
+    assert classifier.classify(float("nan"), 10) == DEFAULT_REGION
+
+
+def test_grid_is_cached_and_rebuilt_when_polygons_change(polygons, tmp_path):
+    cache_dir = tmp_path / "cache"
+    first = RegionClassifier(polygons, cache_dir, cell_degrees=1.0).load()
+    cached = list(cache_dir.iterdir())
+    assert [p.name for p in cached] == [first.cache_path.name]
+    mtime = cached[0].stat().st_mtime_ns
+    first.close()
+
+    second = RegionClassifier(polygons, cache_dir, cell_degrees=1.0)
+    assert second.classify(45, 45) == "Square"
+    assert cached[0].stat().st_mtime_ns == mtime
+
+    _write_polygons(polygons, [("Box", [[[40, 40], [50, 40], [50, 50], [40, 50]]])])
+    third = RegionClassifier(polygons, cache_dir, cell_degrees=1.0)
+    assert third.classify(45, 45) == "Box"
+    assert len(list(cache_dir.iterdir())) == 2
+
+
+@pytest.mark.parametrize(
+    "lat, lon, expected",
+    [
+        (35.68, 139.69, "Japan"),
+        (34.05, -118.24, "Continental US"),
+        (61.22, -149.90, "Alaska"),
+        (52.0, 178.0, "Alaska"),  # Aleutians west of the antimeridian
+        (21.30, -157.85, "Hawaii"),
+        (-33.45, -70.66, "South America"),
+        (-75.0, 10.0, "Antarctica"),
+        (0.0, -150.0, DEFAULT_REGION),
+    ],
+)
+def test_shipped_regions(lat, lon, expected, tmp_path):
+    assert RegionClassifier(REGIONS, tmp_path).classify(lat, lon) == expected
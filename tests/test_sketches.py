@@ -0,0 +1,123 @@
+# ============================================================================
+# FILE: tests/test_sketches.py
+# ============================================================================
+import bisect
+import random
+import statistics
+from contextlib import contextmanager
+from datetime import date
+
+import pytest
+
+from earthquake_elt.analytics.sketches import (
+    EventSketch,
+    HyperLogLog,
+    Moments,
+    SketchStore,
+    TDigest,
+)
+
+
+def _rank(sorted_values, value):
+    return bisect.bisect_left(sorted_values, value) / len(sorted_values)
+
+
+def test_tdigest_quantiles_have_bounded_rank_error():
+    rng = random.Random(3)
+    values = [rng.expovariate(1.0) for _ in range(50000)]
+    parts = [TDigest() for _ in range(20)]
+    for i, value in enumerate(values):
+        parts[i % 20].add(value)
+    merged = TDigest()
+    for part in parts:
+        merged.merge(part)
+
+    ordered = sorted(values)
+    for q in (0.01, 0.25, 0.5, 0.9, 0.99):
+        assert abs(_rank(ordered, merged.quantile(q)) - q) < 0.01
+    assert merged.quantile(0) == ordered[0] and merged.quantile(1) == ordered[-1]
+    assert len(merged.means) <= 100
+    assert TDigest().quantile(0.5) is None
+    with pytest.raises(ValueError):
+        merged.quantile(1.5)
+
+
+def test_moments_merge_matches_direct_computation():
+    rng = random.Random(5)
+    values = [rng.gauss(4.0, 1.2) for _ in range(1000)]
+    left, right = Moments(), Moments()
+    for value in values[:300]:
+        left.add(value)
+    for value in values[300:]:
+        right.add(value)
+    left.merge(right)
+    assert left.count == 1000
+    assert left.mean == pytest.approx(statistics.mean(values))
+    assert left.stddev == pytest.approx(statistics.stdev(values))
+    assert (left.min, left.max) == (min(values), max(values))
+
+
+def test_hyperloglog_estimates_distinct_values():
+    hll = HyperLogLog()
+    for i in range(20000):
+        hll.add(i % 8000)
+    assert abs(hll.cardinality() - 8000) < 8000 * 0.05
+    other = HyperLogLog()
+    for i in range(4000, 12000):
+        other.add(i)
+    assert abs(hll.merge(other).cardinality() - 12000) < 12000 * 0.05
+    with pytest.raises(ValueError):
+        hll.merge(HyperLogLog(precision=10))
+
+
+def test_event_sketch_round_trips_through_bytes():
+    sketch = EventSketch()
+    for i in range(500):
+        sketch.add(2.0 + i / 100, None if i % 10 == 0 else float(i), i % 50)
+    restored = EventSketch.from_bytes(sketch.to_bytes())
+    assert restored.to_dict() == sketch.to_dict()
+    assert restored.count == 500 and restored.depth.count == 450
+    assert abs(restored.locations.cardinality() - 50) <= 1
+    with pytest.raises(ValueError):
+        EventSketch.from_bytes(b"nope")
+
+
+class FakeSketchDatabase:
+    def __init__(self, rows):
+        self.rows = rows
+        self.queries = []
+
+    @contextmanager
+    def get_connection(self):
+        yield self
+
+    @contextmanager
+    def cursor(self):
+        yield self
+
+    def execute(self, sql, params=None):
+        self.queries.append((sql, params))
+
+    def fetchall(self):
+        return self.rows
+
+
+def test_store_merges_rows_for_date_range():
+    sketches = {"mb": EventSketch(), "ml": EventSketch()}
+    for i in range(100):
+        sketches["mb" if i % 4 == 0 else "ml"].add(3.0 + i / 100, 10.0, i)
+    db = FakeSketchDatabase([(name, s.to_bytes()) for name, s in sketches.items()])
+    store = SketchStore(db)
+
+    summary = store.summarize(date(2024, 1, 1), date(2024, 12, 31))
+    assert summary.count == 100
+    assert summary.quantile("magnitude", 0.5) == pytest.approx(3.495, abs=0.02)
+    sql, params = db.queries[-1]
+    assert "day >= %s AND day <= %s" in sql and params == [
+        date(2024, 1, 1),
+        date(2024, 12, 31),
+    ]
+
+    breakdown = store.breakdown()
+    assert {k: v.count for k, v in breakdown.items()} == {"mb": 25, "ml": 75}
+    assert "WHERE" not in db.queries[-1][0]
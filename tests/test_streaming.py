@@ -0,0 +1,134 @@
+# ============================================================================
+# FILE: tests/test_streaming.py
+# ============================================================================
+import copy
+import json
+import time
+from contextlib import nullcontext
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from earthquake_elt.streaming import ChangeTracker, FeedSource, StreamingDaemon
+from earthquake_elt.testing import SyntheticCatalog, feature_collection
+from earthquake_elt.testing.fdsn_server import Catalog, MockFDSNServer
+
+
+class StubPipeline:
+    """Records micro-batches instead of writing to a database."""
+
+    def __init__(self, fail=False):
+        self.batches = []
+        self.fail = fail
+
+    def _stage(self, name):
+        return nullcontext()
+
+    def process_micro_batch(self, batch):
+        if self.fail:
+            raise RuntimeError("database unavailable")
+        self.batches.append(list(batch.ids))
+        return {"events_loaded": len(batch), "event_ids": list(batch.ids)}
+
+    def export_metrics(self, log_snapshot=True):
+        pass
+
+
+@pytest.fixture
+def features():
+    now = datetime.now(timezone.utc)
+    catalog = SyntheticCatalog(
+        seed=3, start_time=now - timedelta(minutes=30), end_time=now, invalid_rate=0.0
+    )
+    return catalog.generate(20)
+
+
+@pytest.fixture
+def feed_file(tmp_path, features):
+    path = tmp_path / "all_hour.geojson"
+    path.write_text(json.dumps(feature_collection(features)))
+    return path
+
+
+def _revise(feature):
+    revised = copy.deepcopy(feature)
+    revised["properties"]["updated"] += 60_000
+    revised["properties"]["mag"] = 4.2
+    return revised
+
+
+def test_tracker_detects_new_and_revised_events(features):
+    tracker = ChangeTracker()
+    assert len(tracker.changed(features)) == 20
+    tracker.mark(features)
+    assert tracker.changed(features) == []
+
+    revised = _revise(features[0])
+    assert tracker.changed(features + [revised]) == [revised]
+
+
+def test_tracker_forgets_events_after_retention(features):
+    now = [0.0]
+    tracker = ChangeTracker(retention_seconds=60, clock=lambda: now[0])
+    tracker.mark(features[:5])
+    now[0] = 120
+    tracker.mark(features[5:6])
+    assert len(tracker) == 1
+
+
+def test_daemon_micro_batches_only_changes(feed_file, features):
+    pipeline = StubPipeline()
+    daemon = StreamingDaemon(pipeline, FeedSource(str(feed_file)))
+
+    stats = daemon.poll_once()
+    assert stats["events_changed"] == 20
+    assert stats["latency_max_seconds"] < 2 * 3600
+    assert daemon.poll_once()["events_changed"] == 0
+
+    feed_file.write_text(
+        json.dumps(feature_collection([_revise(features[3])] + features[4:]))
+    )
+    daemon.poll_once()
+    assert pipeline.batches[-1] == [features[3]["id"]]
+
+
+def test_failed_micro_batch_is_retried(feed_file):
+    pipeline = StubPipeline(fail=True)
+    daemon = StreamingDaemon(pipeline, FeedSource(str(feed_file)), poll_interval=0)
+    daemon.run(max_polls=2)
+    assert pipeline.batches == []
+
+    pipeline.fail = False
+    assert daemon.poll_once()["events_changed"] == 20
+
+
+def test_query_source_polls_with_updatedafter():
+    now = datetime.now(timezone.utc)
+    catalog = Catalog.synthetic(
+        50, seed=5, start_time=now - timedelta(minutes=20), end_time=now
+    )
+    with MockFDSNServer(catalog=catalog) as server:
+        source = FeedSource(server.query_url, overlap_seconds=0)
+        features = source.poll()
+        assert len(features) == 50
+        source.advance(features)
+        started = time.perf_counter()
+        assert source.poll() == []
+        assert time.perf_counter() - started < 5
+
+
+def test_query_cursor_holds_until_micro_batch_succeeds():
+    now = datetime.now(timezone.utc)
+    catalog = Catalog.synthetic(
+        30, seed=6, start_time=now - timedelta(minutes=20), end_time=now
+    )
+    with MockFDSNServer(catalog=catalog) as server:
+        pipeline = StubPipeline(fail=True)
+        source = FeedSource(server.query_url, overlap_seconds=0)
+        daemon = StreamingDaemon(pipeline, source, poll_interval=0)
+        daemon.run(max_polls=2)
+        assert pipeline.batches == []
+
+        pipeline.fail = False
+        assert daemon.poll_once()["events_changed"] == 30
+        assert daemon.poll_once()["events_seen"] == 0
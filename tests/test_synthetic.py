@@ -0,0 +1,51 @@
+# ============================================================================
+# FILE: tests/test_synthetic.py
+# ============================================================================
+from earthquake_elt.ingestion import DataValidator
+from earthquake_elt.testing import SyntheticCatalog, feature_collection
+
+
+def test_generator_is_deterministic():
+    first = SyntheticCatalog(seed=7).generate(50)
+    second = SyntheticCatalog(seed=7).generate(50)
+    assert first == second
+    assert SyntheticCatalog(seed=8).generate(50) != first
+
+
+def test_pages_stream_the_same_events():
+    pages = list(SyntheticCatalog(seed=7).iter_pages(250, 100))
+    assert [len(page) for page in pages] == [100, 100, 50]
+    assert [f for page in pages for f in page] == SyntheticCatalog(seed=7).generate(250)
+
+
+def test_features_are_unique_and_newest_first():
+    features = SyntheticCatalog().generate(500)
+    ids = [f["id"] for f in features]
+    times = [f["properties"]["time"] for f in features if f["properties"]["time"]]
+    assert len(set(ids)) == len(ids)
+    assert times == sorted(times, reverse=True)
+
+
+def test_invalid_share_is_rejected_by_validator():
+    features = SyntheticCatalog(invalid_rate=0.1, missing_rate=0.0).generate(1000)
+    valid, invalid = DataValidator({}).validate_batch(features)
+    assert len(valid) + len(invalid) == 1000
+    assert 50 < len(invalid) < 150
+
+
+def test_revisions_keep_id_and_advance_updated():
+    catalog = SyntheticCatalog(revision_rate=1.0)
+    features = catalog.generate(20)
+    revisions = list(catalog.iter_revisions(features))
+    assert len(revisions) == 20
+    for original, revised in zip(features, revisions):
+        assert revised["id"] == original["id"]
+        assert revised["properties"]["updated"] > original["properties"]["updated"]
+
+
+def test_feature_collection_metadata():
+    features = SyntheticCatalog().generate(3)
+    page = feature_collection(features, count=10)
+    assert page["type"] == "FeatureCollection"
+    assert page["metadata"]["count"] == 10
+    assert len(page["features"]) == 3
@@ -0,0 +1,99 @@
+# ============================================================================
+# FILE: tests/test_transform.py
+# ============================================================================
+from datetime import date, datetime
+from pathlib import Path
+
+import pytest
+
+from earthquake_elt.ingestion.batch import EventBatch
+from earthquake_elt.regions import RegionClassifier
+from earthquake_elt.transform import SqlTransformEngine, create_engine
+from earthquake_elt.transform.classify import (
+    depth_category,
+    magnitude_category,
+    magnitude_description,
+)
+from earthquake_elt.transform.python_engine import (
+    PythonTransformEngine,
+    build_rows,
+    dim_time_row,
+)
+
+REGIONS = Path(__file__).resolve().parents[1] / "data" / "regions.json"
+
+
+def _feature(event_id, updated=1700000999000, **props):
+    properties = {
+        "mag": 5.2,
+        "magType": "mw",
+        "place": "Test Location",
+        "time": 1699999999000,
+        "updated": updated,
+        "status": "reviewed",
+        "sig": 416,
+        "tsunami": 0,
+    }
+    properties.update(props)
+    return {
+        "id": event_id,
+        "properties": properties,
+        "geometry": {"coordinates": [-122.4, 37.8, 69.9996]},
+    }
+
+
+@pytest.mark.parametrize(
+    "depth, expected",
+    [(10.0, "Shallow"), (70.0, "Intermediate"), (299.9, "Intermediate"), (300, "Deep")],
+)
+def test_depth_category(depth, expected):
+    assert depth_category(depth) == expected
+    assert depth_category(None) == "Deep"  # NULL falls through the SQL CASE
+
+
+def test_magnitude_type_rules():
+    assert magnitude_category("mww") == "Moment"
+    assert magnitude_description("ml") == "Local (Richter) magnitude"
+    assert magnitude_category("Mb") == "Other"  # case-sensitive, as in SQL
+
+
+def test_dim_time_row_matches_postgres_formatting():
+    row = dim_time_row(date(2024, 1, 1))
+    assert row == (
+        date(2024, 1, 1), 2024, 1, 1, "January  ", 1, 1, "Monday   ", 1, False
+    )  # fmt: skip
+    assert dim_time_row(date(2023, 12, 31))[6:] == (0, "Sunday   ", 52, True)
+
+
+def test_build_rows_stages_latest_revision_and_dimensions(tmp_path):
+    batch = EventBatch.from_features(
+        [
+            _feature("a"),
+            _feature("b", magType=None, place=None, tsunami=None, sig=None),
+            _feature("a", updated=1700001999000, mag=5.4),
+            {"id": "c", "properties": {"time": 1}, "geometry": {"coordinates": [1, 2]}},
+        ]
+    )
+    rows = build_rows(batch, "batch-1", RegionClassifier(REGIONS, tmp_path))
+
+    assert rows.event_ids == ["b", "a"]
+    staged = dict((row[0], row) for row in rows.staging)
+    assert staged["a"][1] == 5.4
+    assert staged["a"][4] == datetime(2023, 11, 14, 22, 13, 19)
+    assert staged["a"][8] == 70.0
+    assert staged["b"][10] is False and staged["b"][11] is None
+
+    assert [r[0] for r in rows.dim_time] == [date(2023, 11, 14)]
+    assert rows.dim_location == [
+        (37.8, -122.4, "Intermediate", "Continental US", None),
+        (37.8, -122.4, "Intermediate", "Continental US", "Test Location"),
+    ]
+    assert rows.dim_event_type == [("mw", "Moment", "Moment magnitude")]
+
+
+def test_create_engine_from_config():
+    assert isinstance(create_engine({}, db=None), SqlTransformEngine)
+    engine = create_engine({"transform": {"engine": "python"}}, db=None)
+    assert isinstance(engine, PythonTransformEngine)
+    with pytest.raises(ValueError):
+        create_engine({"transform": {"engine": "spark"}}, db=None)